@@ -0,0 +1,29 @@
+from pathlib import Path
+from typing import Optional
+from aiohttp import web
+
+SITE_DIR = Path(__file__).parent / "site"
+
+
+class FixtureSite:
+    """Static HTML pages served locally, so browser steps need no network"""
+
+    def __init__(self, root: Path = SITE_DIR):
+        self.root = root
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve in the background and return the base URL"""
+        app = web.Application()
+        app.router.add_static("/", self.root)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,150 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+from aiohttp import web
+
+# Tool calls the mock makes for every user message, one step per completion,
+# before answering. "{site}" is replaced by the fixture server's base URL.
+SCENARIOS: Dict[str, List[Dict[str, Any]]] = {
+    # No browser: measures bridge, LLM client and MCP transport overhead
+    "transport": [
+        {"name": "read_all_screenshots", "arguments": {"file_name_list": []}},
+    ],
+    "browser": [
+        {"name": "playwright_navigate", "arguments": {"url": "{site}/index.html"}},
+        {"name": "playwright_fill", "arguments": {"selector": "#search", "value": "wrench"}},
+        {"name": "playwright_click", "arguments": {"selector": "#products-link"}},
+        {"name": "playwright_screenshot", "arguments": {"name": "bench", "width": 640, "height": 480}},
+        {"name": "extract_selector_by_page_content", "arguments": {"user_message": "add to cart button"}},
+        {"name": "playwright_evaluate", "arguments": {"script": "document.title"}},
+    ],
+}
+
+SELECTOR_ANSWER = "#add-to-cart"
+
+
+class MockLLM:
+    """Deterministic OpenAI-compatible chat completions endpoint.
+
+    Each user message is answered by walking the scenario: the n-th
+    completion after the user message calls the n-th scripted tool, and the
+    one after the last step returns a plain answer. Selector prompts from the
+    server's extract_selector_by_page_content get a fixed selector. Both
+    plain and streamed (SSE) responses are supported, with usage.
+    """
+
+    def __init__(self, scenario: str, site_url: str = "", latency_ms: float = 0.0):
+        self.steps = json.loads(json.dumps(SCENARIOS[scenario]).replace("{site}", site_url))
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve in the background and return the base URL"""
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.handle)
+        app.router.add_post("/openai/deployments/{deployment}/chat/completions", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _next_message(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        messages = body["messages"]
+        last = messages[-1]
+        if not body.get("tools") and "CSS selector" in str(last.get("content")):
+            return {"role": "assistant", "content": SELECTOR_ANSWER}
+
+        user_index = max(i for i, m in enumerate(messages) if m["role"] == "user")
+        step = sum(
+            1 for m in messages[user_index + 1:] if m["role"] == "assistant" and m.get("tool_calls")
+        )
+        available = {tool["function"]["name"] for tool in body.get("tools") or []}
+        while step < len(self.steps) and self.steps[step]["name"] not in available:
+            step += 1
+        if step >= len(self.steps):
+            return {"role": "assistant", "content": f"Finished {len(self.steps)} steps."}
+
+        call = self.steps[step]
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": f"call_{user_index}_{step}",
+                "type": "function",
+                "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])},
+            }],
+        }
+
+    @staticmethod
+    def _usage(body: Dict[str, Any], message: Dict[str, Any]) -> Dict[str, Any]:
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        prompt_tokens += len(json.dumps(body.get("tools") or [])) // 4
+        completion_tokens = len(json.dumps(message)) // 4
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        message = self._next_message(body)
+        finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+        usage = self._usage(body, message)
+        if not body.get("stream"):
+            return web.json_response({
+                "id": f"mock-{self.requests}",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body.get("model") or "mock",
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": usage,
+            })
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+
+        def chunk(delta=None, finish=None, usage=None) -> bytes:
+            data = {
+                "id": f"mock-{self.requests}",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body.get("model") or "mock",
+                "choices": [] if usage else [
+                    {"index": 0, "delta": delta or {}, "finish_reason": finish}
+                ],
+            }
+            if usage:
+                data["usage"] = usage
+            return f"data: {json.dumps(data)}\n\n".encode()
+
+        for index, call in enumerate(message.get("tool_calls") or []):
+            await response.write(chunk({"tool_calls": [{
+                "index": index,
+                "id": call["id"],
+                "type": "function",
+                "function": {"name": call["function"]["name"], "arguments": ""},
+            }]}))
+            await response.write(chunk({"tool_calls": [{
+                "index": index,
+                "function": {"arguments": call["function"]["arguments"]},
+            }]}))
+        for word in (message.get("content") or "").split(" "):
+            if word:
+                await response.write(chunk({"content": word + " "}))
+        await response.write(chunk(finish=finish_reason))
+        await response.write(chunk(usage=usage))
+        await response.write(b"data: [DONE]\n\n")
+        return response
@@ -0,0 +1,284 @@
+"""Offline benchmark of MCPLLMBridge against a mock LLM and a local test site.
+
+    python -m benchmarks.run --scenario browser --turns 50 --output result.json
+
+Nothing leaves the machine: the LLM endpoint and the web pages are served
+locally by a child process (benchmarks.serve), and any Azure/OpenAI settings
+in the environment are overridden.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+from benchmarks.mock_llm import SCENARIOS
+
+SYSTEM_PROMPT = "You are a browser automation assistant. Use the tools to complete the task."
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 100]"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def latency_summary(values_ms: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values_ms),
+        "mean_ms": round(sum(values_ms) / len(values_ms), 2) if values_ms else 0.0,
+        "p50_ms": round(percentile(values_ms, 50), 2),
+        "p90_ms": round(percentile(values_ms, 90), 2),
+        "p99_ms": round(percentile(values_ms, 99), 2),
+        "max_ms": round(max(values_ms), 2) if values_ms else 0.0,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def use_local_endpoints(llm_url: str):
+    """Point every LLM and browser setting at the local fixtures"""
+    os.environ.update({
+        "AZURE_OPEN_AI_ENDPOINT": llm_url,
+        "AZURE_OPEN_AI_API_KEY": "benchmark",
+        "AZURE_OPEN_AI_API_VERSION": "2024-10-21",
+        "AZURE_OPEN_AI_DEPLOYMENT_MODEL": "mock",
+        "BROWSER_HEADLESS": "true",
+        "BROWSER_WARMUP": "false",  # browser start is timed separately
+    })
+    os.environ.pop("SELECTOR_CACHE_PATH", None)
+    os.environ.pop("METRICS_EXPORT_PATH", None)
+
+
+async def run_turn(bridge, message: str, session_id: str, stream: bool) -> str:
+    if not stream:
+        return await bridge.process_message(message, session_id=session_id)
+    text = []
+    async for event in bridge.stream_message(message, session_id=session_id):
+        if event.type == "text_delta":
+            text.append(event.text)
+    return "".join(text)
+
+
+async def run_turns(bridge, turns: int, sessions: int, stream: bool) -> List[float]:
+    """Run `turns` turns spread over concurrent sessions; returns per-turn ms"""
+    latencies: List[float] = []
+    errors = 0
+
+    async def session_loop(index: int, count: int):
+        nonlocal errors
+        for turn in range(count):
+            started = time.perf_counter()
+            answer = await run_turn(bridge, f"Run the scenario ({turn})", f"bench-{index}", stream)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if answer.startswith("Error processing message"):
+                errors += 1
+
+    per_session = [turns // sessions + (1 if i < turns % sessions else 0) for i in range(sessions)]
+    await asyncio.gather(*(session_loop(i, n) for i, n in enumerate(per_session) if n))
+    if errors:
+        print(f"warning: {errors} of {turns} turns returned an error", file=sys.stderr)
+    return latencies
+
+
+def span_summaries(spans) -> Dict[str, Any]:
+    by_key: Dict[str, List[float]] = {}
+    for span in spans:
+        labels = ",".join(f"{k}={v}" for k, v in sorted(span.labels.items()))
+        key = f"{span.name}{{{labels}}}" if labels else span.name
+        by_key.setdefault(key, []).append(span.duration * 1000)
+    return {key: latency_summary(values) for key, values in sorted(by_key.items())}
+
+
+async def start_fixtures(args) -> asyncio.subprocess.Process:
+    """Start benchmarks.serve and wait for its URLs"""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmarks.serve",
+        "--scenario", args.scenario,
+        "--llm-latency-ms", str(args.llm_latency_ms),
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    line = await asyncio.wait_for(process.stdout.readline(), timeout=30)
+    if not line:
+        raise RuntimeError("Fixture server exited before it was ready")
+    process.urls = json.loads(line)
+    return process
+
+
+async def stop_fixtures(process: asyncio.subprocess.Process):
+    process.stdin.close()
+    try:
+        await asyncio.wait_for(process.wait(), timeout=5)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+
+
+async def benchmark(args) -> Dict[str, Any]:
+    fixtures = await start_fixtures(args)
+    use_local_endpoints(fixtures.urls["llm"])
+
+    started = time.perf_counter()
+    from client_bridge import BridgeConfig, BridgeManager, get_default_llm_config
+    from client_bridge.llm_client import close_shared_http_clients
+    from client_bridge.metrics import metrics
+    from server.browser_navigator_server import BrowserNavigationServer
+    import_s = time.perf_counter() - started
+
+    server = BrowserNavigationServer()
+    config = BridgeConfig(
+        mcp=server,
+        llm_config=get_default_llm_config(),
+        system_prompt=SYSTEM_PROMPT,
+        mcp_pool_size=args.pool_size,
+        max_sessions=max(args.sessions, 1),
+    )
+    result: Dict[str, Any] = {}
+    try:
+        started = time.perf_counter()
+        async with BridgeManager(config) as bridge:
+            bridge_init_s = time.perf_counter() - started
+
+            browser_start_s = None
+            if args.scenario == "browser":
+                started = time.perf_counter()
+                await server.browser_manager.ensure_browser()
+                browser_start_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            await run_turn(bridge, "First turn", "bench-0", args.stream)
+            first_turn_s = time.perf_counter() - started
+
+            await run_turns(bridge, args.warmup_turns, args.sessions, args.stream)
+
+            metrics.reset()
+            with metrics.turn() as timings:
+                started = time.perf_counter()
+                latencies = await run_turns(bridge, args.turns, args.sessions, args.stream)
+                elapsed = time.perf_counter() - started
+
+            spans = span_summaries(timings.spans)
+            result.update({
+                "startup": {
+                    "import_s": round(import_s, 4),
+                    "bridge_init_s": round(bridge_init_s, 4),
+                    "browser_start_s": round(browser_start_s, 4) if browser_start_s else None,
+                    "first_turn_s": round(first_turn_s, 4),
+                },
+                "throughput": {
+                    "turns": args.turns,
+                    "sessions": args.sessions,
+                    "elapsed_s": round(elapsed, 4),
+                    "turns_per_sec": round(args.turns / elapsed, 3) if elapsed else None,
+                    "llm_requests": sum(1 for span in timings.spans if span.name == "llm.request"),
+                },
+                "turn_latency": latency_summary(latencies),
+                # As seen by the bridge: MCP transport plus server work
+                "tools": {
+                    key.split("tool=", 1)[1].rstrip("}"): value
+                    for key, value in spans.items()
+                    if key.startswith("mcp.call_tool{")
+                },
+                "spans": spans,
+            })
+
+            if args.memory_turns:
+                result["memory"] = await measure_memory(bridge, args)
+    finally:
+        await close_shared_http_clients()
+        await server.browser_manager.close()
+        await stop_fixtures(fixtures)
+    return result
+
+
+async def measure_memory(bridge, args) -> Dict[str, Any]:
+    """Allocation growth over many turns, traced separately from the timing run"""
+    gc.collect()
+    # One frame per allocation keeps the tracing overhead tolerable
+    tracemalloc.start(1)
+    baseline = tracemalloc.take_snapshot()
+    baseline_size, _ = tracemalloc.get_traced_memory()
+    await run_turns(bridge, args.memory_turns, args.sessions, args.stream)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().compare_to(baseline, "lineno")[:10]
+    tracemalloc.stop()
+    growth = current - baseline_size
+    return {
+        "turns": args.memory_turns,
+        "growth_bytes": growth,
+        "growth_per_turn_bytes": round(growth / args.memory_turns),
+        "peak_traced_bytes": peak,
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "top_growth": [
+            {"location": str(stat.traceback[0]), "size_diff_bytes": stat.size_diff}
+            for stat in top
+            if stat.size_diff > 0
+        ],
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="browser")
+    parser.add_argument("--turns", type=int, default=50, help="timed turns")
+    parser.add_argument("--warmup-turns", type=int, default=3)
+    parser.add_argument("--memory-turns", type=int, default=20, help="traced turns, 0 skips the memory run")
+    parser.add_argument("--sessions", type=int, default=1, help="concurrent conversations")
+    parser.add_argument("--pool-size", type=int, default=1, help="pooled MCP sessions")
+    parser.add_argument("--stream", action="store_true", help="use stream_message")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="delay per mock completion")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="write the JSON result here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Debug logging would dominate the measurement
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+    result = {
+        "benchmark": "bridge",
+        "scenario": args.scenario,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        **asyncio.run(benchmark(args)),
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Serve the fixture site and the mock LLM until stdin closes.
+
+Prints one JSON line with both base URLs once they are listening. The
+benchmark runs this as a child process so the fixtures do not share the
+event loop, CPU time or traced memory of the code being measured.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from benchmarks.fixture_site import FixtureSite
+from benchmarks.mock_llm import SCENARIOS, MockLLM
+
+
+async def serve(scenario: str, latency_ms: float):
+    site = FixtureSite()
+    site_url = await site.start()
+    mock = MockLLM(scenario, site_url, latency_ms=latency_ms)
+    llm_url = await mock.start()
+    print(json.dumps({"site": site_url, "llm": llm_url}), flush=True)
+    try:
+        # Run until the parent closes our stdin
+        await asyncio.get_running_loop().run_in_executor(None, sys.stdin.read)
+    finally:
+        await mock.stop()
+        await site.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="browser")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.scenario, args.llm_latency_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ from tkinter import (
 from dotenv import load_dotenv
 from client_bridge.config import BridgeConfig
 from client_bridge.bridge import BridgeManager
+from client_bridge.llm_client import StreamEvent
 from client_bridge.llm_config import get_default_llm_config
 from server.browser_navigator_server import BrowserNavigationServer
 from loguru import logger
@@ -69,6 +70,8 @@ class ClientBridgeGUI:
         )
         self.send_button.pack(side="right")
 
+        self.bridge = None
+
         # Set up configuration for server and bridge
         self.server = BrowserNavigationServer()
         self.config = BridgeConfig(
@@ -100,11 +103,6 @@ class ClientBridgeGUI:
             self.bridge = bridge
         logger.info("Bridge initialized successfully.")
 
-    async def process_message(self, user_input):
-        """Process the message using the bridge and return the response."""
-        response = await self.bridge.process_message(user_input)
-        return response
-
     def process_input(self):
         """Handle user input and trigger asynchronous processing."""
         user_input = self.user_input.get("1.0", END).strip()
@@ -117,11 +115,18 @@ class ClientBridgeGUI:
             asyncio.run_coroutine_threadsafe(self.handle_input(user_input), self.loop)
 
     async def handle_input(self, user_input):
-        """Handle user input asynchronously and display response."""
+        """Handle user input asynchronously and display the response as it streams in."""
         try:
-            response = await self.process_message(user_input)
-            # Schedule the UI update in the main thread
-            self.master.after(0, self.display_response, f"Response: {response}\n")
+            # Schedule the UI updates in the main thread
+            self.master.after(0, self.display_response, "Response: ")
+            async for event in self.bridge.stream_message(user_input):
+                if event.type == StreamEvent.TEXT_DELTA:
+                    self.master.after(0, self.display_response, event.text)
+                elif event.type == StreamEvent.TOOL_CALL_START:
+                    self.master.after(
+                        0, self.display_message, f"\n[Calling {event.tool_name}]\n"
+                    )
+            self.master.after(0, self.display_response, "\n")
         except Exception as e:
             logger.error(f"Error occurred: {e}")
             self.master.after(0, self.display_message, f"Error: {e}\n")
@@ -147,6 +152,15 @@ class ClientBridgeGUI:
     def close(self):
         """Handle closing of the application and cleanup."""
         logger.info("Closing application and cleaning up resources.")
+        if self.bridge:
+            # Ends the MCP sessions, whose server lifespan closes the browser
+            future = asyncio.run_coroutine_threadsafe(
+                self.bridge.mcp_client_session.disconnect(), self.loop
+            )
+            try:
+                future.result(timeout=10)
+            except Exception as e:
+                logger.warning(f"Failed to disconnect from the MCP server: {e}")
         self.loop.call_soon_threadsafe(self.loop.stop)
         self.master.destroy()
 
@@ -2,17 +2,31 @@
 from .mcp_client import MCPClient
 from .bridge import MCPLLMBridge, BridgeManager
 from .config import BridgeConfig, LLMConfig, MCPServerConfig
-from .llm_client import LLMClient
+from .history import ConversationHistory
+from .llm_client import LLMClient, StreamEvent
+from .session_pool import MCPSessionPool
+from .metrics import MetricsRegistry, metrics
+from .sessions import Conversation, ConversationPool
+from .tool_catalog import ToolCatalog, tool_catalog
 from .llm_config import get_default_llm_config, get_openai_llm_config
 
 __all__ = [
     'MCPClient',
+    'MCPSessionPool',
     'MCPLLMBridge',
     'BridgeManager',
     'BridgeConfig',
     'LLMConfig',
     'MCPServerConfig',
+    'ConversationHistory',
     'LLMClient',
+    'StreamEvent',
+    'MetricsRegistry',
+    'metrics',
+    'Conversation',
+    'ConversationPool',
+    'ToolCatalog',
+    'tool_catalog',
     'get_default_llm_config',
     'get_openai_llm_config',
 ]
\ No newline at end of file
@@ -1,18 +1,34 @@
+import asyncio
 import json
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 from client_bridge.mcp_client import MCPClient
-from client_bridge.llm_client import LLMClient
+from client_bridge.llm_client import LLMClient, StreamEvent
+from client_bridge.log_utils import log_payload
+from client_bridge.metrics import metrics
 from client_bridge.config import BridgeConfig
+from client_bridge.sessions import Conversation, ConversationPool
+from client_bridge.tool_catalog import CatalogEntry, tool_catalog
 from loguru import logger
 
 
+DEFAULT_SESSION = "default"
+
+
 class MCPLLMBridge:
-    """Bridge between MCP protocol and LLM client"""
+    """Bridge between MCP protocol and LLM client.
+
+    One MCP connection and tool catalog serve many conversations. Each
+    session id gets its own history and, on the browser server, its own
+    browser context; calls without a session id use the default conversation.
+    """
 
     def __init__(self, config: BridgeConfig):
         self.config = config
         self.mcp_client_session = MCPClient(
-            config.mcp, server_config=config.server_config
+            config.mcp,
+            server_config=config.server_config,
+            pool_size=config.mcp_pool_size,
+            health_check_interval=config.mcp_health_check_interval,
         )
         self.llm_client = LLMClient(config.llm_config)
 
@@ -22,68 +38,124 @@ class MCPLLMBridge:
         self.tool_name_mapping: Dict[str, str] = (
             {}
         )  # Maps OpenAI tool names to MCP tool names
+        self.read_only_tools = set(config.read_only_tools)  # MCP tool names
+
+        self.sessions = ConversationPool(
+            self._new_llm_client,
+            max_sessions=config.max_sessions,
+            idle_timeout=config.session_idle_timeout,
+        )
+        self.sessions.add(Conversation(DEFAULT_SESSION, self.llm_client, pinned=True))
+        self._refresh_tasks = set()
+
+    def _new_llm_client(self, session_id: str) -> LLMClient:
+        """LLM client of a new conversation, sharing the tools and prompt prefix"""
+        llm_client = LLMClient(self.config.llm_config)
+        llm_client.system_prompt = self.llm_client.system_prompt
+        llm_client.tools = self.llm_client.tools
+        llm_client.prefix = self.llm_client.prefix
+        return llm_client
+
+    def last_turn(self, session_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Time per span (LLM requests, MCP tool calls, ...) of a session's last turn"""
+        conversation = self.sessions.get(session_id or DEFAULT_SESSION)
+        return conversation.last_turn if conversation else None
+
+    async def close_session(self, session_id: str) -> bool:
+        """Drop a conversation's history; the default one is only cleared"""
+        if session_id == DEFAULT_SESSION:
+            self.llm_client.history.clear()
+            return True
+        return await self.sessions.close_session(session_id)
 
     async def initialize(self):
         """Initialize both clients and set up tools"""
         try:
             # Connect MCP client
             await self.mcp_client_session.connect()
-
-            # Get available tools from MCP and add our database tool
-            mcp_tools = await self.mcp_client_session.get_available_tools()
-            if hasattr(mcp_tools, "tools"):
-                self.available_tools = [
-                    *mcp_tools.tools
-                ]
-            else:
-                self.available_tools = [*mcp_tools]
-
-            logger.debug(f"MCP Tools received: {self.available_tools}")
-
-            # Convert and register tools with LLM client
-            converted_tools = self._convert_mcp_tools_to_openai_format(
-                self.available_tools
+            self.mcp_client_session.on_tools_changed(self._on_tools_changed)
+            tool_catalog.subscribe(
+                self.mcp_client_session.server_identity, self._apply_catalog_entry
             )
-            logger.debug(f"Converted tools for OpenAI: {converted_tools}")
-            self.llm_client.tools = converted_tools
+
+            # Tools come from the shared catalog; list_tools only runs on a miss
+            await self.refresh_tools()
 
             return True
         except Exception as e:
             logger.error(f"Bridge initialization failed: {str(e)}", exc_info=True)
             return False
 
+    async def refresh_tools(self):
+        """Load the server's tools from the catalog and register them"""
+        entry = await tool_catalog.load(
+            self.mcp_client_session.server_identity,
+            self._fetch_tools,
+            self._build_catalog_entry,
+        )
+        self._apply_catalog_entry(entry)
+
+    def _apply_catalog_entry(self, entry: CatalogEntry):
+        if self.llm_client.tools is entry.openai_tools:
+            return
+        self.available_tools = list(entry.mcp_tools)
+        self.tool_name_mapping.update(entry.name_mapping)
+        self.read_only_tools = set(self.config.read_only_tools) | entry.read_only_tools
+        for conversation in self.sessions:
+            conversation.llm_client.tools = entry.openai_tools
+        logger.debug(f"Registered {len(entry.openai_tools)} tools with the LLM client")
+
+    async def _fetch_tools(self) -> List[Any]:
+        mcp_tools = await self.mcp_client_session.get_available_tools()
+        if hasattr(mcp_tools, "tools"):
+            return [*mcp_tools.tools]
+        return [*mcp_tools]
+
+    def _build_catalog_entry(self, mcp_tools: List[Any], digest: str) -> CatalogEntry:
+        openai_tools = self._convert_mcp_tools_to_openai_format(mcp_tools)
+        names = {tool["function"]["name"] for tool in openai_tools}
+        return CatalogEntry(
+            mcp_tools,
+            openai_tools,
+            {name: self.tool_name_mapping[name] for name in names},
+            {
+                tool.name
+                for tool in mcp_tools
+                if getattr(getattr(tool, "annotations", None), "readOnlyHint", False)
+            },
+            digest,
+        )
+
+    def _on_tools_changed(self):
+        """Server sent tools/list_changed: drop the cached catalog and reload"""
+        tool_catalog.invalidate(self.mcp_client_session.server_identity)
+        task = asyncio.create_task(self.refresh_tools())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
     def _convert_mcp_tools_to_openai_format(
         self, mcp_tools: List[Any]
     ) -> List[Dict[str, Any]]:
         """Convert MCP tool format to OpenAI tool format"""
         openai_tools = []
 
-        logger.debug(f"Input mcp_tools type: {type(mcp_tools)}")
-        logger.debug(f"Input mcp_tools: {mcp_tools}")
-
         # Extract tools from the response
         if hasattr(mcp_tools, "tools"):
             tools_list = mcp_tools.tools
-            logger.debug("Found ListToolsResult, extracting tools attribute")
         elif isinstance(mcp_tools, dict):
             tools_list = mcp_tools.get("tools", [])
-            logger.debug("Found dict, extracting 'tools' key")
         else:
             tools_list = mcp_tools
-            logger.debug("Using mcp_tools directly as list")
-
-        logger.debug(f"Tools list type: {type(tools_list)}")
-        logger.debug(f"Tools list: {tools_list}")
 
         # Process each tool in the list
         if isinstance(tools_list, list):
-            logger.debug(f"Processing {len(tools_list)} tools")
             for tool in tools_list:
-                logger.debug(f"Processing tool: {tool}, type: {type(tool)}")
                 if hasattr(tool, "name") and hasattr(tool, "description"):
                     openai_name = self._sanitize_tool_name(tool.name)
                     self.tool_name_mapping[openai_name] = tool.name
-                    logger.debug(f"Tool has required attributes. Name: {tool.name}")
+                    annotations = getattr(tool, "annotations", None)
+                    if annotations and getattr(annotations, "readOnlyHint", False):
+                        self.read_only_tools.add(tool.name)
 
                     tool_schema = getattr(
                         tool,
@@ -100,14 +172,14 @@ class MCPLLMBridge:
                         },
                     }
                     openai_tools.append(openai_tool)
-                    logger.debug(f"Converted tool {tool.name} to OpenAI format")
                 else:
                     logger.debug(
-                        f"Tool missing required attributes: has name = {hasattr(tool, 'name')}, has description = {hasattr(tool, 'description')}"
+                        f"Skipping tool without name or description: {getattr(tool, 'name', tool)!r}"
                     )
         else:
             logger.debug(f"Tools list is not a list, it's a {type(tools_list)}")
 
+        logger.debug(f"Converted {len(openai_tools)} MCP tools to OpenAI format")
         return openai_tools
 
     def _sanitize_tool_name(self, name: str) -> str:
@@ -119,86 +191,191 @@ class MCPLLMBridge:
         """Get available tools in OpenAI function calling format"""
         return self.llm_client.tools
 
-    async def execute_tool(self, tool_name: str, arguments: dict) -> Any:
+    async def execute_tool(
+        self, tool_name: str, arguments: dict, session_id: Optional[str] = None
+    ) -> Any:
         """Execute a tool directly through MCP (without LLM loop)"""
         mcp_name = self.tool_name_mapping.get(tool_name, tool_name)
-        return await self.mcp_client_session.call_tool(mcp_name, arguments)
+        return await self.mcp_client_session.call_tool(
+            mcp_name,
+            arguments,
+            meta=self._tool_meta(session_id),
+            session_key=session_id or DEFAULT_SESSION,
+        )
 
-    async def process_message(self, message: str) -> str:
+    async def process_message(self, message: str, session_id: Optional[str] = None) -> str:
         """Process a user message through the bridge"""
+        session_id = session_id or DEFAULT_SESSION
         try:
-            # Send message to LLM
-            logger.debug(f"Sending message to LLM: {message}")
-            response = await self.llm_client.invoke_with_prompt(message)
-            logger.debug(f"LLM Response: {response}")
-
-            # Keep processing tool calls until we get a final response
-            while response.is_tool_call:
-                if not response.tool_calls:
-                    break
-
-                logger.debug(f"Tool calls detected: {response.tool_calls}")
-                tool_responses = await self._handle_tool_calls(response.tool_calls)
-                logger.debug(f"Tool responses: {tool_responses}")
-
-                # Continue the conversation with tool results
-                response = await self.llm_client.invoke(tool_responses)
-                logger.debug(f"Next LLM response: {response}")
-
-            return response.content
+            async with self.sessions.session(session_id) as conversation:
+                with metrics.turn() as timings:
+                    try:
+                        llm_client = conversation.llm_client
+                        # Send message to LLM
+                        log_payload("bridge.message", session=session_id, message=message)
+                        response = await llm_client.invoke_with_prompt(message)
+
+                        # Keep processing tool calls until we get a final response
+                        while response.is_tool_call:
+                            if not response.tool_calls:
+                                break
+
+                            tool_responses = await self._handle_tool_calls(
+                                response.tool_calls, session_id
+                            )
+
+                            # Continue the conversation with tool results
+                            response = await llm_client.invoke(tool_responses)
+
+                        return response.content
+                    finally:
+                        timings.finish()
+                        conversation.last_turn = timings.breakdown()
         except Exception as e:
             logger.error(f"Error processing message: {str(e)}", exc_info=True)
             return f"Error processing message: {str(e)}"
 
+    async def stream_message(
+        self, message: str, session_id: Optional[str] = None
+    ) -> AsyncIterator[StreamEvent]:
+        """Process a user message, yielding text deltas, tool call starts and
+        tool results as they happen, then a final DONE event"""
+        session_id = session_id or DEFAULT_SESSION
+        try:
+            async with self.sessions.session(session_id) as conversation:
+                with metrics.turn() as timings:
+                    llm_client = conversation.llm_client
+                    log_payload("bridge.message", session=session_id, message=message)
+                    events = llm_client.stream_with_prompt(message)
+                    while True:
+                        response = None
+                        async for event in events:
+                            if event.type == StreamEvent.DONE:
+                                response = event.response
+                            else:
+                                yield event
+
+                        if not response or not response.is_tool_call or not response.tool_calls:
+                            timings.finish()
+                            conversation.last_turn = timings.breakdown()
+                            yield StreamEvent(
+                                StreamEvent.DONE,
+                                response=response,
+                                timings=conversation.last_turn,
+                            )
+                            return
+
+                        tool_responses = await self._handle_tool_calls(
+                            response.tool_calls, session_id
+                        )
+                        tool_names = {
+                            tool_call.id: tool_call.function.name
+                            for tool_call in response.tool_calls
+                        }
+                        for tool_response in tool_responses:
+                            yield StreamEvent(
+                                StreamEvent.TOOL_RESULT,
+                                text=tool_response["output"],
+                                tool_name=tool_names.get(tool_response["tool_call_id"]),
+                                tool_call_id=tool_response["tool_call_id"],
+                            )
+
+                        # Continue the conversation with tool results
+                        events = llm_client.stream(tool_responses)
+        except Exception as e:
+            logger.error(f"Error streaming message: {str(e)}", exc_info=True)
+            yield StreamEvent(StreamEvent.TEXT_DELTA, text=f"Error processing message: {str(e)}")
+            yield StreamEvent(StreamEvent.DONE)
+
+    def _tool_meta(self, session_id: Optional[str]) -> Dict[str, Any]:
+        # Lets the browser server give each conversation its own context,
+        # independent of which pooled MCP session carries the call
+        return {"browser_session": session_id or DEFAULT_SESSION}
+
+    def _is_read_only(self, tool_call: Any) -> bool:
+        mcp_name = self.tool_name_mapping.get(tool_call.function.name)
+        return mcp_name in self.read_only_tools
+
     async def _handle_tool_calls(
-        self, tool_calls: List[Dict[str, Any]]
+        self, tool_calls: List[Dict[str, Any]], session_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
-        """Handle tool calls through MCP"""
-        tool_responses = []
+        """Handle tool calls through MCP.
+
+        Consecutive read-only calls run concurrently (bounded by
+        max_parallel_tool_calls); every other call waits for the calls before
+        it and runs alone, so browser state changes keep the model's order.
+        Responses are returned in the original tool_call order.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.config.max_parallel_tool_calls))
+
+        async def run_limited(tool_call):
+            async with semaphore:
+                return await self._execute_tool_call(tool_call, session_id)
 
+        tool_responses = []
+        read_only_batch = []
         for tool_call in tool_calls:
-            try:
-                logger.debug(f"Processing tool call: {tool_call}")
-                # Get original MCP tool name
-                openai_name = tool_call.function.name
-                mcp_name = self.tool_name_mapping.get(openai_name)
-
-                if not mcp_name:
-                    raise ValueError(f"Unknown tool: {openai_name}")
-
-                # Parse arguments
-                arguments = json.loads(tool_call.function.arguments)
-                logger.debug(f"Tool arguments: {arguments}")
-
-                # Execute through MCP
-                result = await self.mcp_client_session.call_tool(mcp_name, arguments)
-                logger.debug(f"Raw MCP result: {result}")
-
-                # Format response - handle both string and structured results
-                if isinstance(result, str):
-                    output = result
-                elif hasattr(result, "content") and isinstance(result.content, list):
-                    # Handle MCP CallToolResult format
-                    output = " ".join(
-                        content.text
-                        for content in result.content
-                        if hasattr(content, "text")
-                    )
-                else:
-                    output = str(result)  # Use str() instead of json.dumps()
+            if self._is_read_only(tool_call):
+                read_only_batch.append(tool_call)
+                continue
+            if read_only_batch:
+                tool_responses.extend(
+                    await asyncio.gather(*(run_limited(c) for c in read_only_batch))
+                )
+                read_only_batch = []
+            tool_responses.append(await self._execute_tool_call(tool_call, session_id))
+        if read_only_batch:
+            tool_responses.extend(
+                await asyncio.gather(*(run_limited(c) for c in read_only_batch))
+            )
 
-                logger.debug(f"Formatted output: {output}")
+        return tool_responses
 
-                # Format response
-                tool_responses.append({"tool_call_id": tool_call.id, "output": output})
+    async def _execute_tool_call(
+        self, tool_call: Any, session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Execute one tool call through MCP and format its output"""
+        try:
+            # Get original MCP tool name
+            openai_name = tool_call.function.name
+            mcp_name = self.tool_name_mapping.get(openai_name)
+
+            if not mcp_name:
+                raise ValueError(f"Unknown tool: {openai_name}")
+
+            # Parse arguments
+            arguments = json.loads(tool_call.function.arguments)
+            log_payload("bridge.tool_call", tool=mcp_name, arguments=arguments)
+
+            # Execute through MCP
+            result = await self.mcp_client_session.call_tool(
+                mcp_name,
+                arguments,
+                meta=self._tool_meta(session_id),
+                session_key=session_id or DEFAULT_SESSION,
+            )
 
-            except Exception as e:
-                logger.error(f"Tool execution failed: {str(e)}", exc_info=True)
-                tool_responses.append(
-                    {"tool_call_id": tool_call.id, "output": f"Error: {str(e)}"}
+            # Format response - handle both string and structured results
+            if isinstance(result, str):
+                output = result
+            elif hasattr(result, "content") and isinstance(result.content, list):
+                # Handle MCP CallToolResult format
+                output = " ".join(
+                    content.text
+                    for content in result.content
+                    if hasattr(content, "text")
                 )
+            else:
+                output = str(result)  # Use str() instead of json.dumps()
 
-        return tool_responses
+            log_payload("bridge.tool_output", tool=mcp_name, output=output)
+
+            # Format response
+            return {"tool_call_id": tool_call.id, "output": output}
+
+        except Exception as e:
+            logger.error(f"Tool execution failed: {str(e)}", exc_info=True)
+            return {"tool_call_id": tool_call.id, "output": f"Error: {str(e)}"}
 
 
 class BridgeManager:
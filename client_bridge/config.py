@@ -14,6 +14,18 @@ class LLMConfig(BaseModel):
     api_version: Optional[str] = None
     azure_endpoint: Optional[str] = None
     deploy_name: Optional[str] = None
+    # HTTP connection pool, shared by all clients with the same settings
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0  # seconds an idle connection is kept open
+    request_timeout: float = 120.0
+    connect_timeout: float = 10.0
+    max_retries: int = 2
+    # Conversation history limits, in tokens (None disables the limit)
+    history_token_budget: Optional[int] = 60000
+    max_tool_output_tokens: Optional[int] = 4000
+    # Routing hint so requests sharing a prefix hit the same prompt cache
+    prompt_cache_key: Optional[str] = None
 
 
 class MCPServerConfig(BaseModel):
@@ -29,6 +41,19 @@ class BridgeConfig(BaseModel):
     server_config: Optional[MCPServerConfig] = None  # External MCP server (stdio)
     llm_config: LLMConfig
     system_prompt: Optional[str] = None
+    # Read-only tool calls of one LLM turn run concurrently, up to this many
+    max_parallel_tool_calls: int = 4
+    # MCP tool names treated as read-only in addition to those annotated
+    # with readOnlyHint by the server
+    read_only_tools: List[str] = []
+    # Concurrent conversations on one bridge, and seconds before an idle one
+    # is dropped
+    max_sessions: int = 100
+    session_idle_timeout: float = 1800.0
+    # Warm MCP sessions (one subprocess each for stdio servers); calls of a
+    # conversation always use the same one
+    mcp_pool_size: int = 1
+    mcp_health_check_interval: float = 30.0  # seconds, 0 disables
 
     class Config:
         arbitrary_types_allowed = True
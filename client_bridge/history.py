@@ -0,0 +1,154 @@
+import json
+from typing import Any, Dict, List, Optional
+from loguru import logger
+from .tokenizer import count_tokens, truncate_to_tokens
+
+# Per-message framing overhead of the chat format, in tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def _field(obj: Any, name: str, default: Any = None) -> Any:
+    # Tool calls are SDK objects from completions and dicts when built by hand
+    if isinstance(obj, dict):
+        return obj.get(name, default)
+    return getattr(obj, name, default)
+
+
+def message_tokens(message: Dict[str, Any], model: Optional[str] = None) -> int:
+    """Approximate prompt tokens of one chat message"""
+    tokens = MESSAGE_OVERHEAD_TOKENS
+    content = message.get("content")
+    if isinstance(content, str):
+        tokens += count_tokens(content, model)
+    elif content:
+        tokens += count_tokens(json.dumps(content, default=str), model)
+    for tool_call in message.get("tool_calls") or []:
+        function = _field(tool_call, "function", {})
+        tokens += count_tokens(_field(function, "name") or "", model)
+        tokens += count_tokens(_field(function, "arguments") or "", model)
+    return tokens
+
+
+class ConversationHistory:
+    """Chat messages kept within a prompt token budget.
+
+    Tool outputs above `max_tool_output_tokens` are truncated when added. When
+    the history plus the fixed prefix (system prompt and tool schemas) would
+    exceed `token_budget`, whole turns are dropped from the front, never the
+    current one, and folded into a short extractive summary.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        max_tool_output_tokens: Optional[int] = None,
+        summary_max_tokens: int = 500,
+        model: Optional[str] = None,
+    ):
+        self.token_budget = token_budget
+        self.max_tool_output_tokens = max_tool_output_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.model = model
+        self.messages: List[Dict[str, Any]] = []
+        self.summary: Optional[str] = None
+        self._token_counts: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def append(self, message: Dict[str, Any]):
+        if (
+            message.get("role") == "tool"
+            and self.max_tool_output_tokens
+            and isinstance(message.get("content"), str)
+        ):
+            message = {**message, "content": self._truncate_output(message["content"])}
+        self._sync_counts()
+        self.messages.append(message)
+        self._token_counts.append(message_tokens(message, self.model))
+
+    def clear(self):
+        self.messages.clear()
+        self._token_counts.clear()
+        self.summary = None
+
+    def _truncate_output(self, content: str) -> str:
+        tokens = count_tokens(content, self.model)
+        if tokens <= self.max_tool_output_tokens:
+            return content
+        kept = truncate_to_tokens(content, self.max_tool_output_tokens, self.model)
+        return f"{kept}\n[... truncated {tokens - self.max_tool_output_tokens} tokens]"
+
+    def _sync_counts(self):
+        # Messages may have been appended to the list directly
+        if len(self._token_counts) != len(self.messages):
+            self._token_counts = [message_tokens(m, self.model) for m in self.messages]
+
+    def tokens(self) -> int:
+        """Prompt tokens of the history, including the summary"""
+        self._sync_counts()
+        summary_tokens = (
+            count_tokens(self.summary, self.model) + MESSAGE_OVERHEAD_TOKENS
+            if self.summary
+            else 0
+        )
+        return sum(self._token_counts) + summary_tokens
+
+    def _turn_starts(self) -> List[int]:
+        return [i for i, m in enumerate(self.messages) if m.get("role") == "user"]
+
+    def fit(self, prefix_tokens: int = 0) -> int:
+        """Drop the oldest turns until prefix plus history fits the budget.
+
+        Returns the estimated prompt tokens after fitting.
+        """
+        total = prefix_tokens + self.tokens()
+        if not self.token_budget or total <= self.token_budget:
+            return total
+
+        dropped_count = 0
+        turn_starts = self._turn_starts()
+        while total > self.token_budget and len(turn_starts) > 1:
+            end = turn_starts[1]
+            self._summarize(self.messages[:end])
+            del self.messages[:end]
+            del self._token_counts[:end]
+            dropped_count += end
+            turn_starts = [start - end for start in turn_starts[1:]]
+            total = prefix_tokens + self.tokens()
+
+        if dropped_count:
+            logger.debug(f"Dropped {dropped_count} old messages to fit {self.token_budget} tokens")
+        if total > self.token_budget:
+            logger.warning(
+                f"Latest turn needs ~{total} prompt tokens, over the {self.token_budget} budget"
+            )
+        return total
+
+    def _summarize(self, dropped: List[Dict[str, Any]]):
+        lines = [self.summary] if self.summary else []
+        for message in dropped:
+            content = message.get("content")
+            if not isinstance(content, str) or not content.strip():
+                continue
+            if message["role"] == "user":
+                lines.append(f"User: {' '.join(content.split())[:200]}")
+            elif message["role"] == "assistant":
+                lines.append(f"Assistant: {' '.join(content.split())[:200]}")
+        summary = "\n".join(lines)
+        # Keep the most recent part when the summary itself grows too long
+        while count_tokens(summary, self.model) > self.summary_max_tokens and "\n" in summary:
+            summary = summary.split("\n", 1)[1]
+        self.summary = summary or None
+
+    def to_messages(self) -> List[Dict[str, Any]]:
+        """Messages to send after the system prompt"""
+        if not self.summary:
+            return list(self.messages)
+        return [
+            {
+                "role": "system",
+                "content": f"Summary of earlier conversation:\n{self.summary}",
+            },
+            *self.messages,
+        ]
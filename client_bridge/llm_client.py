@@ -1,7 +1,68 @@
-from typing import Dict, List, Any, Optional
-from openai import AzureOpenAI, OpenAI
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
+import httpx
+from openai import AsyncAzureOpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
+from openai.types.chat import (
+    ChatCompletion,
+    ChatCompletionMessage,
+    ChatCompletionMessageFunctionToolCall,
+)
+from openai.types.chat.chat_completion import Choice
+from openai.types.chat.chat_completion_message_function_tool_call import Function
 from .config import LLMConfig
-from loguru import logger
+from .history import ConversationHistory
+from .log_utils import log_payload
+from .metrics import metrics
+from .request_builder import PromptPrefix
+from .tokenizer import count_tokens
+
+# (pool settings, event loop id) -> pooled HTTP client. httpx pools are bound
+# to the loop they are first used on, so each loop gets its own pool.
+_shared_http_clients: Dict[Tuple[Any, ...], Tuple[Optional[asyncio.AbstractEventLoop], httpx.AsyncClient]] = {}
+
+
+def get_shared_http_client(config: LLMConfig) -> httpx.AsyncClient:
+    """Keep-alive HTTP pool shared by every LLMClient with the same pool settings"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    # Forget pools of loops that have been closed
+    for key, (owner, _) in list(_shared_http_clients.items()):
+        if owner is not None and owner.is_closed():
+            del _shared_http_clients[key]
+
+    key = (
+        config.max_connections,
+        config.max_keepalive_connections,
+        config.keepalive_expiry,
+        config.request_timeout,
+        config.connect_timeout,
+        id(loop),
+    )
+    entry = _shared_http_clients.get(key)
+    if entry is None or entry[1].is_closed:
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(config.request_timeout, connect=config.connect_timeout),
+        )
+        entry = (loop, http_client)
+        _shared_http_clients[key] = entry
+    return entry[1]
+
+
+async def close_shared_http_clients():
+    """Close all pooled HTTP connections, e.g. on application shutdown"""
+    for _, http_client in list(_shared_http_clients.values()):
+        await http_client.aclose()
+    _shared_http_clients.clear()
 
 
 class LLMResponse:
@@ -16,11 +77,16 @@ class LLMResponse:
         # Format content for bridge compatibility
         self.content = self.message.content if self.message.content is not None else ""
         self.tool_calls = self.message.tool_calls if hasattr(self.message, "tool_calls") else None
+        self.usage = getattr(completion, "usage", None)
         
-        # Debug logging
-        logger.debug(f"Raw completion: {completion}")
-        logger.debug(f"Message content: {self.content}")
-        logger.debug(f"Tool calls: {self.tool_calls}")
+        log_payload(
+            "llm.completion",
+            id=completion.id,
+            finish_reason=self.stop_reason,
+            content=self.content,
+            tool_calls=self.tool_calls,
+            usage=self.usage,
+        )
         
     def get_message(self) -> Dict[str, Any]:
         """Get standardized message format"""
@@ -30,25 +96,88 @@ class LLMResponse:
             "tool_calls": self.tool_calls
         }
 
+class StreamEvent:
+    """Incremental event of a streamed turn"""
+    TEXT_DELTA = "text_delta"
+    TOOL_CALL_START = "tool_call_start"
+    TOOL_RESULT = "tool_result"
+    DONE = "done"
+
+    def __init__(
+        self,
+        type: str,
+        text: str = "",
+        tool_name: Optional[str] = None,
+        tool_call_id: Optional[str] = None,
+        response: Optional[LLMResponse] = None,
+        timings: Optional[Dict[str, Any]] = None,
+    ):
+        self.type = type
+        self.text = text  # delta for TEXT_DELTA, output for TOOL_RESULT
+        self.tool_name = tool_name
+        self.tool_call_id = tool_call_id
+        self.response = response  # final LLMResponse of a completion, on DONE
+        self.timings = timings  # per-span breakdown of the turn, on the bridge's DONE
+
+    def __repr__(self) -> str:
+        return f"StreamEvent({self.type!r}, text={self.text[:40]!r}, tool_name={self.tool_name!r})"
+
+
 class LLMClient:
     """Client for interacting with OpenAI-compatible LLMs"""
     
     def __init__(self, config: LLMConfig):
         self.config = config
-        if hasattr(config, 'azure_endpoint') and config.azure_endpoint:
-            self.client = AzureOpenAI(
-                api_version=config.api_version,
-                azure_endpoint=config.azure_endpoint,
-                api_key=config.api_key,
-            )
-        else:
-            self.client = OpenAI(
-                api_key=config.api_key,
-                base_url=config.base_url
-            )
+        self._client = None
+        self._http_client = None
+        self.last_prompt_estimate = 0
         self.tools = []
-        self.messages = []
+        self.history = ConversationHistory(
+            token_budget=config.history_token_budget,
+            max_tool_output_tokens=config.max_tool_output_tokens,
+            model=config.model,
+        )
         self.system_prompt = None
+        # Prompt token usage of recent completions, most recent last
+        self.usage_log = deque(maxlen=1000)
+        # Keeps the system prompt and tools byte-identical across requests
+        self.prefix = PromptPrefix()
+        self._prefix_tokens_key = None
+        self._prefix_tokens = 0
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        """Conversation history after the system prompt"""
+        return self.history.messages
+
+    @messages.setter
+    def messages(self, messages: List[Dict[str, Any]]):
+        self.history.clear()
+        for message in messages:
+            self.history.append(message)
+
+    @property
+    def client(self):
+        """Async OpenAI client on the shared connection pool of the running loop"""
+        http_client = get_shared_http_client(self.config)
+        if self._client is None or self._http_client is not http_client:
+            if self.config.azure_endpoint:
+                self._client = AsyncAzureOpenAI(
+                    api_version=self.config.api_version,
+                    azure_endpoint=self.config.azure_endpoint,
+                    api_key=self.config.api_key,
+                    max_retries=self.config.max_retries,
+                    http_client=http_client,
+                )
+            else:
+                self._client = AsyncOpenAI(
+                    api_key=self.config.api_key,
+                    base_url=self.config.base_url,
+                    max_retries=self.config.max_retries,
+                    http_client=http_client,
+                )
+            self._http_client = http_client
+        return self._client
     
     def _prepare_messages(self) -> List[Dict[str, Any]]:
         """Prepare messages for API call"""
@@ -59,39 +188,204 @@ class LLMClient:
                 "role": "system",
                 "content": self.system_prompt
             })
-            
-        formatted_messages.extend(self.messages)
+
+        # Keep the history within budget next to the fixed prefix
+        self.last_prompt_estimate = self.history.fit(self._prefix_token_count())
+        formatted_messages.extend(self.history.to_messages())
         return formatted_messages
+
+    def _prefix_token_count(self) -> int:
+        """Tokens of the system prompt and tool schemas, recounted only on change"""
+        self.prefix.tools(self.system_prompt, self.tools)
+        if self.prefix.fingerprint != self._prefix_tokens_key:
+            model = self.config.model
+            self._prefix_tokens = count_tokens(self.system_prompt or "", model)
+            if self.tools:
+                self._prefix_tokens += count_tokens(self.prefix.tools_json, model)
+            self._prefix_tokens_key = self.prefix.fingerprint
+        return self._prefix_tokens
+
+    def _record_usage(self, response: LLMResponse) -> Dict[str, Any]:
+        usage = response.usage
+        entry = {
+            "estimated_prompt_tokens": self.last_prompt_estimate,
+            "prompt_tokens": getattr(usage, "prompt_tokens", None),
+            "completion_tokens": getattr(usage, "completion_tokens", None),
+            "cached_tokens": getattr(
+                getattr(usage, "prompt_tokens_details", None), "cached_tokens", None
+            ),
+            "prefix": self.prefix.fingerprint,
+        }
+        self.usage_log.append(entry)
+        log_payload("llm.usage", **entry)
+        return entry
     
     async def invoke_with_prompt(self, prompt: str) -> LLMResponse:
         """Send a single prompt to the LLM"""
-        self.messages.append({
+        self.history.append({
             "role": "user",
             "content": prompt
         })
         
         return await self.invoke([])
     
-    async def invoke(self, tool_results: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
-        """Invoke the LLM with optional tool results"""
+    def _add_tool_results(self, tool_results: Optional[List[Dict[str, Any]]]):
         if tool_results:
             for result in tool_results:
-                self.messages.append({
+                self.history.append({
                     "role": "tool",
                     "content": str(result.get("output", "")),  # Convert to string and provide default
                     "tool_call_id": result["tool_call_id"]
                 })
-        
-        completion = self.client.chat.completions.create(
+
+    def _completion_kwargs(self) -> Dict[str, Any]:
+        messages = self._prepare_messages()
+        kwargs = dict(
             # To handle Azure OpenAI specific parameters
-            model= self.config.deploy_name if hasattr(self.config, 'azure_endpoint') else self.config.model,
-            messages=self._prepare_messages(),
-            tools=self.tools if self.tools else None,
+            model=self.config.deploy_name if self.config.azure_endpoint else self.config.model,
+            messages=messages,
+            tools=self.prefix.tools(self.system_prompt, self.tools) if self.tools else None,
             temperature=self.config.temperature,
             max_tokens=self.config.max_tokens
         )
-        
+        if self.config.prompt_cache_key:
+            kwargs["prompt_cache_key"] = self.config.prompt_cache_key
+        return kwargs
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Share of prompt tokens served from the provider's prompt cache"""
+        prompt_tokens = sum(entry["prompt_tokens"] or 0 for entry in self.usage_log)
+        cached_tokens = sum(entry["cached_tokens"] or 0 for entry in self.usage_log)
+        return {
+            "requests": len(self.usage_log),
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "cached_ratio": round(cached_tokens / prompt_tokens, 3) if prompt_tokens else 0.0,
+        }
+
+    async def invoke(self, tool_results: Optional[List[Dict[str, Any]]] = None) -> LLMResponse:
+        """Invoke the LLM with optional tool results"""
+        self._add_tool_results(tool_results)
+
+        with metrics.span("llm.request", streamed="false") as span:
+            completion = await self.client.chat.completions.create(**self._completion_kwargs())
+
+            response = LLMResponse(completion)
+            self.history.append(response.get_message())
+            span.set(**self._span_usage(self._record_usage(response)))
+
+        return response
+
+    @staticmethod
+    def _span_usage(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": entry["prompt_tokens"],
+            "completion_tokens": entry["completion_tokens"],
+            "cached_tokens": entry["cached_tokens"],
+        }
+
+    async def stream_with_prompt(self, prompt: str) -> AsyncIterator[StreamEvent]:
+        """Stream the answer to a single prompt"""
+        self.history.append({
+            "role": "user",
+            "content": prompt
+        })
+
+        async for event in self.stream([]):
+            yield event
+
+    async def stream(
+        self, tool_results: Optional[List[Dict[str, Any]]] = None
+    ) -> AsyncIterator[StreamEvent]:
+        """Invoke the LLM with streaming, yielding text deltas and tool call starts.
+
+        The last event is DONE and carries the assembled LLMResponse, which is
+        also appended to the history like invoke() does.
+        """
+        self._add_tool_results(tool_results)
+
+        # Includes the time the consumer spends between deltas
+        with metrics.span("llm.request", streamed="true") as span:
+            async for event in self._stream_completion(span):
+                yield event
+
+    async def _stream_completion(self, span) -> AsyncIterator[StreamEvent]:
+        started = time.perf_counter()
+        stream = await self.client.chat.completions.create(
+            **self._completion_kwargs(),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+
+        content_parts: List[str] = []
+        tool_calls: Dict[int, Dict[str, str]] = {}
+        started = set()  # indexes of tool calls with a TOOL_CALL_START
+        finish_reason = None
+        completion_id, model, usage = "", "", None
+        async for chunk in stream:
+            completion_id = chunk.id or completion_id
+            model = chunk.model or model
+            if chunk.usage:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            finish_reason = choice.finish_reason or finish_reason
+            delta = choice.delta
+            if delta.content:
+                if not content_parts:
+                    span.set(first_token_ms=round((time.perf_counter() - started) * 1000, 1))
+                content_parts.append(delta.content)
+                yield StreamEvent(StreamEvent.TEXT_DELTA, text=delta.content)
+            for tool_call_delta in delta.tool_calls or []:
+                tool_call = tool_calls.setdefault(
+                    tool_call_delta.index, {"id": "", "name": "", "arguments": ""}
+                )
+                if tool_call_delta.id:
+                    tool_call["id"] = tool_call_delta.id
+                function = tool_call_delta.function
+                if function and function.name:
+                    tool_call["name"] += function.name
+                if function and function.arguments:
+                    # The name is complete once its arguments stream in
+                    if tool_call_delta.index not in started:
+                        started.add(tool_call_delta.index)
+                        yield self._tool_call_start(tool_call)
+                    tool_call["arguments"] += function.arguments
+        for index, tool_call in sorted(tool_calls.items()):
+            if index not in started:
+                yield self._tool_call_start(tool_call)
+
+        message = ChatCompletionMessage(
+            role="assistant",
+            content="".join(content_parts) or None,
+            tool_calls=[
+                ChatCompletionMessageFunctionToolCall(
+                    id=tool_call["id"],
+                    type="function",
+                    function=Function(name=tool_call["name"], arguments=tool_call["arguments"]),
+                )
+                for _, tool_call in sorted(tool_calls.items())
+            ] or None,
+        )
+        completion = ChatCompletion(
+            id=completion_id,
+            object="chat.completion",
+            created=int(time.time()),
+            model=model,
+            choices=[Choice(index=0, message=message, finish_reason=finish_reason or "stop")],
+            usage=usage,
+        )
         response = LLMResponse(completion)
-        self.messages.append(response.get_message())
-        
-        return response
\ No newline at end of file
+        self.history.append(response.get_message())
+        span.set(**self._span_usage(self._record_usage(response)))
+
+        yield StreamEvent(StreamEvent.DONE, response=response)
+
+    @staticmethod
+    def _tool_call_start(tool_call: Dict[str, str]) -> StreamEvent:
+        return StreamEvent(
+            StreamEvent.TOOL_CALL_START,
+            tool_name=tool_call["name"],
+            tool_call_id=tool_call["id"],
+        )
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import random
+import re
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+# Longest rendering of one payload field; longer values are cut and hashed
+LOG_PAYLOAD_CHARS = int(os.getenv("LOG_PAYLOAD_CHARS", "500"))
+
+# Long base64 runs (screenshots, binary blobs) are replaced outright
+_BASE64_RUN = re.compile(r"[A-Za-z0-9+/]{200,}={0,2}")
+
+
+def _parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse "llm.completion=0.1,mcp.result=0.01" into a dict"""
+    rates = {}
+    for item in value.split(","):
+        name, sep, rate = item.partition("=")
+        if sep and name.strip():
+            try:
+                rates[name.strip()] = float(rate)
+            except ValueError:
+                logger.warning(f"Ignoring invalid LOG_SAMPLE_RATES entry: {item!r}")
+    return rates
+
+
+# Fraction of payload events that are logged: LOG_SAMPLE_RATE for all,
+# LOG_SAMPLE_RATES for individual events
+DEFAULT_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+SAMPLE_RATES = _parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+
+
+def set_sample_rate(event: Optional[str], rate: float):
+    """Change the sample rate of one event, or the default when event is None"""
+    global DEFAULT_SAMPLE_RATE
+    if event is None:
+        DEFAULT_SAMPLE_RATE = rate
+    else:
+        SAMPLE_RATES[event] = rate
+
+
+def sampled(event: str) -> bool:
+    rate = SAMPLE_RATES.get(event, DEFAULT_SAMPLE_RATE)
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()[:12]
+
+
+class _Raw:
+    """Rendered as-is by repr(), for markers inside clipped payloads"""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __repr__(self) -> str:
+        return self.text
+
+
+class _Clipper:
+    """repr()-like rendering of a payload from at most `budget` characters of its text.
+
+    Strings are cut and containers stop once the budget is spent, so a large
+    tool result or screenshot is never rendered or scanned in full.
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.clipped = False
+
+    def clip(self, value: Any, depth: int = 0) -> Any:
+        if self.budget <= 0:
+            self.clipped = True
+            return _Raw("...")
+        if isinstance(value, str):
+            if len(value) > self.budget:
+                self.clipped = True
+                value = value[:self.budget]
+            self.budget -= len(value)
+            return value
+        if isinstance(value, (bytes, bytearray)):
+            self.budget -= 40
+            return _Raw(summarize(value))
+        if isinstance(value, (int, float, bool)) or value is None:
+            self.budget -= 8
+            return value
+        if depth >= 6:
+            self.clipped = True
+            return _Raw("...")
+        if isinstance(value, dict):
+            body = ", ".join(f"{key!r}: {item!r}" for key, item in self._pairs(value.items(), depth))
+            return _Raw(f"{{{body}{self._more()}}}")
+        if isinstance(value, (list, tuple)):
+            items = [self.clip(item, depth + 1) for item in self._take(value)]
+            body = ", ".join(repr(item) for item in items)
+            if isinstance(value, list):
+                return _Raw(f"[{body}{self._more()}]")
+            return _Raw(f"({body}{',' if len(value) == 1 else self._more()})")
+        fields = getattr(type(value), "model_fields", None)
+        if fields is not None:
+            # pydantic models (MCP results, OpenAI messages), field by field
+            pairs = self._pairs(((name, getattr(value, name, None)) for name in fields), depth)
+            body = ", ".join(f"{name}={item!r}" for name, item in pairs)
+            return _Raw(f"{type(value).__name__}({body}{self._more()})")
+        return self.clip(repr(value), depth)
+
+    def _take(self, items):
+        """Items while budget is left"""
+        for item in items:
+            if self.budget <= 0:
+                self.clipped = True
+                return
+            yield item
+
+    def _pairs(self, items, depth: int) -> List[Any]:
+        return [(self.clip(key, depth + 1), self.clip(item, depth + 1)) for key, item in self._take(items)]
+
+    def _more(self) -> str:
+        return ", ..." if self.budget <= 0 else ""
+
+
+# Input rendered per payload, as a multiple of the output limit; enough for
+# base64 runs to be collapsed before the output is cut
+CLIP_FACTOR = 4
+
+
+def summarize(value: Any, max_chars: Optional[int] = None) -> str:
+    """Bounded rendering of a payload: base64 runs replaced, long text cut and hashed.
+
+    At most CLIP_FACTOR * max_chars characters of input are rendered, so the
+    cost does not grow with the payload; the hash covers that part.
+    """
+    max_chars = LOG_PAYLOAD_CHARS if max_chars is None else max_chars
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes sha1={hashlib.sha1(value).hexdigest()[:12]}>"
+    window = max(max_chars, 1) * CLIP_FACTOR
+    if isinstance(value, str):
+        clipped = len(value) > window
+        size = f"{len(value)} chars"
+        text = value[:window]
+    else:
+        clipper = _Clipper(window)
+        text = repr(clipper.clip(value))
+        clipped = clipper.clipped
+        size = f"{len(text)}+ chars" if clipped else f"{len(text)} chars"
+    text = _BASE64_RUN.sub(lambda m: f"<base64 {len(m.group())} chars>", text)
+    if len(text) <= max_chars and not clipped:
+        return text
+    return f"{text[:max_chars]}... <{size} sha1={_digest(text)}>"
+
+
+def format_fields(fields: Dict[str, Any]) -> str:
+    return " ".join(f"{name}={summarize(value)}" for name, value in fields.items())
+
+
+def log_payload(event: str, level: str = "DEBUG", **fields: Any):
+    """Structured, sampled log line whose fields are only formatted if emitted.
+
+    Nothing is rendered when no sink accepts `level`, so large tool results
+    and completions cost nothing with debug logging off.
+    """
+    if not sampled(event):
+        return
+    logger.opt(lazy=True, depth=1).bind(event=event).log(
+        level, event + " {}", lambda: format_fields(fields)
+    )
@@ -1,54 +1,127 @@
-from typing import Any, List, Optional
-from contextlib import AsyncExitStack
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+from contextlib import asynccontextmanager
 from loguru import logger
 from fastmcp import FastMCP
+from mcp import types
 from mcp.shared.memory import (
     create_connected_server_and_client_session as client_session,
 )
+from .log_utils import log_payload
+from .metrics import metrics
+from .session_pool import MCPSessionPool
+
+# Every pooled session receives the same tools/list_changed notification;
+# repeats within this many seconds are treated as the same change
+TOOLS_CHANGED_WINDOW = 1.0
+
+
+def result_size(result: Any) -> int:
+    """Approximate payload size of a CallToolResult: text plus base64 data"""
+    size = 0
+    for content in getattr(result, "content", None) or []:
+        size += len(getattr(content, "text", None) or getattr(content, "data", None) or "")
+    return size
 
 
 class MCPClient:
     """Client for interacting with MCP servers"""
 
-    def __init__(self, mcp: FastMCP = None, *, server_config=None):
+    def __init__(
+        self,
+        mcp: FastMCP = None,
+        *,
+        server_config=None,
+        pool_size: int = 1,
+        health_check_interval: float = 30.0,
+    ):
         self.mcp = mcp
         self.server_config = server_config
-        self._session = None
-        self._exit_stack: Optional[AsyncExitStack] = None
+        self.pool_size = pool_size
+        self.health_check_interval = health_check_interval
+        self._pool: Optional[MCPSessionPool] = None
+        # Held while connecting on first use, so concurrent first calls share one pool
+        self._connect_lock = asyncio.Lock()
+        self._tools_changed_callbacks: List[Callable[[], None]] = []
+        self._tools_changed_at: Optional[float] = None
+
+    @property
+    def server_identity(self) -> str:
+        """Stable key of the server this client connects to"""
+        if self.mcp:
+            return f"memory:{self.mcp.name}:{id(self.mcp)}"
+        if self.server_config:
+            config = self.server_config
+            return "stdio:" + json.dumps(
+                [config.command, config.args, sorted((config.env or {}).items())]
+            )
+        return "none"
+
+    def on_tools_changed(self, callback: Callable[[], None]):
+        """Call `callback` when the server sends notifications/tools/list_changed.
+
+        Called once per change, not once per pooled session.
+        """
+        if callback not in self._tools_changed_callbacks:
+            self._tools_changed_callbacks.append(callback)
+
+    async def _handle_message(self, message: Any):
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            now = time.monotonic()
+            if self._tools_changed_at is not None and now - self._tools_changed_at < TOOLS_CHANGED_WINDOW:
+                return
+            self._tools_changed_at = now
+            logger.debug("MCP server reported a changed tool list")
+            for callback in self._tools_changed_callbacks:
+                callback()
+
+    @asynccontextmanager
+    async def _open_session(self):
+        """One initialized session; runs inside a pool member's own task"""
+        if self.mcp:
+            # In-memory connection (for in-process FastMCP server). Like
+            # FastMCP's own in-memory transport, every session holds the
+            # server's lifespan, which is reference counted: it starts with
+            # the first session and shuts the server down after the last.
+            async with self.mcp._lifespan_manager():
+                async with client_session(
+                    self.mcp._mcp_server, message_handler=self._handle_message
+                ) as session:
+                    yield session
+        elif self.server_config:
+            # External server via stdio
+            from mcp.client.stdio import stdio_client, StdioServerParameters
+            from mcp import ClientSession
+
+            params = StdioServerParameters(
+                command=self.server_config.command,
+                args=self.server_config.args,
+                env=self.server_config.env,
+            )
+            async with stdio_client(params) as (read_stream, write_stream):
+                async with ClientSession(
+                    read_stream, write_stream, message_handler=self._handle_message
+                ) as session:
+                    await session.initialize()
+                    yield session
+        else:
+            raise ValueError("No MCP server or server_config provided")
 
     async def connect(self):
         """Establishes connection to MCP server"""
-        logger.debug("Connecting to MCP server...")
+        logger.debug(f"Connecting to MCP server with {self.pool_size} sessions...")
         try:
-            self._exit_stack = AsyncExitStack()
-            await self._exit_stack.__aenter__()
-
-            if self.mcp:
-                # In-memory connection (for in-process FastMCP server)
-                self._session = await self._exit_stack.enter_async_context(
-                    client_session(self.mcp._mcp_server)
-                )
-            elif self.server_config:
-                # External server via stdio
-                from mcp.client.stdio import stdio_client, StdioServerParameters
-                from mcp import ClientSession
-
-                params = StdioServerParameters(
-                    command=self.server_config.command,
-                    args=self.server_config.args,
-                    env=self.server_config.env,
-                )
-                read_stream, write_stream = await self._exit_stack.enter_async_context(
-                    stdio_client(params)
-                )
-                session = await self._exit_stack.enter_async_context(
-                    ClientSession(read_stream, write_stream)
-                )
-                await session.initialize()
-                self._session = session
-            else:
-                raise ValueError("No MCP server or server_config provided")
-
+            pool = MCPSessionPool(
+                self._open_session,
+                size=self.pool_size,
+                health_check_interval=self.health_check_interval,
+            )
+            await pool.start()
+            self._pool = pool
             logger.debug("Connected to MCP server successfully")
         except Exception as e:
             logger.error(f"Failed to connect to MCP server: {e}")
@@ -56,41 +129,56 @@ class MCPClient:
 
     async def disconnect(self):
         """Disconnect from MCP server"""
-        if self._exit_stack:
-            await self._exit_stack.aclose()
-            self._exit_stack = None
-            self._session = None
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
             logger.debug("Disconnected from MCP server")
 
+    @asynccontextmanager
+    async def _lease(self, session_key: Optional[str] = None):
+        # Connect on first use instead of opening a session per operation
+        if self._pool is None:
+            async with self._connect_lock:
+                if self._pool is None:
+                    await self.connect()
+        async with self._pool.lease(session_key) as session:
+            yield session
+
     async def get_available_tools(self) -> List[Any]:
         """List available tools"""
         logger.debug("Requesting available tools from MCP server")
         try:
-            if self._session:
-                tools = await self._session.list_tools()
-                logger.debug(f"Received tools from MCP server: {tools}")
-                return tools
-            # Fallback: per-operation session (backward compat for in-memory)
-            async with client_session(self.mcp._mcp_server) as client:
-                tools = await client.list_tools()
-                logger.debug(f"Received tools from MCP server: {tools}")
-                return tools
+            async with self._lease() as session:
+                tools = await session.list_tools()
+            log_payload("mcp.tools", count=len(getattr(tools, "tools", tools)))
+            return tools
         except Exception as e:
             logger.error(f"Failed to get available tools: {e}")
             raise
 
-    async def call_tool(self, tool_name: str, arguments: dict) -> Any:
-        """Call a tool with given arguments"""
+    async def call_tool(
+        self,
+        tool_name: str,
+        arguments: dict,
+        meta: Optional[Dict[str, Any]] = None,
+        session_key: Optional[str] = None,
+    ) -> Any:
+        """Call a tool with given arguments and optional request _meta.
+
+        Calls with the same `session_key` go to the same pooled session. The
+        current metrics turn is sent as `bridge_turn` meta, so an in-process
+        server records its spans into that turn.
+        """
+        turn_id = metrics.current_turn_id()
+        if turn_id:
+            meta = {**(meta or {}), "bridge_turn": turn_id}
         try:
-            if self._session:
-                result = await self._session.call_tool(tool_name, arguments=arguments)
-                logger.debug(f"Tool result: {result}")
-                return result
-            # Fallback: per-operation session (backward compat for in-memory)
-            async with client_session(self.mcp._mcp_server) as client:
-                result = await client.call_tool(tool_name, arguments=arguments)
-                logger.debug(f"Tool result: {result}")
-                return result
+            with metrics.span("mcp.call_tool", tool=tool_name) as span:
+                async with self._lease(session_key) as session:
+                    result = await session.call_tool(tool_name, arguments=arguments, meta=meta)
+                span.set(result_bytes=result_size(result))
+            log_payload("mcp.result", tool=tool_name, result=result)
+            return result
         except Exception as e:
             logger.error(f"Failed to call tool '{tool_name}': {e}")
             raise
@@ -0,0 +1,270 @@
+import contextvars
+import itertools
+import json
+import os
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus layout"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Bucket upper bound below which a fraction q of observations fall"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class Span:
+    """A timed operation with numeric or text attributes"""
+
+    def __init__(self, name: str, labels: Dict[str, str]):
+        self.name = name
+        self.labels = labels
+        self.attributes: Dict[str, Any] = {}
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.duration = 0.0
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any):
+        self.attributes.update(
+            {name: value for name, value in attributes.items() if value is not None}
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(self.duration * 1000, 3),
+            "labels": self.labels,
+            "attributes": self.attributes,
+        }
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+_turn_ids = itertools.count(1)
+
+
+class TurnTimings:
+    """Spans recorded while handling one bridge turn"""
+
+    def __init__(self, parent: Optional["TurnTimings"] = None):
+        self.id = f"{os.getpid()}-{next(_turn_ids)}"
+        self.parent = parent  # enclosing turn, which sees these spans too
+        self.start = time.perf_counter()
+        self.total = 0.0
+        self.spans: List[Span] = []
+
+    def finish(self):
+        self.total = time.perf_counter() - self.start
+
+    def breakdown(self) -> Dict[str, Any]:
+        """Time and attribute totals per span name"""
+        by_name: Dict[str, Dict[str, Any]] = {}
+        for span in self.spans:
+            summary = by_name.setdefault(span.name, {"count": 0, "ms": 0.0})
+            summary["count"] += 1
+            summary["ms"] += span.duration * 1000
+            for name, value in span.attributes.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    summary[name] = summary.get(name, 0) + value
+        for summary in by_name.values():
+            summary["ms"] = round(summary["ms"], 1)
+        return {"total_ms": round(self.total * 1000, 1), "spans": by_name}
+
+
+_current_turn: contextvars.ContextVar[Optional[TurnTimings]] = contextvars.ContextVar(
+    "current_turn", default=None
+)
+
+
+class MetricsRegistry:
+    """Span latencies and attribute totals of this process.
+
+    Every span feeds a histogram per (span, labels) and counters for its
+    numeric attributes; spans inside a `turn()` are also collected for the
+    per-turn breakdown. With METRICS_EXPORT_PATH set, each span is appended
+    to that file as one JSON line.
+    """
+
+    def __init__(self, export_path: Optional[str] = None, prefix: str = "mcp_bridge"):
+        self.prefix = prefix
+        self.export_path = export_path
+        self._histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._totals: Dict[Tuple[str, LabelKey, str], float] = {}
+        self._errors: Dict[Tuple[str, LabelKey], int] = {}
+        # Open turns by id, for work that runs outside the turn's own tasks
+        self._turns: "weakref.WeakValueDictionary[str, TurnTimings]" = weakref.WeakValueDictionary()
+
+    @contextmanager
+    def span(self, name: str, **labels: str):
+        span = Span(name, {key: str(value) for key, value in labels.items()})
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - span._started
+            self.record(span)
+
+    def record(self, span: Span):
+        key = (span.name, tuple(sorted(span.labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        histogram.observe(span.duration)
+        for attribute, value in span.attributes.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                total_key = (span.name, key[1], attribute)
+                self._totals[total_key] = self._totals.get(total_key, 0) + value
+        if span.error:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+        turn = _current_turn.get()
+        while turn is not None:
+            turn.spans.append(span)
+            turn = turn.parent
+        if self.export_path:
+            self._export(span)
+
+    def _export(self, span: Span):
+        try:
+            with open(self.export_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Disabling span export to {self.export_path}: {e}")
+            self.export_path = None
+
+    @contextmanager
+    def turn(self):
+        """Collect the spans of one turn, including those of tasks it starts.
+
+        Turns nest: an enclosing turn also collects the spans of inner ones.
+        Long-lived tasks (pooled MCP sessions) must be started outside any
+        turn, see `resume()` for handing a turn to them.
+        """
+        timings = TurnTimings(_current_turn.get())
+        self._turns[timings.id] = timings
+        token = _current_turn.set(timings)
+        try:
+            yield timings
+        finally:
+            timings.finish()
+            _current_turn.reset(token)
+            self._turns.pop(timings.id, None)
+
+    @staticmethod
+    def current_turn_id() -> Optional[str]:
+        turn = _current_turn.get()
+        return turn.id if turn else None
+
+    @contextmanager
+    def resume(self, turn_id: Optional[str]):
+        """Collect spans into an open turn of this process, e.g. from a server
+        task that handles a request sent during that turn; a no-op otherwise"""
+        timings = self._turns.get(turn_id) if turn_id else None
+        if timings is None:
+            yield None
+            return
+        token = _current_turn.set(timings)
+        try:
+            yield timings
+        finally:
+            _current_turn.reset(token)
+
+    def reset(self):
+        self._histograms.clear()
+        self._totals.clear()
+        self._errors.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Count, mean and approximate p50/p99 in milliseconds per span"""
+        result = {}
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            label_text = ",".join(f"{key}={value}" for key, value in labels)
+            result[f"{name}{{{label_text}}}" if label_text else name] = {
+                "count": histogram.count,
+                "mean_ms": round(histogram.sum / histogram.count * 1000, 1),
+                "p50_ms": histogram.quantile(0.5) * 1000,
+                "p99_ms": histogram.quantile(0.99) * 1000,
+            }
+        return result
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        latency = f"{self.prefix}_span_duration_seconds"
+        totals = f"{self.prefix}_span_attribute_total"
+        errors = f"{self.prefix}_span_errors_total"
+
+        lines = [
+            f"# HELP {latency} Duration of instrumented operations",
+            f"# TYPE {latency} histogram",
+        ]
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            series = {"span": name, **dict(labels)}
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f"{latency}_bucket{_labels({**series, 'le': repr(bound)})} {cumulative}")
+            lines.append(f"{latency}_bucket{_labels({**series, 'le': '+Inf'})} {histogram.count}")
+            lines.append(f"{latency}_sum{_labels(series)} {histogram.sum:.6f}")
+            lines.append(f"{latency}_count{_labels(series)} {histogram.count}")
+
+        lines += [
+            f"# HELP {totals} Sum of numeric span attributes (tokens, bytes)",
+            f"# TYPE {totals} counter",
+        ]
+        for (name, labels, attribute), value in sorted(self._totals.items()):
+            series = {"span": name, **dict(labels), "attribute": attribute}
+            lines.append(f"{totals}{_labels(series)} {value:g}")
+
+        lines += [
+            f"# HELP {errors} Instrumented operations that raised",
+            f"# TYPE {errors} counter",
+        ]
+        for (name, labels), value in sorted(self._errors.items()):
+            lines.append(f"{errors}{_labels({'span': name, **dict(labels)})} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+# Shared by the bridge, the LLM and MCP clients and the in-process server
+metrics = MetricsRegistry(export_path=os.getenv("METRICS_EXPORT_PATH") or None)
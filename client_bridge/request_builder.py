@@ -0,0 +1,64 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+
+def canonicalize(value: Any) -> Any:
+    """Copy of a JSON value with dict keys in sorted order at every level"""
+    if isinstance(value, dict):
+        return {key: canonicalize(value[key]) for key in sorted(value)}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(item) for item in value]
+    return value
+
+
+class PromptPrefix:
+    """Byte-stable system prompt and tool list for provider-side prompt caching.
+
+    Providers cache the longest previously seen prompt prefix, so the system
+    prompt and tool schemas must serialize identically on every request. Tools
+    are sorted by name with canonical key order, and the result is reused
+    until the tools actually change.
+    """
+
+    def __init__(self):
+        self._source_tools: Optional[List[Dict[str, Any]]] = None
+        self._source_len = 0
+        self._tools: List[Dict[str, Any]] = []
+        self._tools_json = "[]"
+        self._system_prompt: Optional[str] = None
+        self.fingerprint = ""
+
+    def _refresh(self, system_prompt: Optional[str], tools: List[Dict[str, Any]]):
+        changed = system_prompt != self._system_prompt or not self.fingerprint
+        if tools is not self._source_tools or len(tools) != self._source_len:
+            stable_tools = sorted(
+                (canonicalize(tool) for tool in tools),
+                key=lambda tool: tool.get("function", {}).get("name", ""),
+            )
+            tools_json = json.dumps(stable_tools, separators=(",", ":"))
+            # A rebuilt but identical list keeps the previous objects
+            if tools_json != self._tools_json:
+                self._tools = stable_tools
+                self._tools_json = tools_json
+                changed = True
+            self._source_tools = tools
+            self._source_len = len(tools)
+
+        if changed:
+            self._system_prompt = system_prompt
+            digest = hashlib.sha256()
+            digest.update((system_prompt or "").encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(self._tools_json.encode("utf-8"))
+            self.fingerprint = digest.hexdigest()[:16]
+
+    def tools(self, system_prompt: Optional[str], tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Stable tool list for a request"""
+        self._refresh(system_prompt, tools)
+        return self._tools
+
+    @property
+    def tools_json(self) -> str:
+        """Compact serialized tool list, used for token counting"""
+        return self._tools_json
@@ -0,0 +1,195 @@
+import asyncio
+import contextvars
+import zlib
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager, Callable, List, Optional, Set
+from loguru import logger
+from mcp import ClientSession
+
+SessionFactory = Callable[[], AsyncContextManager[ClientSession]]
+
+
+class PooledSession:
+    """One MCP session kept open by a dedicated background task.
+
+    MCP transports are anyio task groups that must be entered and exited in
+    the same task, so the session lives in `_run` and callers only borrow it.
+    """
+
+    def __init__(self, index: int, open_session: SessionFactory):
+        self.index = index
+        self.open_session = open_session
+        self.session: Optional[ClientSession] = None
+        self.in_flight = 0
+        self.restarts = 0
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self):
+        self._ready.clear()
+        self._stop.clear()
+        self._error = None
+        # A fresh context: the session outlives whichever call (re)started it,
+        # so it must not keep that caller's metrics turn or other context
+        self._task = asyncio.create_task(
+            self._run(), name=f"mcp-session-{self.index}", context=contextvars.Context()
+        )
+        await self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self):
+        try:
+            async with self.open_session() as session:
+                self.session = session
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self._error = e
+            if self.session is not None:
+                logger.warning(f"MCP session {self.index} closed: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def stop(self, timeout: float = 5.0):
+        if self._task is None:
+            return
+        self._stop.set()
+        # asyncio.wait() never raises the task's own outcome, e.g. when the
+        # member task was already cancelled
+        done, _ = await asyncio.wait({self._task}, timeout=timeout)
+        if not done:
+            logger.warning(f"MCP session {self.index} did not close in {timeout}s, cancelling")
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def restart(self):
+        await self.stop()
+        self.restarts += 1
+        await self.start()
+
+    async def ping(self, timeout: float) -> bool:
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"MCP session {self.index} failed health check: {e!r}")
+            return False
+
+
+class MCPSessionPool:
+    """N warm MCP sessions leased to concurrent callers.
+
+    Callers with a key (e.g. a conversation id) always get the same member,
+    so stateful servers such as the browser keep their state per caller;
+    unkeyed callers get the least busy member. Sessions multiplex requests,
+    so a lease is shared rather than exclusive. A background task pings every
+    member and restarts the ones whose transport or subprocess died.
+    """
+
+    def __init__(
+        self,
+        open_session: SessionFactory,
+        size: int = 1,
+        health_check_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+    ):
+        self.size = max(1, size)
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+        self.members: List[PooledSession] = [
+            PooledSession(index, open_session) for index in range(self.size)
+        ]
+        self._restart_locks = [asyncio.Lock() for _ in self.members]
+        self._health_task: Optional[asyncio.Task] = None
+        self._healing: Set[asyncio.Task] = set()
+
+    async def start(self):
+        results = await asyncio.gather(
+            *(member.start() for member in self.members), return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await self.close()
+            raise errors[0]
+        if self.health_check_interval:
+            self._health_task = asyncio.create_task(self._health_loop(), context=contextvars.Context())
+        logger.debug(f"Started {self.size} MCP sessions")
+
+    async def close(self):
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for task in self._healing:
+            task.cancel()
+        await asyncio.gather(*self._healing, return_exceptions=True)
+        await asyncio.gather(*(member.stop() for member in self.members))
+
+    def _pick(self, key: Optional[str]) -> PooledSession:
+        if key is not None:
+            return self.members[zlib.crc32(key.encode("utf-8")) % self.size]
+        return min(self.members, key=lambda member: member.in_flight)
+
+    async def _ensure_alive(self, member: PooledSession):
+        async with self._restart_locks[member.index]:
+            if not member.alive:
+                logger.info(f"Restarting MCP session {member.index}")
+                await member.restart()
+
+    @asynccontextmanager
+    async def lease(self, key: Optional[str] = None):
+        """Borrow a live session for the duration of the block"""
+        member = self._pick(key)
+        await self._ensure_alive(member)
+        member.in_flight += 1
+        try:
+            yield member.session
+        except Exception:
+            # A dead transport surfaces as an exception; heal it in the
+            # background, without the failed request's context
+            task = asyncio.create_task(self._heal(member), context=contextvars.Context())
+            self._healing.add(task)
+            task.add_done_callback(self._healing.discard)
+            raise
+        finally:
+            member.in_flight -= 1
+
+    async def _heal(self, member: PooledSession):
+        """Restart a member unless it still answers a ping"""
+        try:
+            async with self._restart_locks[member.index]:
+                if await member.ping(self.ping_timeout):
+                    return
+                logger.info(f"Restarting MCP session {member.index}")
+                await member.restart()
+        except Exception as e:
+            logger.error(f"Failed to restart MCP session {member.index}: {e}")
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for member in self.members:
+                if member.in_flight == 0:
+                    await self._heal(member)
+
+    def stats(self):
+        return [
+            {
+                "index": member.index,
+                "alive": member.alive,
+                "in_flight": member.in_flight,
+                "restarts": member.restarts,
+            }
+            for member in self.members
+        ]
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from loguru import logger
+from .llm_client import LLMClient
+
+
+class Conversation:
+    """History and LLM client of one user session on a shared bridge"""
+
+    def __init__(self, session_id: str, llm_client: LLMClient, pinned: bool = False):
+        self.session_id = session_id
+        self.llm_client = llm_client
+        self.pinned = pinned  # never evicted
+        # Serializes turns: a second message waits for the current one
+        self.lock = asyncio.Lock()
+        self.leases = 0
+        self.last_used = time.monotonic()
+        self.last_turn: Optional[Dict[str, Any]] = None  # timing breakdown
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+
+class ConversationPool:
+    """Conversations keyed by session id, capped at `max_sessions`.
+
+    Conversations idle for longer than `idle_timeout` seconds are dropped.
+    When the cap is reached the least recently used idle conversation is
+    evicted; if every conversation is busy, new sessions wait for one.
+    Pinned conversations are neither counted nor evicted.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], LLMClient],
+        max_sessions: int = 100,
+        idle_timeout: float = 1800.0,
+    ):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._conversations: Dict[str, Conversation] = {}
+        self._changed = asyncio.Condition()
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def __iter__(self) -> Iterator[Conversation]:
+        return iter(list(self._conversations.values()))
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._conversations
+
+    def get(self, session_id: str) -> Optional[Conversation]:
+        return self._conversations.get(session_id)
+
+    def add(self, conversation: Conversation):
+        """Register an existing conversation, e.g. a pinned default session"""
+        self._conversations[conversation.session_id] = conversation
+
+    async def acquire(self, session_id: str) -> Conversation:
+        async with self._changed:
+            self._evict_idle_locked()
+            conversation = self._conversations.get(session_id)
+            while conversation is None and self._evictable_count() >= self.max_sessions:
+                if not self._evict_lru_locked():
+                    await self._changed.wait()
+                conversation = self._conversations.get(session_id)
+
+            if conversation is None:
+                conversation = Conversation(session_id, self.factory(session_id))
+                self._conversations[session_id] = conversation
+                logger.debug(
+                    f"Opened conversation {session_id} "
+                    f"({self._evictable_count()}/{self.max_sessions})"
+                )
+
+            conversation.leases += 1
+            conversation.touch()
+            return conversation
+
+    async def release(self, conversation: Conversation):
+        async with self._changed:
+            conversation.leases = max(0, conversation.leases - 1)
+            conversation.touch()
+            self._changed.notify_all()
+
+    @asynccontextmanager
+    async def session(self, session_id: str):
+        """Hold a conversation, one turn at a time, for the duration of the block"""
+        conversation = await self.acquire(session_id)
+        try:
+            async with conversation.lock:
+                yield conversation
+        finally:
+            await self.release(conversation)
+
+    async def close_session(self, session_id: str) -> bool:
+        """Forget a conversation; returns False if it is unknown or busy"""
+        async with self._changed:
+            conversation = self._conversations.get(session_id)
+            if conversation is None or conversation.leases:
+                return False
+            del self._conversations[session_id]
+            self._changed.notify_all()
+            return True
+
+    async def evict_idle(self) -> int:
+        async with self._changed:
+            return self._evict_idle_locked()
+
+    def _evictable_count(self) -> int:
+        # Pinned conversations do not count against the cap
+        return sum(1 for c in self._conversations.values() if not c.pinned)
+
+    def _evict_idle_locked(self) -> int:
+        now = time.monotonic()
+        expired = [
+            conversation.session_id
+            for conversation in self._conversations.values()
+            if not conversation.pinned
+            and conversation.leases == 0
+            and now - conversation.last_used > self.idle_timeout
+        ]
+        for session_id in expired:
+            del self._conversations[session_id]
+        if expired:
+            logger.debug(f"Evicted {len(expired)} idle conversations")
+            self._changed.notify_all()
+        return len(expired)
+
+    def _evict_lru_locked(self) -> bool:
+        idle = [
+            conversation
+            for conversation in self._conversations.values()
+            if not conversation.pinned and conversation.leases == 0
+        ]
+        if not idle:
+            return False
+        lru = min(idle, key=lambda conversation: conversation.last_used)
+        del self._conversations[lru.session_id]
+        logger.debug(f"Evicted least recently used conversation {lru.session_id}")
+        return True
@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import json
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from loguru import logger
+
+
+def schema_hash(tools: List[Any]) -> str:
+    """Hash of the tool names, descriptions, schemas and annotations"""
+    payload = [
+        tool.model_dump(mode="json", exclude_none=True) if hasattr(tool, "model_dump") else tool
+        for tool in tools
+    ]
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CatalogEntry:
+    """MCP tools of one server and their OpenAI function-calling form"""
+
+    def __init__(
+        self,
+        mcp_tools: List[Any],
+        openai_tools: List[Dict[str, Any]],
+        name_mapping: Dict[str, str],
+        read_only_tools: Set[str],
+        schema_hash: str,
+    ):
+        self.mcp_tools = mcp_tools
+        self.openai_tools = openai_tools
+        self.name_mapping = name_mapping  # OpenAI tool name -> MCP tool name
+        self.read_only_tools = read_only_tools  # MCP tool names
+        self.schema_hash = schema_hash
+
+
+class ToolCatalog:
+    """Converted tool lists shared by every bridge in the process.
+
+    Entries are keyed by server identity and kept until the server sends
+    notifications/tools/list_changed. A reload that yields the same schema
+    hash keeps the existing entry, so the prompt prefix stays identical.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._stale: Dict[str, CatalogEntry] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._generations: Dict[str, int] = {}
+        self._listeners: Dict[str, List[weakref.WeakMethod]] = {}
+        self.hits = 0
+        self.loads = 0
+
+    def get(self, identity: str) -> Optional[CatalogEntry]:
+        return self._entries.get(identity)
+
+    def subscribe(self, identity: str, callback: Callable[[CatalogEntry], None]):
+        """Call a bound method with each newly loaded entry of a server.
+
+        Bridges subscribe so that a reload triggered by one of them updates
+        all; the reference is weak, so discarded bridges drop out.
+        """
+        listeners = self._listeners.setdefault(identity, [])
+        listeners[:] = [ref for ref in listeners if ref() is not None]
+        if not any(ref() == callback for ref in listeners):
+            listeners.append(weakref.WeakMethod(callback))
+
+    def _notify(self, identity: str, entry: CatalogEntry):
+        for ref in list(self._listeners.get(identity, [])):
+            callback = ref()
+            if callback is not None:
+                callback(entry)
+
+    def invalidate(self, identity: str):
+        entry = self._entries.pop(identity, None)
+        if entry is not None:
+            self._stale[identity] = entry
+        self._generations[identity] = self._generations.get(identity, 0) + 1
+        logger.debug(f"Tool catalog invalidated for {identity}")
+
+    async def load(
+        self,
+        identity: str,
+        fetch: Callable[[], Awaitable[List[Any]]],
+        convert: Callable[[List[Any], str], CatalogEntry],
+    ) -> CatalogEntry:
+        """Cached entry of a server, fetching and converting its tools on a miss"""
+        entry = self._entries.get(identity)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        lock = self._locks.setdefault(identity, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(identity)
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+            generation = self._generations.get(identity, 0)
+            mcp_tools = await fetch()
+            digest = schema_hash(mcp_tools)
+            stale = self._stale.pop(identity, None)
+            if stale is not None and stale.schema_hash == digest:
+                entry = stale
+            else:
+                entry = convert(mcp_tools, digest)
+            self.loads += 1
+            # A list_changed notification during the fetch makes this result stale
+            if self._generations.get(identity, 0) == generation:
+                self._entries[identity] = entry
+            logger.debug(f"Tool catalog loaded {len(mcp_tools)} tools for {identity}")
+        self._notify(identity, entry)
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        return {"servers": len(self._entries), "hits": self.hits, "loads": self.loads}
+
+
+# Shared by all bridges of the process
+tool_catalog = ToolCatalog()
@@ -3,6 +3,7 @@ import asyncio
 from dotenv import load_dotenv
 from client_bridge.config import BridgeConfig, LLMConfig
 from client_bridge.bridge import BridgeManager
+from client_bridge.llm_client import StreamEvent
 from server.browser_navigator_server import BrowserNavigationServer
 from loguru import logger
 
@@ -34,8 +35,13 @@ async def main():
                 if user_input.lower() in ['quit', 'exit', 'q']:
                     break
                     
-                response = await bridge.process_message(user_input)
-                print(f"\nResponse: {response}")
+                print("\nResponse: ", end="", flush=True)
+                async for event in bridge.stream_message(user_input):
+                    if event.type == StreamEvent.TEXT_DELTA:
+                        print(event.text, end="", flush=True)
+                    elif event.type == StreamEvent.TOOL_CALL_START:
+                        print(f"\n[Calling {event.tool_name}]", flush=True)
+                print()
                 
             except KeyboardInterrupt:
                 logger.info("\nExiting...")
@@ -0,0 +1,179 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel
+from client_bridge.metrics import metrics
+from server.waits import SMART, SmartWait
+
+DEFAULT_SMART_WAIT = SmartWait()
+
+
+class BrowserAction(BaseModel):
+    """One step of a playwright_batch call"""
+    action: Literal["navigate", "click", "fill", "select", "hover", "press", "wait_for"]
+    selector: Optional[str] = None
+    value: Optional[str] = None  # fill/select value, or key for press
+    url: Optional[str] = None  # navigate only
+    timeout: Optional[float] = None  # milliseconds, Playwright default when unset
+    wait_until: Optional[str] = None  # overrides the batch's wait_until for this step
+
+
+async def navigate(
+    page,
+    url: str,
+    timeout: Optional[float] = 30000,
+    wait_until: str = "load",
+    smart_wait: Optional[SmartWait] = None,
+) -> str:
+    with metrics.span("browser.navigate", wait_until=wait_until):
+        if wait_until == SMART:
+            report = await (smart_wait or DEFAULT_SMART_WAIT).goto(page, url, timeout)
+            return f"Navigated to {url} ({report})"
+        await page.goto(url, timeout=timeout, wait_until=wait_until)
+    return f"Navigated to {url} with {wait_until} wait"
+
+
+async def after_action(
+    page, message: str, wait_until: Optional[str], smart_wait: Optional[SmartWait] = None
+) -> str:
+    """Optionally wait for the effects of an interaction.
+
+    "smart" waits for the DOM and network to settle, a load state
+    ("load", "domcontentloaded", "networkidle") waits for that state, and
+    None or "none" returns as soon as the action is done.
+    """
+    if wait_until in (None, "none"):
+        return message
+    if wait_until == SMART:
+        report = await (smart_wait or DEFAULT_SMART_WAIT).settle(page)
+        return f"{message} ({report})"
+    await page.wait_for_load_state(wait_until)
+    return f"{message} with {wait_until} wait"
+
+
+# Locator actions wait until the element is attached, visible, stable and
+# enabled, so no separate wait_for_selector lookup is needed beforehand.
+# `.first` keeps the non-strict behavior of the page-level methods.
+
+
+async def click(
+    page,
+    selector: str,
+    timeout: Optional[float] = None,
+    wait_until: Optional[str] = None,
+    smart_wait: Optional[SmartWait] = None,
+) -> str:
+    await page.locator(selector).first.click(timeout=timeout)
+    return await after_action(page, f"Clicked on {selector}", wait_until, smart_wait)
+
+
+async def fill(
+    page,
+    selector: str,
+    value: str,
+    timeout: Optional[float] = None,
+    wait_until: Optional[str] = None,
+    smart_wait: Optional[SmartWait] = None,
+) -> str:
+    await page.locator(selector).first.fill(value, timeout=timeout)
+    return await after_action(page, f"Filled {selector} with {value}", wait_until, smart_wait)
+
+
+async def select(
+    page,
+    selector: str,
+    value: str,
+    timeout: Optional[float] = None,
+    wait_until: Optional[str] = None,
+    smart_wait: Optional[SmartWait] = None,
+) -> str:
+    await page.locator(selector).first.select_option(value, timeout=timeout)
+    return await after_action(page, f"Selected {value} in {selector}", wait_until, smart_wait)
+
+
+async def hover(
+    page,
+    selector: str,
+    timeout: Optional[float] = None,
+    wait_until: Optional[str] = None,
+    smart_wait: Optional[SmartWait] = None,
+) -> str:
+    await page.locator(selector).first.hover(timeout=timeout)
+    return await after_action(page, f"Hovered over {selector}", wait_until, smart_wait)
+
+
+async def press(
+    page,
+    selector: str,
+    key: str,
+    timeout: Optional[float] = None,
+    wait_until: Optional[str] = None,
+    smart_wait: Optional[SmartWait] = None,
+) -> str:
+    await page.locator(selector).first.press(key, timeout=timeout)
+    return await after_action(page, f"Pressed {key} on {selector}", wait_until, smart_wait)
+
+
+async def wait_for(page, selector: str, timeout: Optional[float] = None) -> str:
+    await page.wait_for_selector(selector, timeout=timeout)
+    return f"Found {selector}"
+
+
+def _require(action: BrowserAction, *fields: str):
+    missing = [field for field in fields if getattr(action, field) is None]
+    if missing:
+        raise ValueError(f"'{action.action}' requires {', '.join(missing)}")
+
+
+async def run_action(
+    page,
+    action: BrowserAction,
+    wait_until: Optional[str] = None,
+    smart_wait: Optional[SmartWait] = None,
+) -> str:
+    """Execute one BrowserAction and describe what was done.
+
+    `wait_until` applies to steps that do not set their own; navigation
+    falls back to "load" when neither is set.
+    """
+    wait_until = action.wait_until or wait_until
+    if action.action == "navigate":
+        _require(action, "url")
+        return await navigate(
+            page, action.url, action.timeout or 30000, wait_until or "load", smart_wait
+        )
+
+    _require(action, "selector")
+    if action.action == "click":
+        return await click(page, action.selector, action.timeout, wait_until, smart_wait)
+    if action.action == "hover":
+        return await hover(page, action.selector, action.timeout, wait_until, smart_wait)
+    if action.action == "wait_for":
+        return await wait_for(page, action.selector, action.timeout)
+
+    _require(action, "value")
+    if action.action == "fill":
+        return await fill(page, action.selector, action.value, action.timeout, wait_until, smart_wait)
+    if action.action == "select":
+        return await select(page, action.selector, action.value, action.timeout, wait_until, smart_wait)
+    return await press(page, action.selector, action.value, action.timeout, wait_until, smart_wait)
+
+
+async def run_actions(
+    page,
+    actions: List[BrowserAction],
+    stop_on_error: bool = True,
+    wait_until: Optional[str] = None,
+    smart_wait: Optional[SmartWait] = None,
+) -> List[str]:
+    """Execute actions in order, one result line per step"""
+    results = []
+    for index, action in enumerate(actions, start=1):
+        try:
+            results.append(f"{index}. {await run_action(page, action, wait_until, smart_wait)}")
+        except Exception as e:
+            results.append(f"{index}. Failed to {action.action}: {e}")
+            if stop_on_error:
+                skipped = len(actions) - index
+                if skipped:
+                    results.append(f"Stopped after step {index}; {skipped} remaining steps skipped")
+                break
+    return results
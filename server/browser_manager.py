@@ -1,37 +1,404 @@
-from playwright.async_api import async_playwright
+import asyncio
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+from playwright.async_api import async_playwright, BrowserContext, Page
+from client_bridge.log_utils import log_payload
+from client_bridge.metrics import metrics
+from server.config import BrowserConfig, get_default_browser_config
+from server.console_log import ConsoleLogBuffer
+from server.request_blocking import BlockPolicy, BlockStats
+from server.response_cache import ResponseCache
+from server.waits import SMART, SmartWait, track_network
+
+
+class PooledContext:
+    """An isolated BrowserContext/Page pair owned by one session"""
+
+    def __init__(self, session_id: str, context: BrowserContext, page: Page):
+        self.session_id = session_id
+        self.context = context
+        self.page = page
+        self.leases = 0
+        self.last_used = time.monotonic()
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+
+class ContextNetwork:
+    """Request routing state of one BrowserContext"""
+
+    def __init__(self, policy: BlockPolicy):
+        # Server-level policy; never replaced by per-call overrides
+        self.policy = policy
+        self.routed = False
+        # Per-call stats collectors and their optional policy overrides, in
+        # the order the calls started, see BrowserManager.block_requests()
+        self.listeners: List[BlockStats] = []
+        self.overrides: List[Tuple[BlockStats, BlockPolicy]] = []
+
+    def active_policy(self) -> BlockPolicy:
+        """The override of the most recent call that set one, else the base policy"""
+        return self.overrides[-1][1] if self.overrides else self.policy
+
 
 class BrowserManager:
-    def __init__(self):
+    def __init__(self, config: Optional[BrowserConfig] = None):
+        self.config = config or get_default_browser_config()
         self._playwright = None
         self.browser = None
         self.page = None
-        self.console_logs = []
+        self.console = ConsoleLogBuffer(self.config.console_buffer_size)
+        self.smart_wait = SmartWait(
+            dom_quiet_ms=self.config.smart_wait_dom_quiet_ms,
+            network_idle_ms=self.config.smart_wait_network_idle_ms,
+            max_ms=self.config.smart_wait_max_ms,
+        )
+        self.startup_seconds: Optional[float] = None
+        self._launch_lock = asyncio.Lock()
+        # Session id -> isolated context, only used when max_contexts > 0
+        self._contexts: Dict[str, PooledContext] = {}
+        self._pool_changed = asyncio.Condition()
+        self.default_block_policy = BlockPolicy.from_names(
+            [*self.config.blocked_resource_types, *self.config.blocked_url_patterns]
+        )
+        self.network_stats = BlockStats()
+        self._networks: Dict[BrowserContext, ContextNetwork] = {}
+        if self.config.har_path and self.config.har_mode not in ("record", "replay"):
+            raise ValueError(f"Unknown HAR mode: {self.config.har_mode}")
+        # Recording contexts -> the HAR file each writes when it closes, see _merge_har()
+        self._recordings: Dict[BrowserContext, Path] = {}
+        self._har_parts_dir: Optional[Path] = None
+        self._har_started = False
+        self.response_cache = (
+            ResponseCache(self.config.cache_dir, self.config.cache_max_bytes)
+            if self.config.cache_dir and not self.config.har_path
+            else None
+        )
 
-    async def ensure_browser(self):
+    @property
+    def pooled(self) -> bool:
+        """Whether sessions get their own isolated browser contexts"""
+        return self.config.max_contexts > 0
+
+    async def _ensure_launched(self):
         if not self.browser:
-            self._playwright = await async_playwright().start()
-            self.browser = await self._playwright.chromium.launch(headless=False)
+            started = time.perf_counter()
+            with metrics.span("browser.launch", browser=self.config.browser_type):
+                self._playwright = await async_playwright().start()
+                browser_type = getattr(self._playwright, self.config.browser_type)
+                self.browser = await browser_type.launch(
+                    headless=self.config.headless,
+                    args=self.config.args,
+                )
+            self.startup_seconds = time.perf_counter() - started
+            logger.info(
+                f"Launched {self.config.browser_type} "
+                f"(headless={self.config.headless}) in {self.startup_seconds:.2f}s"
+            )
+
+    def _recording_path(self, label: Optional[str]) -> Path:
+        """Temporary HAR file of one recording context, merged into har_path on close"""
+        if self._har_parts_dir is None:
+            self._har_parts_dir = Path(tempfile.mkdtemp(prefix="mcp-har-"))
+        safe_label = re.sub(r"[^A-Za-z0-9_.-]", "_", label or "shared")
+        return self._har_parts_dir / f"{safe_label}-{len(self._recordings)}-{time.monotonic_ns()}.har"
+
+    def _merge_har(self, part: Path):
+        """Append the entries of a closed context's recording to har_path.
+
+        Every context of a run (shared page, pooled sessions, crawl workers)
+        ends up in the one configured file, which replay then serves to all
+        of them. The first merge of a run replaces an older file.
+        """
+        try:
+            recorded = json.loads(part.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable HAR recording {part.name}: {e}")
+            return
+        finally:
+            part.unlink(missing_ok=True)
+        target = Path(self.config.har_path)
+        merged = None
+        if self._har_started and target.exists():
+            try:
+                merged = json.loads(target.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Replacing unreadable HAR file {target}: {e}")
+        if merged is not None:
+            merged["log"].setdefault("pages", []).extend(recorded["log"].get("pages", []))
+            merged["log"].setdefault("entries", []).extend(recorded["log"].get("entries", []))
+        else:
+            merged = recorded
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temporary = target.with_name(target.name + ".tmp")
+        temporary.write_text(json.dumps(merged), encoding="utf-8")
+        os.replace(temporary, target)
+        self._har_started = True
+
+    async def _dispose_context(self, context: BrowserContext, label: Optional[str]):
+        """Close a context and merge its HAR recording, if it was recording"""
+        try:
+            # Closing writes the recording
+            await context.close()
+        except Exception as e:
+            logger.warning(f"Failed to close context {label or 'shared'}: {e}")
+        part = self._recordings.pop(context, None)
+        if part is not None:
+            self._merge_har(part)
+
+    async def _new_page(self, session_id: Optional[str] = None):
+        """Create a fresh context and page with console capture attached"""
+        options = {}
+        recording = None
+        if self.config.har_path and self.config.har_mode == "record":
+            recording = self._recording_path(session_id)
+            options["record_har_path"] = str(recording)
+        with metrics.span("browser.new_context"):
             context = await self.browser.new_context(
-                viewport={"width": 1920, "height": 1080},
+                viewport={
+                    "width": self.config.viewport_width,
+                    "height": self.config.viewport_height,
+                },
                 device_scale_factor=1,
+                **options,
             )
-            self.page = await context.new_page()
+            if self.config.har_path and self.config.har_mode == "replay":
+                # Registered first so the blocking route, which Playwright
+                # consults before earlier routes, still aborts blocked requests
+                await context.route_from_har(self.config.har_path, not_found="abort")
+            if recording is not None:
+                self._recordings[context] = recording
+            network = ContextNetwork(self.default_block_policy)
+            self._networks[context] = network
+            context.on("close", lambda _: self._networks.pop(context, None))
+            if network.policy or self.response_cache:
+                await self._ensure_routing(context, network)
+
+            page = await context.new_page()
+        track_network(page)
+        page.on("console", lambda msg: self._handle_console_message(msg, page, session_id))
+        page.on("response", lambda response: self._record_response(network, response))
+        return context, page
+
+    def _handle_console_message(self, msg, page: Page, session_id: Optional[str]):
+        self.console.append(msg.type, msg.text, page=page.url, session=session_id)
+        # Never print here: stdout is the MCP transport under stdio
+        log_payload("browser.console", type=msg.type, text=msg.text)
+
+    async def _ensure_routing(self, context: BrowserContext, network: ContextNetwork):
+        # Routing sends every request through Python, so it is only installed
+        # once a context actually needs to block or cache something.
+        if not network.routed:
+            await context.route("**/*", lambda route: self._route_request(network, route))
+            network.routed = True
+
+    async def _route_request(self, network: ContextNetwork, route):
+        request = route.request
+        if network.active_policy().blocks(request.resource_type, request.url):
+            estimated_size = self.network_stats.average_size(request.resource_type)
+            for stats in (self.network_stats, *network.listeners):
+                stats.record_blocked(request.resource_type, estimated_size)
+            await route.abort("blockedbyclient")
+        elif self.response_cache:
+            await self.response_cache.handle(route)
+        else:
+            await route.fallback()
+
+    def _record_response(self, network: ContextNetwork, response):
+        content_length = response.headers.get("content-length")
+        size = int(content_length) if content_length and content_length.isdigit() else None
+        resource_type = response.request.resource_type
+        for stats in (self.network_stats, *network.listeners):
+            stats.record_loaded(resource_type, size)
 
-            async def handle_console_message(msg):
-                log_entry = f"[{msg.type}] {msg.text}"
-                self.console_logs.append(log_entry)
-                # Simulate a server notification
-                print({
-                    "method": "notifications/resources/updated",
-                    "params": {"uri": "console://logs"},
-                })
+    @asynccontextmanager
+    async def block_requests(self, page: Page, block: Optional[List[str]] = None):
+        """Collect blocking stats for a page, optionally overriding its policy.
 
-            self.page.on("console", handle_console_message)
+        `block` mixes resource types, URL globs and group names ("ads",
+        "analytics"); it replaces the server-level policy until the block exits.
+        Requests cannot be told apart per call, so while overlapping calls on
+        one context are active, the override of the latest one applies.
+        """
+        network = self._networks.get(page.context)
+        if network is None:
+            yield BlockStats()
+            return
+
+        stats = BlockStats()
+        override = None
+        if block is not None:
+            override = (stats, BlockPolicy.from_names(block))
+            if override[1]:
+                await self._ensure_routing(page.context, network)
+            network.overrides.append(override)
+        network.listeners.append(stats)
+        try:
+            yield stats
+        finally:
+            network.listeners.remove(stats)
+            if override is not None:
+                # Removed by identity, so calls may exit in any order
+                network.overrides = [o for o in network.overrides if o is not override]
+
+    def wait_until(self, requested: Optional[str], navigation: bool = False) -> Optional[str]:
+        """Wait strategy of an action: the requested one, else the configured default.
+
+        Interactions only wait by default when the default is "smart".
+        """
+        if requested:
+            return requested
+        if navigation or self.config.wait_until == SMART:
+            return self.config.wait_until
+        return None
+
+    async def start(self):
+        """Launch the browser and open the shared page ahead of the first tool call"""
+        await self.ensure_browser()
+
+    async def ensure_browser(self):
+        """Launch the browser if needed and return the shared page"""
+        with metrics.span("browser.ensure"):
+            async with self._launch_lock:
+                await self._ensure_launched()
+                if not self.page:
+                    _, self.page = await self._new_page()
 
         return self.page
 
+    async def acquire(self, session_id: Optional[str] = None) -> Page:
+        """Lease the page of a session, creating an isolated context if needed.
+
+        Without pooling (or without a session id) the shared page is returned.
+        When all `max_contexts` slots are taken, the least recently used idle
+        context is evicted; if every context is leased, this waits for one.
+        """
+        if not self.pooled or session_id is None:
+            return await self.ensure_browser()
+
+        async with self._launch_lock:
+            await self._ensure_launched()
+
+        async with self._pool_changed:
+            await self._evict_idle_locked()
+            pooled = self._contexts.get(session_id)
+            while pooled is None and len(self._contexts) >= self.config.max_contexts:
+                if not await self._evict_lru_locked():
+                    await self._pool_changed.wait()
+                pooled = self._contexts.get(session_id)
+
+            if pooled is None:
+                context, page = await self._new_page(session_id)
+                pooled = PooledContext(session_id, context, page)
+                self._contexts[session_id] = pooled
+                logger.debug(
+                    f"Opened browser context for session {session_id} "
+                    f"({len(self._contexts)}/{self.config.max_contexts})"
+                )
+
+            pooled.leases += 1
+            pooled.touch()
+            return pooled.page
+
+    async def release(self, session_id: Optional[str] = None):
+        """Return a page leased with acquire()"""
+        if not self.pooled or session_id is None:
+            return
+
+        async with self._pool_changed:
+            pooled = self._contexts.get(session_id)
+            if pooled:
+                pooled.leases = max(0, pooled.leases - 1)
+                pooled.touch()
+            self._pool_changed.notify_all()
+
+    @asynccontextmanager
+    async def session(self, session_id: Optional[str] = None):
+        """Lease a session's page for the duration of the block"""
+        page = await self.acquire(session_id)
+        try:
+            yield page
+        finally:
+            await self.release(session_id)
+
+    @asynccontextmanager
+    async def isolated_page(self, label: str):
+        """A throwaway context and page outside the session pool, e.g. for a crawl worker"""
+        async with self._launch_lock:
+            await self._ensure_launched()
+        context, page = await self._new_page(label)
+        try:
+            yield page
+        finally:
+            await self._dispose_context(context, label)
+
+    async def close_session(self, session_id: str):
+        """Close the isolated context of a session, if any"""
+        async with self._pool_changed:
+            pooled = self._contexts.pop(session_id, None)
+            if pooled:
+                await self._close_context(pooled)
+            self._pool_changed.notify_all()
+
+    async def evict_idle(self) -> int:
+        """Close contexts unused for longer than the idle timeout"""
+        async with self._pool_changed:
+            return await self._evict_idle_locked()
+
+    async def _evict_idle_locked(self) -> int:
+        now = time.monotonic()
+        expired = [
+            pooled
+            for pooled in self._contexts.values()
+            if pooled.leases == 0
+            and now - pooled.last_used > self.config.context_idle_timeout
+        ]
+        for pooled in expired:
+            del self._contexts[pooled.session_id]
+            await self._close_context(pooled)
+        if expired:
+            self._pool_changed.notify_all()
+        return len(expired)
+
+    async def _evict_lru_locked(self) -> bool:
+        idle = [pooled for pooled in self._contexts.values() if pooled.leases == 0]
+        if not idle:
+            return False
+        lru = min(idle, key=lambda pooled: pooled.last_used)
+        del self._contexts[lru.session_id]
+        await self._close_context(lru)
+        return True
+
+    async def _close_context(self, pooled: PooledContext):
+        logger.debug(f"Closing browser context for session {pooled.session_id}")
+        await self._dispose_context(pooled.context, pooled.session_id)
+
     async def close(self):
         """Close browser and playwright instance"""
+        async with self._pool_changed:
+            for pooled in list(self._contexts.values()):
+                await self._close_context(pooled)
+            self._contexts.clear()
+            self._pool_changed.notify_all()
+        if self.page:
+            await self._dispose_context(self.page.context, None)
+        if self._har_parts_dir is not None:
+            # Recordings of contexts that never closed cleanly
+            shutil.rmtree(self._har_parts_dir, ignore_errors=True)
+            self._har_parts_dir = None
+            self._recordings.clear()
+        self._har_started = False
+        if self.response_cache:
+            self.response_cache.close()
         if self.browser:
             await self.browser.close()
             self.browser = None
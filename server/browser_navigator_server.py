@@ -1,178 +1,594 @@
+import asyncio
 import base64
 import json
+from contextlib import asynccontextmanager
+from typing import Optional
 from fastmcp import Context, FastMCP
+from fastmcp.server.middleware import Middleware
+from loguru import logger
 from mcp.types import TextContent, ImageContent
-from playwright.async_api import Page
 from client_bridge.llm_client import LLMClient, LLMResponse
+from client_bridge.log_utils import log_payload
+from client_bridge.metrics import metrics
 from client_bridge.llm_config import get_default_llm_config
+from server import actions
+from server.actions import BrowserAction
 from server.browser_manager import BrowserManager
+from server.config import (
+    BrowserConfig,
+    CrawlConfig,
+    ExtractionConfig,
+    ScreenshotConfig,
+    SelectorConfig,
+    get_default_crawl_config,
+    get_default_extraction_config,
+    get_default_screenshot_config,
+    get_default_selector_config,
+)
+from server.crawler import Crawler, FollowRules, HostLimiter
+from server.dom_distiller import distill_page
+from server.extraction import ExtractionStore
+from server.page_snapshot import PageSnapshots
+from server.resource_updates import ResourceUpdateNotifier
+from server.selector_cache import (
+    FINGERPRINT_SCRIPT,
+    SelectorCache,
+    clean_selector,
+    selector_matches,
+)
+from server.screenshots import ScreenshotStore, capture_screenshot
+
+
+CONSOLE_LOGS_URI = "console://logs"
+
+
+class BrowserWarmupMiddleware(Middleware):
+    """Start the browser as soon as a client initializes its MCP session"""
+
+    def __init__(self, server: "BrowserNavigationServer"):
+        self.server = server
+
+    async def on_initialize(self, context, call_next):
+        self.server.schedule_warm_up()
+        return await call_next(context)
+
+
+class ToolMetricsMiddleware(Middleware):
+    """Time every tool call and record the size of its result.
+
+    Calls from an in-process bridge carry the bridge's turn id as
+    `bridge_turn` meta; the call's spans are then part of that turn.
+    """
+
+    async def on_call_tool(self, context, call_next):
+        request_context = context.fastmcp_context.request_context if context.fastmcp_context else None
+        meta = getattr(request_context, "meta", None) if request_context else None
+        with metrics.resume(getattr(meta, "bridge_turn", None) if meta else None):
+            with metrics.span("server.tool", tool=context.message.name) as span:
+                result = await call_next(context)
+                span.set(result_bytes=sum(
+                    len(getattr(content, "text", None) or getattr(content, "data", None) or "")
+                    for content in getattr(result, "content", None) or []
+                ))
+                return result
+
+
+@asynccontextmanager
+async def server_lifespan(server: "BrowserNavigationServer"):
+    """Release the browser and temporary files when the server stops.
+
+    Runs under `fastmcp run` and for in-process bridges, whose sessions
+    enter the lifespan; without it a recorded HAR is never written.
+    """
+    try:
+        yield {}
+    finally:
+        await server.shutdown()
 
 
 class BrowserNavigationServer(FastMCP):
-    def __init__(self, server_name="browser-navigator-server"):
-        super().__init__(server_name)
+    def __init__(
+        self,
+        server_name="browser-navigator-server",
+        browser_config: Optional[BrowserConfig] = None,
+        screenshot_config: Optional[ScreenshotConfig] = None,
+        selector_config: Optional[SelectorConfig] = None,
+        extraction_config: Optional[ExtractionConfig] = None,
+        crawl_config: Optional[CrawlConfig] = None,
+    ):
+        super().__init__(server_name, lifespan=server_lifespan)
         self.mcp = self
-        self.browser_manager = BrowserManager()
+        self.browser_manager = BrowserManager(browser_config)
         self.llm_config = get_default_llm_config()
-        self.llm_client = LLMClient(self.llm_config)
-        self.screenshots = dict()
+        self.selector_config = selector_config or get_default_selector_config()
+        self.selector_cache = (
+            SelectorCache(
+                max_entries=self.selector_config.cache_max_entries,
+                ttl=self.selector_config.cache_ttl,
+                path=self.selector_config.cache_path,
+            )
+            if self.selector_config.cache_enabled
+            else None
+        )
+        self.resource_updates = ResourceUpdateNotifier(
+            debounce=self.browser_manager.config.console_notify_debounce
+        )
+        self.browser_manager.console.listeners.append(
+            lambda entry: self.resource_updates.changed(CONSOLE_LOGS_URI)
+        )
+        self.page_snapshots = PageSnapshots()
+        self.crawl_config = crawl_config or get_default_crawl_config()
+        extraction_config = extraction_config or get_default_extraction_config()
+        self.extractions = ExtractionStore(
+            chunk_size=extraction_config.chunk_size,
+            max_rows=extraction_config.max_rows,
+            keep_results=extraction_config.keep_results,
+            export_dir=extraction_config.export_dir,
+        )
+        screenshot_config = screenshot_config or get_default_screenshot_config()
+        self.screenshots = ScreenshotStore(
+            max_memory_bytes=screenshot_config.max_memory_bytes,
+            spill_dir=screenshot_config.spill_dir,
+        )
         self.register_tools()
         self.register_resources()
+        self.register_subscriptions()
         self.register_prompts()
 
+        self._warmup_task: Optional[asyncio.Task] = None
+        if self.browser_manager.config.warmup:
+            # No loop is running when the module is imported by `fastmcp run`,
+            # so the middleware covers that case at session initialization.
+            self.add_middleware(BrowserWarmupMiddleware(self))
+            self.schedule_warm_up()
+        self.add_middleware(ToolMetricsMiddleware())
+
+    async def shutdown(self):
+        """Close the browser, writing HAR recordings and the cache index, and remove temporary files"""
+        if self._warmup_task is not None and not self._warmup_task.done():
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+        self._warmup_task = None
+        await self.browser_manager.close()
+        self.screenshots.close()
+        self.extractions.close()
+
+    def schedule_warm_up(self):
+        """Run warm_up() in the background if an event loop is running"""
+        if self._warmup_task is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._warmup_task = loop.create_task(self.warm_up())
+
+    async def warm_up(self):
+        """Launch the browser before the first tool call needs it"""
+        try:
+            await self.browser_manager.start()
+        except Exception as e:
+            logger.warning(f"Browser warm-up failed: {e}")
+
+    def _browser_session_id(self, ctx: Optional[Context]) -> Optional[str]:
+        """Pool key of a tool call: explicit `browser_session` meta, else the MCP session"""
+        if not self.browser_manager.pooled:
+            return None
+        return self._caller_id(ctx)
+
+    @staticmethod
+    def _caller_id(ctx: Optional[Context]) -> Optional[str]:
+        """The `browser_session` meta of a call, else its MCP session id"""
+        if ctx is None:
+            return None
+        request_context = ctx.request_context
+        meta = getattr(request_context, "meta", None) if request_context else None
+        browser_session = getattr(meta, "browser_session", None) if meta else None
+        if browser_session:
+            return str(browser_session)
+        try:
+            return ctx.session_id
+        except RuntimeError:
+            return None
+
+    def _page(self, ctx: Optional[Context]):
+        """Lease the browser page belonging to the caller's session"""
+        return self.browser_manager.session(self._browser_session_id(ctx))
+
     def register_tools(self):
         @self.mcp.tool()
-        async def playwright_navigate(url: str, timeout=30000, wait_until="load"):
-            """Navigate to a URL."""
+        async def playwright_navigate(
+            url: str,
+            ctx: Context,
+            timeout=30000,
+            wait_until: Optional[str] = None,
+            block: Optional[list[str]] = None,
+        ):
+            """Navigate to a URL.
+
+            `wait_until`: "load", "domcontentloaded", "networkidle", "commit", or
+            "smart" to return once the DOM and network have settled instead of
+            waiting for every asset.
+
+            `block` overrides which requests are aborted for this navigation:
+            resource types (image, font, media, stylesheet, script), URL globs,
+            or the groups "ads" and "analytics". Pass [] to block nothing.
+            """
             try:
-                page: Page = await self.browser_manager.ensure_browser()
-                await page.goto(url, timeout=timeout, wait_until=wait_until)
-                return f"Navigated to {url} with {wait_until} wait"
+                manager = self.browser_manager
+                async with self._page(ctx) as page:
+                    async with manager.block_requests(page, block) as stats:
+                        message = await actions.navigate(
+                            page,
+                            url,
+                            timeout,
+                            manager.wait_until(wait_until, navigation=True),
+                            manager.smart_wait,
+                        )
+                    if stats.blocked_requests:
+                        message += f" ({stats.summary()})"
+                    return message
             except Exception as e:
                 raise ValueError(f"Navigation failed: {e}")
 
+        # Not read-only: capturing an element scrolls it into view
         @self.mcp.tool()
         async def playwright_screenshot(
-            name: str, selector: str = None, width: int = 800, height: int = 600
+            name: str,
+            ctx: Context,
+            selector: str = None,
+            width: int = 800,
+            height: int = 600,
+            full_page: bool = False,
+            image_format: str = "png",
+            quality: Optional[int] = None,
+            clip: Optional[dict[str, float]] = None,
+            max_pixels: Optional[int] = None,
         ):
-            """Take a screenshot of the current page or a specific element."""
+            """Take a screenshot of the current page or a specific element.
+
+            The image is downscaled to fit within width x height (and max_pixels).
+            image_format is png, jpeg or webp; quality (0-100) applies to jpeg/webp.
+            clip is a page region {x, y, width, height} in CSS pixels.
+            """
             try:
-                page: Page = await self.browser_manager.ensure_browser()
-
-                if selector:
-                    element = await page.query_selector(selector)
-                    if not element:
-                        return f"Element not found: {selector}"
-                    screenshot = await element.screenshot(type="png")
-                else:
-                    screenshot = await page.screenshot(type="png", full_page=True)
-
-                # Convert the screenshot to a base64 string
-                screenshot_base64 = base64.b64encode(screenshot).decode("utf-8")
-                self.screenshots[name] = screenshot_base64
+                async with self._page(ctx) as page:
+                    screenshot = await capture_screenshot(
+                        page,
+                        selector=selector,
+                        clip=clip,
+                        full_page=full_page,
+                        max_width=width,
+                        max_height=height,
+                        max_pixels=max_pixels,
+                        image_format=image_format,
+                        quality=quality,
+                    )
+                if screenshot is None:
+                    return f"Element not found: {selector}"
+
+                data, mime_type, image_width, image_height = screenshot
+                # Keep raw bytes; base64 is only produced for the response
+                self.screenshots.put(name, data, mime_type)
                 return [
-                    TextContent(type="text", text=f"Screenshot {name} taken"),
+                    TextContent(
+                        type="text",
+                        text=(
+                            f"Screenshot {name} taken ({image_width}x{image_height} "
+                            f"{mime_type}, {len(data) / 1024:.0f} KB)"
+                        ),
+                    ),
                     ImageContent(
-                        type="image", data=screenshot_base64, mimeType="image/png"
+                        type="image",
+                        data=base64.b64encode(data).decode("utf-8"),
+                        mimeType=mime_type,
                     ),
                 ]
             except Exception as e:
                 raise ValueError(f"Screenshot failed: {e}")
 
         @self.mcp.tool()
-        async def playwright_click(selector: str):
-            """Click an element on the page."""
+        async def playwright_click(selector: str, ctx: Context, wait_until: Optional[str] = None):
+            """Click an element on the page.
+
+            `wait_until`: "smart" waits for the DOM and network to settle after
+            the click (e.g. SPA transitions), a load state waits for that state,
+            "none" returns right away.
+            """
             try:
-                page: Page = await self.browser_manager.ensure_browser()
-                await page.wait_for_selector(selector)
-                await page.click(selector)
-                return f"Clicked on {selector}"
+                manager = self.browser_manager
+                async with self._page(ctx) as page:
+                    return await actions.click(
+                        page, selector, None, manager.wait_until(wait_until), manager.smart_wait
+                    )
             except Exception as e:
                 raise ValueError(f"Failed to click: {e}")
 
         @self.mcp.tool()
-        async def playwright_fill(selector: str, value: str):
+        async def playwright_fill(selector: str, value: str, ctx: Context, wait_until: Optional[str] = None):
             """Fill out an input field."""
             try:
-                page: Page = await self.browser_manager.ensure_browser()
-                await page.wait_for_selector(selector)
-                await page.fill(selector, value)
-                return f"Filled {selector} with {value}"
+                manager = self.browser_manager
+                async with self._page(ctx) as page:
+                    return await actions.fill(
+                        page, selector, value, None, manager.wait_until(wait_until), manager.smart_wait
+                    )
             except Exception as e:
                 raise ValueError(f"Failed to fill: {e}")
 
         @self.mcp.tool()
-        async def playwright_select(selector: str, value: str):
+        async def playwright_select(selector: str, value: str, ctx: Context, wait_until: Optional[str] = None):
             """Select an element on the page with a Select tag."""
             try:
-                page: Page = await self.browser_manager.ensure_browser()
-                await page.wait_for_selector(selector)
-                await page.select_option(selector, value)
-                return f"Selected {value} in {selector}"
+                manager = self.browser_manager
+                async with self._page(ctx) as page:
+                    return await actions.select(
+                        page, selector, value, None, manager.wait_until(wait_until), manager.smart_wait
+                    )
             except Exception as e:
                 raise ValueError(f"Failed to select: {e}")
 
         @self.mcp.tool()
-        async def playwright_hover(selector: str):
+        async def playwright_hover(selector: str, ctx: Context, wait_until: Optional[str] = None):
             """Hover over an element on the page."""
             try:
-                page: Page = await self.browser_manager.ensure_browser()
-                await page.wait_for_selector(selector)
-                await page.hover(selector)
-                return f"Hovered over {selector}"
+                manager = self.browser_manager
+                async with self._page(ctx) as page:
+                    return await actions.hover(
+                        page, selector, None, manager.wait_until(wait_until), manager.smart_wait
+                    )
             except Exception as e:
                 raise ValueError(f"Failed to hover: {e}")
 
         @self.mcp.tool()
-        async def playwright_evaluate(script: str):
+        async def playwright_batch(
+            steps: list[BrowserAction],
+            ctx: Context,
+            stop_on_error: bool = True,
+            wait_until: Optional[str] = None,
+        ):
+            """Run a sequence of browser actions (navigate, click, fill, select,
+            hover, press, wait_for) in one call and report each step.
+
+            Each step can set its own timeout in milliseconds and wait_until
+            (see playwright_click); `wait_until` here applies to the others.
+            With stop_on_error the remaining steps are skipped after the first
+            failure.
+            """
+            manager = self.browser_manager
+            async with self._page(ctx) as page:
+                results = await actions.run_actions(
+                    page, steps, stop_on_error, manager.wait_until(wait_until), manager.smart_wait
+                )
+            return "\n".join(results)
+
+        @self.mcp.tool()
+        async def playwright_evaluate(script: str, ctx: Context):
             """Execute JavaScript in the browser console."""
             try:
-                page: Page = await self.browser_manager.ensure_browser()
-                script_result = await page.evaluate(
-                    """
-                (script) => {
-                    const logs = [];
-                    const originalConsole = { ...console };
-
-                    ['log', 'info', 'warn', 'error'].forEach(method => {
-                        console[method] = (...args) => {
-                            logs.push(`[${method}] ${args.join(' ')}`);
-                            originalConsole[method](...args);
-                        };
-                    });
-
-                    try {
-                        const result = eval(script);
-                        Object.assign(console, originalConsole);
-                        return { result, logs };
-                    } catch (error) {
-                        Object.assign(console, originalConsole);
-                        throw error;
+                async with self._page(ctx) as page:
+                    script_result = await page.evaluate(
+                        """
+                    (script) => {
+                        const logs = [];
+                        const originalConsole = { ...console };
+
+                        ['log', 'info', 'warn', 'error'].forEach(method => {
+                            console[method] = (...args) => {
+                                logs.push(`[${method}] ${args.join(' ')}`);
+                                originalConsole[method](...args);
+                            };
+                        });
+
+                        try {
+                            const result = eval(script);
+                            Object.assign(console, originalConsole);
+                            return { result, logs };
+                        } catch (error) {
+                            Object.assign(console, originalConsole);
+                            throw error;
+                        }
                     }
-                }
-                """,
-                    script,
-                )
-                # Parentheses allow grouping multiple expressions in one line,
-                # often used for long strings, tuples, or function arguments
-                # that span multiple lines.
-                return_string = (
-                    "Execution result:\n"
-                    + json.dumps(script_result["result"], indent=2)
-                    + "\n\n"
-                    + "Console output:\n"
-                    + "\n".join(script_result["logs"])
-                )
-                return return_string
+                    """,
+                        script,
+                    )
+                    # Parentheses allow grouping multiple expressions in one line,
+                    # often used for long strings, tuples, or function arguments
+                    # that span multiple lines.
+                    return_string = (
+                        "Execution result:\n"
+                        + json.dumps(script_result["result"], indent=2)
+                        + "\n\n"
+                        + "Console output:\n"
+                        + "\n".join(script_result["logs"])
+                    )
+                    return return_string
             except Exception as e:
                 raise ValueError(f"Script execution failed: {e}")
 
+        # Not read-only: each snapshot moves the caller's diff baseline
+        @self.mcp.tool()
+        async def playwright_snapshot(
+            ctx: Context, full: bool = False, token_budget: Optional[int] = None
+        ) -> str:
+            """List the interactive elements of the current page with CSS selectors.
+
+            The first call returns every element; later calls return only what
+            changed since your previous snapshot of this page (- removed,
+            + added, ~ changed). Pass full=true to get every element again.
+            """
+            try:
+                async with self._page(ctx) as page:
+                    return await self.page_snapshots.take(
+                        page,
+                        reader=self._caller_id(ctx),
+                        full=full,
+                        token_budget=token_budget or self.selector_config.token_budget,
+                        model=self.llm_config.model,
+                    )
+            except Exception as e:
+                raise ValueError(f"Snapshot failed: {e}")
+
         @self.mcp.tool()
-        async def extract_selector_by_page_content(user_message: str) -> str:
-            """Try to find a css selector by current page content."""
+        async def playwright_extract(
+            ctx: Context,
+            selector: Optional[str] = None,
+            kind: str = "auto",
+            item_selector: Optional[str] = None,
+            fields: Optional[dict[str, str]] = None,
+            next_selector: Optional[str] = None,
+            max_pages: int = 1,
+            output: Optional[str] = None,
+            chunk_size: Optional[int] = None,
+            cursor: Optional[str] = None,
+        ) -> str:
+            """Extract rows from a table or repeated list items as typed JSON, in chunks.
+
+            `selector` is the table or list container (first table on the page by
+            default); kind "table", "list" or "auto" (a list when `item_selector`
+            or `fields` is given, else a table). For lists, `item_selector`
+            picks the items and `fields` maps column names to selectors inside an
+            item ("a", "a@href", "@data-id"). `next_selector` is clicked to follow
+            pagination, up to `max_pages` pages.
+
+            Returns the first `chunk_size` rows and a `next_cursor`; call again
+            with only `cursor` to get the next rows. With output "jsonl" or "csv"
+            all rows go to a file exposed as an extraction:// resource instead.
+            """
+            try:
+                if cursor:
+                    return json.dumps(self.extractions.read_chunk(cursor, chunk_size))
+                manager = self.browser_manager
+                async with self._page(ctx) as page:
+                    result = await self.extractions.run(
+                        page,
+                        output=output,
+                        chunk_size=chunk_size,
+                        selector=selector,
+                        kind=kind,
+                        item_selector=item_selector,
+                        fields=fields,
+                        next_selector=next_selector,
+                        max_pages=max_pages,
+                        smart_wait=manager.smart_wait,
+                    )
+                return json.dumps(result)
+            except Exception as e:
+                raise ValueError(f"Extraction failed: {e}")
+
+        @self.mcp.tool(annotations={"readOnlyHint": True})
+        async def playwright_crawl(
+            seeds: list[str],
+            ctx: Context,
+            max_pages: int = 20,
+            max_depth: int = 1,
+            allow: Optional[list[str]] = None,
+            deny: Optional[list[str]] = None,
+            same_host: bool = True,
+            concurrency: int = 4,
+            max_chars: int = 500,
+            wait_until: str = "domcontentloaded",
+        ) -> str:
+            """Visit many pages in parallel, starting from seed URLs and following links.
+
+            Links are followed up to `max_depth` hops from the seeds, staying on
+            the seeds' hosts unless same_host=false, filtered by `allow`/`deny`
+            URL globs ("*/docs/*"). Each page yields its title and the first
+            `max_chars` characters of text, streamed as progress notifications
+            while the crawl runs. Pages run in `concurrency` isolated browser
+            contexts, with per-host concurrency and delay limits. URLs are
+            normalized (fragments, tracking parameters, query order) so each is
+            visited once.
+            """
+            config = self.crawl_config
+            manager = self.browser_manager
+
+            async def report(result, done, planned):
+                await ctx.report_progress(done, planned, json.dumps(result))
+
+            crawler = Crawler(
+                manager.isolated_page,
+                FollowRules(allow or (), deny or (), same_host),
+                max_pages=max(1, min(max_pages, config.max_pages)),
+                max_depth=max_depth,
+                concurrency=max(1, min(concurrency, config.max_concurrency)),
+                limiter=HostLimiter(config.per_host, config.delay_ms / 1000),
+                max_chars=max_chars,
+                wait_until=wait_until,
+                smart_wait=manager.smart_wait,
+                on_page=report,
+            )
+            try:
+                return json.dumps(await crawler.run(seeds))
+            except Exception as e:
+                raise ValueError(f"Crawl failed: {e}")
+
+        @self.mcp.tool(annotations={"readOnlyHint": True})
+        async def extract_selector_by_page_content(
+            user_message: str,
+            ctx: Context,
+            mode: Optional[str] = None,
+            token_budget: Optional[int] = None,
+        ) -> str:
+            """Try to find a css selector by current page content.
+
+            mode: "outline" (interactive elements with candidate selectors),
+            "html" (cleaned markup) or "raw" (full page.content()).
+            """
+            mode = mode or self.selector_config.distill_mode
+            token_budget = token_budget or self.selector_config.token_budget
+
+            cache_key = None
             # Ensure the browser page is available
-            page = await self.browser_manager.ensure_browser()
+            async with self._page(ctx) as page:
+                if self.selector_cache:
+                    fingerprint = await page.evaluate(FINGERPRINT_SCRIPT)
+                    cache_key = self.selector_cache.key(page.url, fingerprint, user_message)
+                    cached = self.selector_cache.get(cache_key)
+                    if cached:
+                        if await selector_matches(page, cached):
+                            return cached
+                        self.selector_cache.invalidate(cache_key)
 
-            # Get the HTML content of the page
-            html_content = await page.content()
+                # Reduce the page to what matters for picking a selector
+                page_content = await distill_page(
+                    page, mode=mode, token_budget=token_budget, model=self.llm_config.model
+                )
 
             # Prepare the prompt for the LLM
+            if mode == "outline":
+                description = (
+                    "Given the following outline of the interactive elements of a web page, "
+                    "each with candidate CSS selectors:"
+                )
+            else:
+                description = "Given the following HTML content of a web page:"
             prompt = (
-                "Given the following HTML content of a web page:\n\n"
-                f"{html_content}\n\n"
+                f"{description}\n\n"
+                f"{page_content}\n\n"
                 f"User request: '{user_message}'\n\n"
                 "Provide the CSS selector that best matches the user's request. Return only the CSS selector."
             )
 
             # Use the LLM client to generate the selector
-            llm_response: LLMResponse = await self.llm_client.invoke_with_prompt(prompt)
-            selector: str = llm_response.content
+            # A fresh client per request keeps concurrent lookups from sharing
+            # one history; the HTTP connection pool is shared regardless.
+            llm_client = LLMClient(self.llm_config)
+            log_payload("selector.prompt", mode=mode, prompt=prompt)
+            llm_response: LLMResponse = await llm_client.invoke_with_prompt(prompt)
+            selector: str = clean_selector(llm_response.content)
+            log_payload("selector.result", intent=user_message, selector=selector)
+
+            if cache_key:
+                async with self._page(ctx) as page:
+                    if await selector_matches(page, selector):
+                        self.selector_cache.put(cache_key, selector)
 
             # Return the selector
-            return selector.strip()
+            return selector
 
         # Long-running example to read all screenshots from a list of file names
-        @self.mcp.tool()
+        @self.mcp.tool(annotations={"readOnlyHint": True})
         async def read_all_screenshots(file_name_list: list[str], ctx: Context) -> str:
             """Read all screenshots from a list of file names."""
             for i, file_name in enumerate(file_name_list):
@@ -184,23 +600,101 @@ class BrowserNavigationServer(FastMCP):
 
             return "Processing complete"
 
+    def register_subscriptions(self):
+        """Handle resources/subscribe so clients get resources/updated notifications"""
+        server = self._mcp_server
+
+        @server.subscribe_resource()
+        async def subscribe(uri):
+            self.resource_updates.subscribe(str(uri), server.request_context.session)
+
+        @server.unsubscribe_resource()
+        async def unsubscribe(uri):
+            self.resource_updates.unsubscribe(str(uri), server.request_context.session)
+
+        # The SDK always advertises subscribe=False
+        get_capabilities = server.get_capabilities
+
+        def get_capabilities_with_subscribe(*args, **kwargs):
+            capabilities = get_capabilities(*args, **kwargs)
+            if capabilities.resources is not None:
+                capabilities.resources.subscribe = True
+            return capabilities
+
+        server.get_capabilities = get_capabilities_with_subscribe
+
     def register_resources(self):
-        @self.mcp.resource("console://logs")
-        async def get_console_logs() -> str:
-            """Get a personalized greeting"""
-            return TextContent(
-                type="text", text="\n".join(self.browser_manager.console_logs)
-            )
+        @self.mcp.resource(CONSOLE_LOGS_URI + "{?level,since,session,limit,follow}")
+        async def get_console_logs(
+            ctx: Context,
+            level: Optional[str] = None,
+            since: int = 0,
+            session: Optional[str] = None,
+            limit: Optional[int] = None,
+            follow: bool = False,
+        ) -> str:
+            """Get captured browser console messages as JSON, oldest first.
+
+            Filter by minimum `level` (debug, log, info, warning, error) or
+            browser `session`. Pass the returned `cursor` as `since` to read only
+            newer messages. `follow=true` also subscribes the caller to
+            resources/updated notifications for console://logs.
+            """
+            if follow:
+                self.resource_updates.subscribe(CONSOLE_LOGS_URI, ctx.session)
+            return json.dumps(self.browser_manager.console.read(
+                since=since, level=level, session=session, limit=limit
+            ), indent=2)
+
+        @self.mcp.resource("network://stats")
+        async def get_network_stats() -> str:
+            """Get request blocking and response cache statistics since the browser started"""
+            stats = self.browser_manager.network_stats.to_dict()
+            if self.browser_manager.response_cache:
+                stats["cache"] = self.browser_manager.response_cache.stats()
+            return json.dumps(stats, indent=2)
+
+        @self.mcp.resource("screenshots://stats")
+        async def get_screenshot_stats() -> str:
+            """Get screenshot store usage and hit/miss/eviction counts"""
+            return json.dumps(self.screenshots.stats(), indent=2)
+
+        @self.mcp.resource("snapshots://stats")
+        async def get_snapshot_stats() -> str:
+            """Get how many page snapshots were sent in full and as diffs"""
+            return json.dumps(self.page_snapshots.stats(), indent=2)
+
+        @self.mcp.resource("selectors://stats")
+        async def get_selector_cache_stats() -> str:
+            """Get selector cache size and hit/miss counts"""
+            stats = self.selector_cache.stats() if self.selector_cache else {}
+            return json.dumps(stats, indent=2)
+
+        @self.mcp.resource("metrics://prometheus", mime_type="text/plain")
+        async def get_metrics() -> str:
+            """Get tool, browser and LLM latency histograms in Prometheus text format"""
+            return metrics.render_prometheus()
+
+        @self.mcp.resource("metrics://summary")
+        async def get_metrics_summary() -> str:
+            """Get count, mean, p50 and p99 latency per instrumented operation"""
+            return json.dumps(metrics.summary(), indent=2)
+
+        @self.mcp.resource("extraction://{name}")
+        async def get_extraction(name: str) -> str:
+            """Get the JSONL or CSV file written by playwright_extract"""
+            return self.extractions.read_file(name)
 
         @self.mcp.resource("screenshot://{name}")
         async def get_screenshot(name: str) -> str:
             """Get a screenshot by name"""
-            screenshot_base64 = self.screenshots.get(name)
-            if screenshot_base64:
+            screenshot = self.screenshots.get(name)
+            if screenshot:
+                data, mime_type = screenshot
                 return ImageContent(
                     type="image",
-                    data=screenshot_base64,
-                    mimeType="image/png",
+                    data=base64.b64encode(data).decode("utf-8"),
+                    mimeType=mime_type,
                     uri=f"screenshot://{name}",
                 )
             else:
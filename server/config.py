@@ -0,0 +1,154 @@
+import os
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class BrowserConfig(BaseModel):
+    """Configuration for the Playwright browser manager"""
+    # Launch options
+    browser_type: str = "chromium"  # chromium, firefox or webkit
+    headless: bool = False
+    args: List[str] = []
+    viewport_width: int = 1920
+    viewport_height: int = 1080
+    # Requests aborted for every page: resource types (image, font, media, ...)
+    # and URL globs or named groups ("ads", "analytics")
+    blocked_resource_types: List[str] = []
+    blocked_url_patterns: List[str] = []
+    # Launch the browser when the server starts instead of on the first tool call
+    warmup: bool = False
+    # Context pool: 0 keeps the single shared page, N > 0 gives each
+    # session its own isolated BrowserContext, at most N at a time.
+    max_contexts: int = 0
+    context_idle_timeout: float = 300.0  # seconds before an unused context is closed
+    # Console capture: newest messages kept across all pages, and how long
+    # console://logs subscribers wait before being told about new ones
+    console_buffer_size: int = 1000
+    console_notify_debounce: float = 0.5
+    # Default wait of playwright_navigate: load, domcontentloaded, networkidle,
+    # commit or "smart". With "smart", interactions also wait for the page to
+    # settle: no DOM mutation for smart_wait_dom_quiet_ms and no request in
+    # flight for smart_wait_network_idle_ms, cut off after smart_wait_max_ms.
+    wait_until: str = "load"
+    smart_wait_dom_quiet_ms: float = 100
+    smart_wait_network_idle_ms: float = 300
+    smart_wait_max_ms: float = 3000
+    # On-disk response cache shared by all contexts, off when cache_dir is unset
+    cache_dir: Optional[str] = None
+    cache_max_bytes: int = 256 * 1024 * 1024
+    # HAR file to "record" every context into, or to "replay" from with no
+    # network access (requests missing from the HAR are aborted). Takes the
+    # place of the response cache; request blocking still applies first.
+    har_path: Optional[str] = None
+    har_mode: str = "replay"
+
+
+class ScreenshotConfig(BaseModel):
+    """Configuration for the screenshot store"""
+    max_memory_bytes: int = 32 * 1024 * 1024
+    spill_dir: Optional[str] = None  # temporary directory when unset
+
+
+class SelectorConfig(BaseModel):
+    """Configuration for extract_selector_by_page_content"""
+    distill_mode: str = "outline"  # outline, html or raw
+    token_budget: int = 4000  # max tokens of page content in the prompt
+    # Cache of resolved selectors, validated against the live page on reuse
+    cache_enabled: bool = True
+    cache_max_entries: int = 1000
+    cache_ttl: float = 24 * 3600  # seconds
+    cache_path: Optional[str] = None  # JSON file to persist the cache across runs
+
+
+class ExtractionConfig(BaseModel):
+    """Configuration for playwright_extract"""
+    chunk_size: int = 50  # rows per tool result
+    max_rows: int = 10000  # rows kept in memory per extraction; files have no cap
+    keep_results: int = 20  # extractions readable by cursor, oldest dropped first
+    export_dir: Optional[str] = None  # JSONL/CSV output, temporary directory when unset
+
+
+class CrawlConfig(BaseModel):
+    """Limits of playwright_crawl; per-call arguments are capped by these"""
+    max_pages: int = 200
+    max_concurrency: int = 8  # isolated browser contexts at once
+    per_host: int = 2  # concurrent pages per host
+    delay_ms: float = 250  # minimum gap between page starts on one host
+
+
+def _env_list(name: str) -> List[str]:
+    return [item.strip() for item in os.getenv(name, "").split(",") if item.strip()]
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_default_browser_config():
+    """Set default browser configuration from environment variables"""
+    width, _, height = os.getenv("BROWSER_VIEWPORT", "1920x1080").partition("x")
+    return BrowserConfig(
+        browser_type=os.getenv("BROWSER_TYPE", "chromium"),
+        headless=_env_bool("BROWSER_HEADLESS"),
+        args=os.getenv("BROWSER_ARGS", "").split(),
+        viewport_width=int(width),
+        viewport_height=int(height),
+        blocked_resource_types=_env_list("BROWSER_BLOCK_RESOURCES"),
+        blocked_url_patterns=_env_list("BROWSER_BLOCK_URLS"),
+        warmup=_env_bool("BROWSER_WARMUP"),
+        max_contexts=int(os.getenv("BROWSER_MAX_CONTEXTS", "0")),
+        context_idle_timeout=float(os.getenv("BROWSER_CONTEXT_IDLE_TIMEOUT", "300")),
+        console_buffer_size=int(os.getenv("BROWSER_CONSOLE_BUFFER", "1000")),
+        console_notify_debounce=float(os.getenv("BROWSER_CONSOLE_DEBOUNCE", "0.5")),
+        wait_until=os.getenv("BROWSER_WAIT_UNTIL", "load"),
+        smart_wait_dom_quiet_ms=float(os.getenv("BROWSER_DOM_QUIET_MS", "100")),
+        smart_wait_network_idle_ms=float(os.getenv("BROWSER_NETWORK_IDLE_MS", "300")),
+        smart_wait_max_ms=float(os.getenv("BROWSER_SMART_WAIT_MAX_MS", "3000")),
+        cache_dir=os.getenv("BROWSER_CACHE_DIR") or None,
+        cache_max_bytes=int(float(os.getenv("BROWSER_CACHE_MB", "256")) * 1024 * 1024),
+        har_path=os.getenv("BROWSER_HAR_PATH") or None,
+        har_mode=os.getenv("BROWSER_HAR_MODE", "replay"),
+    )
+
+
+def get_default_screenshot_config():
+    """Set default screenshot store configuration from environment variables"""
+    return ScreenshotConfig(
+        max_memory_bytes=int(float(os.getenv("SCREENSHOT_MEMORY_MB", "32")) * 1024 * 1024),
+        spill_dir=os.getenv("SCREENSHOT_SPILL_DIR") or None,
+    )
+
+
+def get_default_selector_config():
+    """Set default selector extraction configuration from environment variables"""
+    return SelectorConfig(
+        distill_mode=os.getenv("SELECTOR_DISTILL_MODE", "outline"),
+        token_budget=int(os.getenv("SELECTOR_TOKEN_BUDGET", "4000")),
+        cache_enabled=_env_bool("SELECTOR_CACHE", True),
+        cache_max_entries=int(os.getenv("SELECTOR_CACHE_SIZE", "1000")),
+        cache_ttl=float(os.getenv("SELECTOR_CACHE_TTL", str(24 * 3600))),
+        cache_path=os.getenv("SELECTOR_CACHE_PATH") or None,
+    )
+
+
+def get_default_extraction_config():
+    """Set default extraction configuration from environment variables"""
+    return ExtractionConfig(
+        chunk_size=int(os.getenv("EXTRACT_CHUNK_SIZE", "50")),
+        max_rows=int(os.getenv("EXTRACT_MAX_ROWS", "10000")),
+        keep_results=int(os.getenv("EXTRACT_KEEP_RESULTS", "20")),
+        export_dir=os.getenv("EXTRACT_EXPORT_DIR") or None,
+    )
+
+
+def get_default_crawl_config():
+    """Set default crawl limits from environment variables"""
+    return CrawlConfig(
+        max_pages=int(os.getenv("CRAWL_MAX_PAGES", "200")),
+        max_concurrency=int(os.getenv("CRAWL_MAX_CONCURRENCY", "8")),
+        per_host=int(os.getenv("CRAWL_PER_HOST", "2")),
+        delay_ms=float(os.getenv("CRAWL_DELAY_MS", "250")),
+    )
@@ -0,0 +1,120 @@
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+# Severity of Playwright console message types, for minimum-level filtering
+LEVELS = {
+    "debug": 10, "trace": 10, "profile": 10, "profileEnd": 10, "timeEnd": 10,
+    "log": 20, "info": 20, "dir": 20, "dirxml": 20, "table": 20, "count": 20,
+    "clear": 20, "startGroup": 20, "startGroupCollapsed": 20, "endGroup": 20,
+    "warning": 30,
+    "error": 40, "assert": 40,
+}
+DEFAULT_LEVEL = 20
+
+
+def level_value(level: str) -> int:
+    """Severity of a console type; "warn" is accepted for "warning" """
+    level = "warning" if level == "warn" else level
+    if level not in LEVELS:
+        raise ValueError(f"Unknown console level: {level}")
+    return LEVELS[level]
+
+
+class ConsoleEntry:
+    """One captured console message"""
+
+    __slots__ = ("seq", "level", "text", "timestamp", "page", "session")
+
+    def __init__(self, seq: int, level: str, text: str, page: str, session: Optional[str]):
+        self.seq = seq
+        self.level = level
+        self.text = text
+        self.timestamp = time.time()
+        self.page = page
+        self.session = session
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "level": self.level,
+            "text": self.text,
+            "timestamp": round(self.timestamp, 3),
+            "page": self.page,
+            "session": self.session,
+        }
+
+
+class ConsoleLogBuffer:
+    """Most recent console messages of every page, oldest dropped first.
+
+    Entries get increasing sequence numbers, so a reader passes the `cursor`
+    of its previous read as `since` to get only what is new, and learns from
+    `dropped` whether messages rolled off the buffer in between.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_text_chars: int = 4000):
+        self.max_entries = max_entries
+        self.max_text_chars = max_text_chars
+        self._entries: "deque[ConsoleEntry]" = deque(maxlen=max_entries)
+        self._seq = 0
+        self.listeners: List[Callable[[ConsoleEntry], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def cursor(self) -> int:
+        """Sequence number of the newest entry, 0 when nothing was logged"""
+        return self._seq
+
+    def append(self, level: str, text: str, page: str = "", session: Optional[str] = None) -> ConsoleEntry:
+        if len(text) > self.max_text_chars:
+            text = text[: self.max_text_chars] + f"... [{len(text) - self.max_text_chars} more chars]"
+        self._seq += 1
+        entry = ConsoleEntry(self._seq, level, text, page, session)
+        self._entries.append(entry)
+        for listener in self.listeners:
+            listener(entry)
+        return entry
+
+    def read(
+        self,
+        since: int = 0,
+        level: Optional[str] = None,
+        session: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Entries newer than `since`, at least `level` severe, oldest first.
+
+        With `limit`, the oldest matching entries are returned and `cursor`
+        points at the last one, so the next read continues from there.
+        """
+        min_level = level_value(level) if level else None
+        oldest = self._entries[0].seq if self._entries else self._seq + 1
+        dropped = max(0, oldest - since - 1) if since < self._seq else 0
+
+        entries = []
+        truncated = False
+        for entry in self._entries:
+            if entry.seq <= since:
+                continue
+            if min_level is not None and LEVELS.get(entry.level, DEFAULT_LEVEL) < min_level:
+                continue
+            if session is not None and entry.session != session:
+                continue
+            if limit is not None and len(entries) >= limit:
+                truncated = True
+                break
+            entries.append(entry)
+
+        cursor = entries[-1].seq if truncated else max(since, self._seq)
+        return {
+            "entries": [entry.to_dict() for entry in entries],
+            "cursor": cursor,
+            "dropped": dropped,
+            "more": truncated,
+        }
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,241 @@
+import asyncio
+import fnmatch
+import re
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from loguru import logger
+from client_bridge.metrics import metrics
+from server.waits import SMART
+
+# Query parameters that only track the visitor and never change the content
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|dclid|msclkid|mc_cid|mc_eid|_ga|ref_src)$")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Title, text and links of a page, text cut to maxChars
+PAGE_SCRIPT = """
+(maxChars) => ({
+    title: document.title,
+    text: (document.body ? document.body.innerText : '').replace(/\\s+/g, ' ').trim().slice(0, maxChars),
+    links: [...document.querySelectorAll('a[href]')].map(a => a.href),
+})
+"""
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """Canonical form of an absolute URL used for dedup, None if not HTTP(S).
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, and sorts the query.
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    try:
+        port = parts.port
+    except ValueError:
+        return None
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+    query = urlencode(sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key)
+    ))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+class FollowRules:
+    """Which discovered links a crawl follows: URL globs to allow and deny, and same-host"""
+
+    def __init__(
+        self,
+        allow: Iterable[str] = (),
+        deny: Iterable[str] = (),
+        same_host: bool = True,
+        seed_hosts: Iterable[str] = (),
+    ):
+        self.allow = [re.compile(fnmatch.translate(p)) for p in allow]
+        self.deny = [re.compile(fnmatch.translate(p)) for p in deny]
+        self.same_host = same_host
+        self.seed_hosts = set(seed_hosts)
+
+    def follows(self, url: str) -> bool:
+        if self.same_host and urlsplit(url).netloc not in self.seed_hosts:
+            return False
+        if any(pattern.match(url) for pattern in self.deny):
+            return False
+        return not self.allow or any(pattern.match(url) for pattern in self.allow)
+
+
+class HostLimiter:
+    """At most `per_host` concurrent pages per host, starts spaced by `delay` seconds"""
+
+    def __init__(self, per_host: int = 2, delay: float = 0.25):
+        self.per_host = per_host
+        self.delay = delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with semaphore:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, 0.0))
+            self._next_start[host] = start + self.delay
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
+class Crawler:
+    """Breadth-first crawl over several isolated pages at once.
+
+    `open_page(label)` is an async context manager giving each worker its
+    own page. Every visited page is passed to `on_page` as soon as it is
+    done, which is how results stream back before the crawl finishes.
+    """
+
+    def __init__(
+        self,
+        open_page: Callable[[str], Any],
+        rules: FollowRules,
+        max_pages: int = 20,
+        max_depth: int = 1,
+        concurrency: int = 4,
+        limiter: Optional[HostLimiter] = None,
+        max_chars: int = 500,
+        wait_until: str = "domcontentloaded",
+        timeout: float = 30000,
+        smart_wait=None,
+        on_page: Optional[Callable[[Dict[str, Any], int, int], Awaitable[None]]] = None,
+    ):
+        self.open_page = open_page
+        self.rules = rules
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.limiter = limiter or HostLimiter()
+        self.max_chars = max_chars
+        self.wait_until = wait_until
+        self.timeout = timeout
+        self.smart_wait = smart_wait
+        self.on_page = on_page
+        self._queue: "asyncio.Queue[Tuple[str, int]]" = asyncio.Queue()
+        # URLs queued for a visit; only these count against max_pages
+        self._seen: set = set()
+        # Where visited URLs redirected to, only used to skip duplicates
+        self._redirects: set = set()
+        self.pages: List[Dict[str, Any]] = []
+        self.duplicates = 0
+        self.skipped = 0
+
+    def _enqueue(self, url: str, depth: int) -> bool:
+        if url in self._seen or url in self._redirects:
+            self.duplicates += 1
+            return False
+        if len(self._seen) >= self.max_pages:
+            self.skipped += 1
+            return False
+        self._seen.add(url)
+        self._queue.put_nowait((url, depth))
+        return True
+
+    async def _visit(self, page, url: str, depth: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        smart = self.wait_until == SMART
+        response = await page.goto(
+            url, timeout=self.timeout, wait_until="domcontentloaded" if smart else self.wait_until
+        )
+        if smart and self.smart_wait is not None:
+            await self.smart_wait.settle(page)
+        content = await page.evaluate(PAGE_SCRIPT, self.max_chars)
+
+        followed = 0
+        if depth < self.max_depth:
+            for link in content["links"]:
+                link = normalize_url(link)
+                if link and self.rules.follows(link) and self._enqueue(link, depth + 1):
+                    followed += 1
+        final_url = normalize_url(page.url)
+        if final_url and final_url != url:
+            # Redirect target, so it is not fetched again under its own URL
+            self._redirects.add(final_url)
+        return {
+            "url": url,
+            "final_url": page.url,
+            "depth": depth,
+            "status": response.status if response else None,
+            "title": content["title"],
+            "text": content["text"],
+            "links": len(content["links"]),
+            "followed": followed,
+            "ms": round((time.perf_counter() - started) * 1000),
+        }
+
+    async def _worker(self, index: int):
+        async with AsyncExitStack() as stack:
+            page = None
+            while True:
+                url, depth = await self._queue.get()
+                try:
+                    if page is None:
+                        # Opened on first use: small crawls need fewer contexts
+                        page = await stack.enter_async_context(self.open_page(f"crawl-{index}"))
+                    async with self.limiter.slot(urlsplit(url).netloc):
+                        with metrics.span("crawl.page") as span:
+                            try:
+                                result = await self._visit(page, url, depth)
+                            except Exception as e:
+                                logger.debug(f"Crawl of {url} failed: {e}")
+                                result = {"url": url, "depth": depth, "error": str(e)}
+                            span.set(depth=depth, error="error" in result)
+                    self.pages.append(result)
+                    if self.on_page is not None:
+                        await self.on_page(result, len(self.pages), len(self._seen))
+                finally:
+                    self._queue.task_done()
+
+    async def run(self, seeds: List[str]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        for seed in seeds:
+            url = normalize_url(seed)
+            if url is None:
+                raise ValueError(f"Not an http(s) URL: {seed}")
+            self.rules.seed_hosts.add(urlsplit(url).netloc)
+            self._enqueue(url, 0)
+
+        workers = [
+            asyncio.create_task(self._worker(index))
+            for index in range(max(1, min(self.concurrency, self.max_pages)))
+        ]
+        # Every queued URL is marked done even when its visit fails, so
+        # join() returns once the frontier is exhausted
+        join = asyncio.create_task(self._queue.join())
+        try:
+            done, _ = await asyncio.wait([join, *workers], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Also on cancellation of the crawl, so every worker closes its page
+            for task in (join, *workers):
+                task.cancel()
+            await asyncio.gather(join, *workers, return_exceptions=True)
+        if join not in done:
+            # A worker died before the frontier was drained, e.g. no browser
+            for task in done:
+                task.result()
+
+        return {
+            "pages": self.pages,
+            "visited": len(self.pages),
+            "errors": sum(1 for page in self.pages if "error" in page),
+            "duplicates": self.duplicates,
+            "skipped_over_limit": self.skipped,
+            "elapsed_s": round(time.perf_counter() - started, 2),
+        }
@@ -0,0 +1,189 @@
+from typing import Any, Dict, List, Optional
+from client_bridge.metrics import metrics
+from client_bridge.tokenizer import count_tokens, truncate_to_tokens
+
+# Collects visible, actionable elements with candidate CSS selectors
+INTERACTIVE_ELEMENTS_SCRIPT = """
+() => {
+    const QUERY = [
+        'a[href]', 'button', 'input:not([type=hidden])', 'select', 'textarea',
+        'summary', 'label', '[role=button]', '[role=link]', '[role=checkbox]',
+        '[role=radio]', '[role=tab]', '[role=menuitem]', '[role=option]',
+        '[role=switch]', '[role=combobox]', '[role=textbox]', '[onclick]',
+        '[contenteditable=""]', '[contenteditable=true]', '[tabindex]:not([tabindex="-1"])',
+    ].join(',');
+    const ATTRIBUTES = [
+        'id', 'name', 'type', 'placeholder', 'aria-label', 'title', 'alt',
+        'href', 'value', 'for', 'data-testid', 'data-test', 'data-qa',
+    ];
+    const esc = (value) => CSS.escape(value);
+    const unique = (selector) => {
+        try { return document.querySelectorAll(selector).length === 1; }
+        catch (e) { return false; }
+    };
+    const pathSelector = (el) => {
+        const parts = [];
+        while (el && el.nodeType === 1 && el !== document.body) {
+            if (el.id) { parts.unshift('#' + esc(el.id)); break; }
+            let part = el.tagName.toLowerCase();
+            const siblings = el.parentElement
+                ? [...el.parentElement.children].filter(s => s.tagName === el.tagName)
+                : [];
+            if (siblings.length > 1) part += `:nth-of-type(${siblings.indexOf(el) + 1})`;
+            parts.unshift(part);
+            el = el.parentElement;
+        }
+        return parts.join(' > ');
+    };
+    const selectors = (el) => {
+        const tag = el.tagName.toLowerCase();
+        const candidates = [];
+        if (el.id) candidates.push('#' + esc(el.id));
+        for (const attr of ['data-testid', 'data-test', 'data-qa', 'name', 'aria-label', 'placeholder']) {
+            const value = el.getAttribute(attr);
+            if (value) candidates.push(`${tag}[${attr}="${value.replace(/"/g, '\\\\"')}"]`);
+        }
+        if (tag === 'a' && el.getAttribute('href')) {
+            candidates.push(`a[href="${el.getAttribute('href').replace(/"/g, '\\\\"')}"]`);
+        }
+        const classes = [...el.classList].filter(c => !/\\d{3,}/.test(c)).slice(0, 2);
+        if (classes.length) candidates.push(tag + classes.map(c => '.' + esc(c)).join(''));
+        const found = candidates.filter(unique);
+        if (!found.length) found.push(pathSelector(el));
+        return found.slice(0, 3);
+    };
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        if (rect.width === 0 && rect.height === 0) return false;
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    };
+    const results = [];
+    for (const el of document.querySelectorAll(QUERY)) {
+        if (!visible(el)) continue;
+        const attributes = {};
+        for (const attr of ATTRIBUTES) {
+            const value = el.getAttribute(attr);
+            if (value) attributes[attr] = value.slice(0, 80);
+        }
+        results.push({
+            tag: el.tagName.toLowerCase(),
+            role: el.getAttribute('role') || '',
+            text: (el.innerText || el.value || '').replace(/\\s+/g, ' ').trim().slice(0, 80),
+            selectors: selectors(el),
+            attributes,
+            disabled: !!el.disabled,
+            checked: !!el.checked,
+        });
+    }
+    return { title: document.title, url: location.href, elements: results };
+}
+"""
+
+# Serializes the body without scripts, styles, SVGs, comments and noisy attributes
+CLEAN_HTML_SCRIPT = """
+() => {
+    const KEEP = new Set([
+        'id', 'name', 'type', 'role', 'href', 'placeholder', 'aria-label', 'title',
+        'alt', 'value', 'for', 'class', 'data-testid', 'data-test', 'data-qa',
+    ]);
+    const root = document.body.cloneNode(true);
+    root.querySelectorAll(
+        'script, style, noscript, template, svg, canvas, iframe, link, meta, path, picture source'
+    ).forEach(el => el.remove());
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_COMMENT);
+    const comments = [];
+    while (walker.nextNode()) comments.push(walker.currentNode);
+    comments.forEach(node => node.remove());
+    root.querySelectorAll('*').forEach(el => {
+        for (const attr of [...el.attributes]) {
+            if (!KEEP.has(attr.name)) el.removeAttribute(attr.name);
+            else if (attr.value.length > 100) el.setAttribute(attr.name, attr.value.slice(0, 100));
+        }
+    });
+    return root.outerHTML.replace(/\\s+/g, ' ');
+}
+"""
+
+
+def describe_element(element: Dict[str, Any]) -> str:
+    """Tag/role, text, state, selectors and key attributes of an element"""
+    role = f" role={element['role']}" if element["role"] else ""
+    text = f' "{element["text"]}"' if element["text"] else ""
+    selectors = " | ".join(element["selectors"])
+    attributes = " ".join(
+        f"{name}={value!r}"
+        for name, value in element["attributes"].items()
+        if name not in ("id",)
+    )
+    state = "".join(
+        f" {flag}" for flag in ("disabled", "checked") if element.get(flag)
+    )
+    line = f"<{element['tag']}{role}>{text}{state} selector: {selectors}"
+    return f"{line} {attributes}" if attributes else line
+
+
+def format_element(index: int, element: Dict[str, Any]) -> str:
+    """One outline line: index, tag/role, text, selectors and key attributes"""
+    return f"[{index}] {describe_element(element)}"
+
+
+def render_lines(
+    header: str,
+    lines: List[str],
+    token_budget: int,
+    model: Optional[str] = None,
+    noun: str = "elements",
+) -> str:
+    """Header plus as many lines as fit in the token budget"""
+    shown = fitting_lines(header, lines, token_budget, model)
+    rendered = [header, *lines[:shown]]
+    if shown < len(lines):
+        rendered.append(f"... {len(lines) - shown} more {noun} omitted")
+    return "\n".join(rendered)
+
+
+def fitting_lines(header: str, lines: List[str], token_budget: int, model: Optional[str] = None) -> int:
+    """How many leading lines render_lines() keeps within the token budget"""
+    used = count_tokens(header, model)
+    for index, line in enumerate(lines):
+        used += count_tokens(line, model) + 1
+        if used > token_budget:
+            return index
+    return len(lines)
+
+
+def build_outline(
+    snapshot: Dict[str, Any], token_budget: int, model: Optional[str] = None
+) -> str:
+    """Render interactive elements as outline lines until the token budget is used"""
+    header = f"Page: {snapshot['title']} ({snapshot['url']})"
+    lines = [format_element(index, element) for index, element in enumerate(snapshot["elements"])]
+    return render_lines(header, lines, token_budget, model)
+
+
+async def distill_page(
+    page, mode: str = "outline", token_budget: int = 4000, model: Optional[str] = None
+) -> str:
+    """Compact view of a page for selector prompts.
+
+    "outline" lists actionable elements with candidate selectors; "html" is the
+    body with non-interactive noise stripped; "raw" is page.content(). Every
+    mode is cut to the token budget.
+    """
+    if mode not in ("outline", "html", "raw"):
+        raise ValueError(f"Unknown distill mode: {mode}")
+    with metrics.span("page.distill", mode=mode) as span:
+        if mode == "outline":
+            snapshot = await page.evaluate(INTERACTIVE_ELEMENTS_SCRIPT)
+            span.set(source_elements=len(snapshot["elements"]))
+            distilled = build_outline(snapshot, token_budget, model)
+        else:
+            if mode == "html":
+                html = await page.evaluate(CLEAN_HTML_SCRIPT)
+            else:
+                html = await page.content()
+            span.set(source_chars=len(html))
+            distilled = truncate_to_tokens(html, token_budget, model)
+        span.set(chars=len(distilled))
+    return distilled
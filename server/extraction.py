@@ -0,0 +1,348 @@
+import csv
+import json
+import re
+import secrets
+import shutil
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from loguru import logger
+from client_bridge.metrics import metrics
+
+# Rows of a table, or of repeated items with optional per-field selectors
+# ("selector", "selector@attribute" or "@attribute" of the item itself)
+EXTRACT_SCRIPT = """
+({ selector, kind, itemSelector, fields }) => {
+    const text = (el) => (el ? (el.innerText ?? el.textContent ?? '') : '').replace(/\\s+/g, ' ').trim();
+    const root = selector ? document.querySelector(selector) : document.body;
+    if (!root) return { error: `No element matches ${selector}` };
+
+    let table = null;
+    if (kind !== 'list') {
+        table = root.tagName === 'TABLE' ? root : root.querySelector('table');
+        if (!table && kind === 'table') return { error: 'No table found' };
+    }
+    if (table) {
+        const head = table.tHead && table.tHead.rows.length
+            ? table.tHead.rows[table.tHead.rows.length - 1] : null;
+        let body = [...table.rows].filter(row => row.parentElement.tagName !== 'THEAD');
+        let headerCells = head ? [...head.cells] : null;
+        if (!headerCells && body.length && [...body[0].cells].every(c => c.tagName === 'TH')) {
+            headerCells = [...body[0].cells];
+            body = body.slice(1);
+        }
+        body = body.filter(row => row.cells.length);
+        const width = Math.max(headerCells ? headerCells.length : 0, ...body.map(row => row.cells.length), 0);
+        const columns = [...Array(width)].map(
+            (_, i) => (headerCells && headerCells[i] && text(headerCells[i])) || `column_${i + 1}`
+        );
+        return {
+            columns,
+            rows: body.map(row => columns.map((_, i) => row.cells[i] ? text(row.cells[i]) : null)),
+        };
+    }
+
+    const items = itemSelector ? [...root.querySelectorAll(itemSelector)] : [...root.children];
+    if (fields && Object.keys(fields).length) {
+        const columns = Object.keys(fields);
+        const value = (item, spec) => {
+            const at = spec.lastIndexOf('@');
+            const sel = at >= 0 ? spec.slice(0, at) : spec;
+            const attr = at >= 0 ? spec.slice(at + 1) : null;
+            const el = sel ? item.querySelector(sel) : item;
+            if (!el) return null;
+            if (!attr) return text(el);
+            if ((attr === 'href' || attr === 'src') && el[attr]) return el[attr];
+            return el.getAttribute(attr);
+        };
+        return { columns, rows: items.map(item => columns.map(name => value(item, fields[name]))) };
+    }
+    return {
+        columns: ['text', 'href'],
+        rows: items.map(item => {
+            const link = item.matches('a[href]') ? item : item.querySelector('a[href]');
+            return [text(item), link ? link.href : null];
+        }),
+    };
+}
+"""
+
+PREVIEW_ROWS = 5  # rows returned inline when writing to a file
+# No leading zeros: "007" or "02134" are IDs and ZIP codes, kept as text
+NUMBER = re.compile(r"^[-+]?(0|[1-9]\d{0,2}(,\d{3})+|[1-9]\d*)(\.\d+)?$")
+
+
+def coerce(value: Optional[str]) -> Any:
+    """Typed cell value: int, float, bool, None for empty cells, else the text"""
+    if value is None:
+        return None
+    text = value.strip()
+    if not text:
+        return None
+    if NUMBER.match(text):
+        number = text.replace(",", "")
+        return float(number) if "." in number else int(number)
+    if text.lower() in ("true", "false"):
+        return text.lower() == "true"
+    return text
+
+
+def unique_columns(columns: List[str]) -> List[str]:
+    seen: Dict[str, int] = {}
+    result = []
+    for name in columns:
+        seen[name] = seen.get(name, 0) + 1
+        result.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return result
+
+
+class ColumnTypes:
+    """Type of each column over all rows seen: integer, number, boolean or string"""
+
+    NAMES = {int: "integer", float: "number", bool: "boolean", str: "string"}
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+        self._seen: List[set] = [set() for _ in columns]
+
+    def observe(self, row: List[Any]):
+        for seen, value in zip(self._seen, row):
+            if value is not None:
+                seen.add(self.NAMES[type(value)])
+
+    def to_dict(self) -> Dict[str, str]:
+        types = {}
+        for name, seen in zip(self.columns, self._seen):
+            if seen == {"integer", "number"}:
+                types[name] = "number"
+            elif len(seen) == 1:
+                types[name] = next(iter(seen))
+            else:
+                types[name] = "string" if seen else "null"
+        return types
+
+
+async def extract_pages(
+    page,
+    selector: Optional[str] = None,
+    kind: str = "auto",
+    item_selector: Optional[str] = None,
+    fields: Optional[Dict[str, str]] = None,
+    next_selector: Optional[str] = None,
+    max_pages: int = 1,
+    smart_wait=None,
+) -> AsyncIterator[Tuple[List[str], List[List[Any]]]]:
+    """Yield (columns, typed rows) per page, following `next_selector` up to max_pages.
+
+    "auto" extracts the first table under `selector`, or a list when
+    `item_selector` or `fields` describe the items.
+    """
+    if kind not in ("auto", "table", "list"):
+        raise ValueError(f"Unknown extraction kind: {kind}")
+    if kind == "auto" and (item_selector or fields):
+        kind = "list"
+    for page_number in range(1, max(1, max_pages) + 1):
+        with metrics.span("page.extract", kind=kind) as span:
+            result = await page.evaluate(EXTRACT_SCRIPT, {
+                "selector": selector,
+                "kind": kind,
+                "itemSelector": item_selector,
+                "fields": fields,
+            })
+            if result.get("error"):
+                raise ValueError(result["error"])
+            span.set(rows=len(result["rows"]))
+        yield unique_columns(result["columns"]), [[coerce(v) for v in row] for row in result["rows"]]
+
+        if not next_selector or page_number >= max_pages:
+            return
+        next_link = page.locator(next_selector).first
+        if not await next_link.count() or not await next_link.is_enabled():
+            return
+        await next_link.click()
+        if smart_wait is not None:
+            await smart_wait.settle(page)
+        else:
+            await page.wait_for_load_state()
+
+
+class Extraction:
+    """Rows of one extraction, kept in memory for chunked reads or written to a file"""
+
+    def __init__(self, extraction_id: str, source_url: str, path: Optional[Path] = None):
+        self.id = extraction_id
+        self.source_url = source_url
+        self.path = path
+        self.columns: List[str] = []
+        self.types: Optional[ColumnTypes] = None
+        self.rows: List[List[Any]] = []
+        self.total_rows = 0
+        self.pages = 0
+        self.truncated = False
+        self._writer = None
+        self._file = None
+
+    def add_page(self, columns: List[str], rows: List[List[Any]], max_rows: int):
+        """Add typed rows; at most max_rows are kept in memory (a preview when writing a file)"""
+        if self.types is None:
+            self.columns = columns
+            self.types = ColumnTypes(columns)
+            if self.path is not None:
+                self._open()
+        elif columns != self.columns:
+            # Later pages are aligned by name; unknown columns are dropped
+            index = {name: i for i, name in enumerate(columns)}
+            rows = [[row[index[name]] if name in index else None for name in self.columns] for row in rows]
+        self.pages += 1
+        for row in rows:
+            self.types.observe(row)
+            self.total_rows += 1
+            if self._file is not None:
+                self._write(row)
+            if len(self.rows) < max_rows:
+                self.rows.append(row)
+            elif self._file is None:
+                self.truncated = True
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8", newline="")
+        if self.path.suffix == ".csv":
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(self.columns)
+
+    def _write(self, row: List[Any]):
+        if self._writer is not None:
+            self._writer.writerow(["" if value is None else value for value in row])
+        else:
+            self._file.write(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False) + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "extraction": self.id,
+            "source": self.source_url,
+            "pages": self.pages,
+            "total_rows": self.total_rows,
+            "columns": self.columns,
+            "types": self.types.to_dict() if self.types else {},
+        }
+
+    def chunk(self, offset: int, size: int) -> Dict[str, Any]:
+        rows = self.rows[offset:offset + size]
+        end = offset + len(rows)
+        # Rows go last: a tool output cut to the history's token limit keeps
+        # its head, so the cursor and summary must come before them
+        result = {
+            **self.summary(),
+            "offset": offset,
+            "next_cursor": f"{self.id}:{end}" if end < len(self.rows) else None,
+        }
+        if self.truncated:
+            result["truncated"] = f"only the first {len(self.rows)} rows were kept; use output='jsonl' or 'csv'"
+        result["rows"] = rows
+        return result
+
+
+class ExtractionStore:
+    """Recent extractions for cursor reads, plus their exported files"""
+
+    def __init__(
+        self,
+        chunk_size: int = 50,
+        max_rows: int = 10000,
+        keep_results: int = 20,
+        export_dir: Optional[str] = None,
+    ):
+        self.chunk_size = chunk_size
+        self.max_rows = max_rows
+        self.keep_results = keep_results
+        self._export_dir = Path(export_dir) if export_dir else None
+        self._owns_export_dir = False  # created here, so removed by close()
+        self._results: "OrderedDict[str, Extraction]" = OrderedDict()
+
+    @property
+    def export_dir(self) -> Path:
+        if self._export_dir is None:
+            self._export_dir = Path(tempfile.mkdtemp(prefix="mcp-extractions-"))
+            self._owns_export_dir = True
+        return self._export_dir
+
+    def create(self, source_url: str, output: Optional[str] = None) -> Extraction:
+        if output not in (None, "jsonl", "csv"):
+            raise ValueError(f"Unknown output format: {output}")
+        extraction_id = secrets.token_hex(4)
+        path = self.export_dir / f"{extraction_id}.{output}" if output else None
+        extraction = Extraction(extraction_id, source_url, path)
+        self._results[extraction_id] = extraction
+        while len(self._results) > self.keep_results:
+            _, evicted = self._results.popitem(last=False)
+            evicted.close()
+        return extraction
+
+    def get(self, extraction_id: str) -> Extraction:
+        extraction = self._results.get(extraction_id)
+        if extraction is None:
+            raise ValueError(f"Extraction {extraction_id} not found or expired")
+        self._results.move_to_end(extraction_id)
+        return extraction
+
+    def close(self):
+        """Forget all extractions; a temporary export directory is removed with its files"""
+        for extraction in self._results.values():
+            extraction.close()
+        self._results.clear()
+        if self._owns_export_dir:
+            shutil.rmtree(self._export_dir, ignore_errors=True)
+            self._export_dir = None
+            self._owns_export_dir = False
+
+    def read_chunk(self, cursor: str, chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """Rows following a `next_cursor` returned by an earlier read"""
+        extraction_id, _, offset = cursor.partition(":")
+        if not offset.isdigit():
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return self.get(extraction_id).chunk(int(offset), chunk_size or self.chunk_size)
+
+    def read_file(self, name: str) -> str:
+        """Contents of an exported file, by file name"""
+        extraction = self.get(Path(name).stem)
+        if extraction.path is None or extraction.path.name != name:
+            raise ValueError(f"Extraction file {name} not found")
+        return extraction.path.read_text(encoding="utf-8")
+
+    async def run(
+        self,
+        page,
+        output: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        **options,
+    ) -> Dict[str, Any]:
+        """Extract from the page (see extract_pages) and return the first chunk.
+
+        With `output` ("jsonl" or "csv") rows are streamed to a file instead of
+        kept in memory, and only a short preview is returned.
+        """
+        extraction = self.create(page.url, output)
+        try:
+            async for columns, rows in extract_pages(page, **options):
+                extraction.add_page(
+                    columns, rows, PREVIEW_ROWS if output else self.max_rows
+                )
+        finally:
+            extraction.close()
+        if extraction.path is None:
+            return extraction.chunk(0, chunk_size or self.chunk_size)
+        logger.debug(f"Wrote {extraction.total_rows} rows to {extraction.path}")
+        return {
+            **extraction.summary(),
+            "resource": f"extraction://{extraction.path.name}",
+            "path": str(extraction.path),
+            "preview": extraction.rows,
+        }
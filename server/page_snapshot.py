@@ -0,0 +1,178 @@
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+from client_bridge.metrics import metrics
+from server.dom_distiller import (
+    INTERACTIVE_ELEMENTS_SCRIPT,
+    describe_element,
+    fitting_lines,
+    render_lines,
+)
+
+
+class PageSnapshot:
+    """Interactive elements of a page, keyed by their primary selector"""
+
+    def __init__(self, version: int, title: str, url: str, elements: Dict[str, str]):
+        self.version = version
+        self.title = title
+        self.url = url
+        self.elements = elements  # key -> outline line, in document order
+
+    @classmethod
+    def from_page_state(cls, version: int, state: Dict[str, Any]) -> "PageSnapshot":
+        elements: Dict[str, str] = {}
+        for element in state["elements"]:
+            selectors = element["selectors"]
+            base = selectors[0] if selectors else f"{element['tag']}:{element['text']}"
+            # Fallback path selectors are not guaranteed to be unique
+            key, occurrence = base, 1
+            while key in elements:
+                occurrence += 1
+                key = f"{base}#{occurrence}"
+            elements[key] = describe_element(element)
+        return cls(version, state["title"], state["url"], elements)
+
+    def first(self, count: int) -> "PageSnapshot":
+        """The same snapshot with only its first `count` elements"""
+        keys = list(self.elements)[:count]
+        return PageSnapshot(self.version, self.title, self.url, {k: self.elements[k] for k in keys})
+
+
+class SnapshotDiff:
+    """Structural changes between two snapshots of the same page"""
+
+    def __init__(self, previous: PageSnapshot, current: PageSnapshot):
+        self.previous = previous
+        self.current = current
+        self.added = [key for key in current.elements if key not in previous.elements]
+        self.removed = [key for key in previous.elements if key not in current.elements]
+        self.changed = [
+            key
+            for key, line in current.elements.items()
+            if key in previous.elements and previous.elements[key] != line
+        ]
+
+    @property
+    def size(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    @property
+    def unchanged(self) -> int:
+        return len(self.current.elements) - len(self.added) - len(self.changed)
+
+    def _page_lines(self) -> List[str]:
+        lines = []
+        if self.current.url != self.previous.url:
+            lines.append(f"URL changed from {self.previous.url}")
+        if self.current.title != self.previous.title:
+            lines.append(f"Title changed from {self.previous.title!r}")
+        return lines
+
+    def _changes(self) -> List[Tuple[str, str]]:
+        return [
+            *(("-", key) for key in self.removed),
+            *(("+", key) for key in self.added),
+            *(("~", key) for key in self.changed),
+        ]
+
+    def lines(self) -> List[str]:
+        lines = self._page_lines()
+        for sign, key in self._changes():
+            snapshot = self.previous if sign == "-" else self.current
+            lines.append(f"{sign} {snapshot.elements[key]}")
+        return lines
+
+    def seen(self, shown: int) -> PageSnapshot:
+        """What a reader knows after seeing the first `shown` lines of the diff"""
+        elements = dict(self.previous.elements)
+        for sign, key in self._changes()[:max(0, shown - len(self._page_lines()))]:
+            if sign == "-":
+                del elements[key]
+            else:
+                elements[key] = self.current.elements[key]
+        return PageSnapshot(self.current.version, self.current.title, self.current.url, elements)
+
+
+class PageSnapshots:
+    """Last snapshot each reader took of each page, so later calls send only changes.
+
+    A reader is whoever will interpret the diff, e.g. one conversation; two
+    readers sharing a page each get diffs against what they saw themselves.
+    Pages are held weakly and forgotten when closed.
+    """
+
+    def __init__(self):
+        self._last: "weakref.WeakKeyDictionary[Any, Dict[Optional[str], PageSnapshot]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.full_snapshots = 0
+        self.diffs = 0
+
+    def forget(self, page, reader: Optional[str] = None):
+        self._last.get(page, {}).pop(reader, None)
+
+    async def take(
+        self,
+        page,
+        reader: Optional[str] = None,
+        full: bool = False,
+        token_budget: int = 4000,
+        model: Optional[str] = None,
+    ) -> str:
+        """Full snapshot on the first call (or when asked), else the diff to the last one.
+
+        A diff that would be as large as the page itself, e.g. after
+        navigating elsewhere, is replaced by a full snapshot.
+        """
+        with metrics.span("page.snapshot") as span:
+            state = await page.evaluate(INTERACTIVE_ELEMENTS_SCRIPT)
+            readers = self._last.setdefault(page, {})
+            previous = readers.get(reader)
+            current = PageSnapshot.from_page_state(
+                previous.version + 1 if previous else 1, state
+            )
+
+            # The baseline of the next diff is what this reader was shown, so
+            # elements cut by the token budget are reported as added later
+            diff = SnapshotDiff(previous, current) if previous and not full else None
+            if diff is not None and diff.size < len(current.elements):
+                self.diffs += 1
+                span.set(kind="diff", elements=len(current.elements), changes=diff.size)
+                text, readers[reader] = self._render_diff(diff, token_budget, model)
+                return text
+
+            self.full_snapshots += 1
+            span.set(kind="full", elements=len(current.elements))
+            header = f"Snapshot {current.version} of {current.title} ({current.url})"
+            if diff is not None:
+                header += ", full because most of the page changed"
+            lines = list(current.elements.values())
+            readers[reader] = current.first(fitting_lines(header, lines, token_budget, model))
+            return render_lines(header, lines, token_budget, model)
+
+    @staticmethod
+    def _render_diff(
+        diff: SnapshotDiff, token_budget: int, model: Optional[str]
+    ) -> Tuple[str, PageSnapshot]:
+        """Rendered diff, and the snapshot the reader knows after reading it"""
+        current = diff.current
+        lines = diff.lines()
+        if not lines:
+            return (
+                f"Snapshot {current.version} of {current.title} ({current.url}): "
+                f"no changes since snapshot {diff.previous.version}"
+            ), current
+        header = (
+            f"Snapshot {current.version} of {current.title} ({current.url}), "
+            f"changes since snapshot {diff.previous.version} "
+            f"(- removed, + added, ~ changed; {diff.unchanged} elements unchanged)"
+        )
+        shown = fitting_lines(header, lines, token_budget, model)
+        return render_lines(header, lines, token_budget, model, noun="changes"), diff.seen(shown)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pages": len(self._last),
+            "full_snapshots": self.full_snapshots,
+            "diffs": self.diffs,
+        }
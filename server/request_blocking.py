@@ -0,0 +1,137 @@
+import fnmatch
+import re
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+# Playwright resource types that can be blocked by name
+RESOURCE_TYPES = {
+    "document", "stylesheet", "image", "media", "font", "script", "texttrack",
+    "xhr", "fetch", "eventsource", "websocket", "manifest", "other",
+}
+
+# Named URL groups usable in place of explicit patterns
+URL_PATTERN_GROUPS = {
+    "ads": [
+        "*doubleclick.net/*",
+        "*googlesyndication.com/*",
+        "*googleadservices.com/*",
+        "*adservice.google.*",
+        "*amazon-adsystem.com/*",
+        "*adnxs.com/*",
+        "*criteo.com/*",
+        "*taboola.com/*",
+        "*outbrain.com/*",
+        "*/ads/*",
+    ],
+    "analytics": [
+        "*google-analytics.com/*",
+        "*googletagmanager.com/*",
+        "*analytics.*",
+        "*hotjar.com/*",
+        "*segment.io/*",
+        "*segment.com/*",
+        "*mixpanel.com/*",
+        "*newrelic.com/*",
+        "*nr-data.net/*",
+        "*facebook.net/*",
+        "*clarity.ms/*",
+    ],
+}
+
+# Rough median transfer sizes, used to estimate savings for resource types
+# that have not been observed unblocked yet.
+TYPICAL_RESOURCE_BYTES = {
+    "image": 15_000,
+    "font": 30_000,
+    "media": 250_000,
+    "script": 20_000,
+    "stylesheet": 10_000,
+}
+
+
+class BlockPolicy:
+    """Decides which requests to abort, by resource type or URL pattern"""
+
+    def __init__(
+        self,
+        resource_types: Iterable[str] = (),
+        url_patterns: Iterable[str] = (),
+    ):
+        self.resource_types = frozenset(resource_types)
+        self.url_patterns = tuple(url_patterns)
+        self._url_regex = (
+            re.compile("|".join(fnmatch.translate(p) for p in self.url_patterns))
+            if self.url_patterns
+            else None
+        )
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "BlockPolicy":
+        """Build a policy from a mix of resource types, group names and URL globs"""
+        resource_types, url_patterns = [], []
+        for name in names:
+            name = name.strip()
+            if not name:
+                continue
+            if name in RESOURCE_TYPES:
+                resource_types.append(name)
+            elif name in URL_PATTERN_GROUPS:
+                url_patterns.extend(URL_PATTERN_GROUPS[name])
+            else:
+                url_patterns.append(name)
+        return cls(resource_types, url_patterns)
+
+    def __bool__(self) -> bool:
+        return bool(self.resource_types or self.url_patterns)
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.resource_types:
+            return True
+        return bool(self._url_regex and self._url_regex.match(url))
+
+
+class BlockStats:
+    """Counts of blocked and loaded requests with an estimate of bytes saved"""
+
+    def __init__(self):
+        self.blocked_requests = 0
+        self.blocked_by_type: Counter = Counter()
+        self.estimated_bytes_saved = 0
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+        self._loaded_bytes_by_type: Counter = Counter()
+        self._loaded_count_by_type: Counter = Counter()
+
+    def average_size(self, resource_type: str) -> int:
+        count = self._loaded_count_by_type[resource_type]
+        if count:
+            return self._loaded_bytes_by_type[resource_type] // count
+        return TYPICAL_RESOURCE_BYTES.get(resource_type, 0)
+
+    def record_blocked(self, resource_type: str, estimated_size: int):
+        self.blocked_requests += 1
+        self.blocked_by_type[resource_type] += 1
+        self.estimated_bytes_saved += estimated_size
+
+    def record_loaded(self, resource_type: str, size: Optional[int]):
+        self.loaded_requests += 1
+        if size is not None:
+            self.loaded_bytes += size
+            self._loaded_bytes_by_type[resource_type] += size
+            self._loaded_count_by_type[resource_type] += 1
+
+    def summary(self) -> str:
+        by_type = ", ".join(f"{t}={n}" for t, n in self.blocked_by_type.most_common())
+        return (
+            f"blocked {self.blocked_requests} requests ({by_type}), "
+            f"~{self.estimated_bytes_saved / 1024:.0f} KB saved"
+        )
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+            "loaded_requests": self.loaded_requests,
+            "loaded_bytes": self.loaded_bytes,
+        }
@@ -0,0 +1,63 @@
+import asyncio
+import weakref
+from typing import Dict, Optional, Set
+from loguru import logger
+from pydantic import AnyUrl
+
+
+class ResourceUpdateNotifier:
+    """Debounced `notifications/resources/updated` for subscribed sessions.
+
+    Sessions subscribe through `resources/subscribe` (or by reading a
+    resource that opts in). changed() may be called for every change; each
+    URI is announced at most once per `debounce` seconds. Sessions are held
+    weakly and dropped once sending to them fails.
+    """
+
+    def __init__(self, debounce: float = 0.5):
+        self.debounce = debounce
+        self._subscribers: Dict[str, "weakref.WeakSet"] = {}
+        self._pending: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.sent = 0
+
+    def subscribe(self, uri: str, session):
+        self._subscribers.setdefault(str(uri), weakref.WeakSet()).add(session)
+
+    def unsubscribe(self, uri: str, session):
+        sessions = self._subscribers.get(str(uri))
+        if sessions is not None:
+            sessions.discard(session)
+
+    def subscribers(self, uri: str) -> int:
+        return len(self._subscribers.get(str(uri), ()))
+
+    def changed(self, uri: str):
+        """Schedule an update notification for `uri` if anyone listens"""
+        uri = str(uri)
+        if not self._subscribers.get(uri):
+            return
+        self._pending.add(uri)
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.debounce)
+        pending, self._pending = self._pending, set()
+        for uri in pending:
+            for session in list(self._subscribers.get(uri, ())):
+                try:
+                    await session.send_resource_updated(AnyUrl(uri))
+                    self.sent += 1
+                except Exception as e:
+                    logger.debug(f"Dropping {uri} subscriber: {e!r}")
+                    self.unsubscribe(uri, session)
+
+    async def close(self):
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._pending.clear()
@@ -0,0 +1,316 @@
+import atexit
+import hashlib
+import json
+import os
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from loguru import logger
+
+# Statuses cacheable by default (RFC 9111 section 4.2.2), given explicit freshness
+CACHEABLE_STATUS = {200, 203, 204, 300, 301, 308, 404, 410}
+# Not replayed: the stored body is already decoded and its length may differ
+DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+INDEX_SAVE_INTERVAL = 5.0  # seconds between index writes while storing
+# Buffered in full by route.fetch(), so streams (media, eventsource, ...) bypass the cache
+CACHEABLE_TYPES = {"document", "script", "stylesheet", "image", "font", "xhr", "fetch"}
+# Requests carrying credentials may get responses meant for one user only
+CREDENTIAL_HEADERS = {"authorization", "cookie"}
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Dict[str, str]) -> Optional[float]:
+    """Seconds a response may be served without revalidation, None if not cacheable"""
+    directives = parse_cache_control(headers.get("cache-control", ""))
+    if "no-store" in directives or "no-cache" in directives:
+        return None
+    if "max-age" in directives:
+        try:
+            return max(0.0, float(directives["max-age"] or 0))
+        except ValueError:
+            return None
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        date = _http_date(headers.get("date")) or time.time()
+        return max(0.0, expires - date)
+    return None
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of HTTP responses for browser routing.
+
+    Only GET responses with explicit freshness (max-age or Expires) are
+    stored; no-store, no-cache and `Vary: *` are respected. The cache is
+    shared by every browser context, so private responses, responses setting
+    cookies and responses to requests with credentials are never stored.
+    Bodies are stored
+    once per content hash, so identical assets under different URLs share a
+    file. Stale entries with an ETag or Last-Modified are revalidated, and
+    served if the network fails. Least recently used entries are evicted
+    once the bodies exceed `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._objects = self.directory / "objects"
+        self._index_path = self.directory / "index.json"
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._blob_refs: Dict[str, int] = {}
+        self._blob_sizes: Dict[str, int] = {}
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stale_served = 0
+        self.stores = 0
+        self.evictions = 0
+        self._load()
+        self._remove_orphans()
+        # Entries stored since the last periodic save would otherwise be lost
+        atexit.register(self.save)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(self._blob_sizes.values())
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        return hashlib.sha256(f"{method.upper()} {url}".encode("utf-8")).hexdigest()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self._objects / digest[:2] / digest
+
+    def _load(self):
+        try:
+            entries = json.loads(self._index_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable response cache index: {e}")
+            return
+        for key, entry in entries.items():
+            path = self._blob_path(entry["digest"])
+            if path.exists():
+                self._add_entry(key, entry, path.stat().st_size)
+
+    def _remove_orphans(self):
+        """Delete bodies no index entry refers to, e.g. written after the last
+        index save of a run that did not shut down cleanly"""
+        if not self._objects.is_dir():
+            return
+        removed = 0
+        for path in self._objects.glob("*/*"):
+            if path.is_file() and path.name not in self._blob_sizes:
+                path.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.debug(f"Removed {removed} unindexed response cache bodies")
+
+    def save(self):
+        """Write the index atomically"""
+        if not self._dirty:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = self._index_path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self._entries), encoding="utf-8")
+        os.replace(temporary, self._index_path)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def _changed(self):
+        self._dirty = True
+        if time.monotonic() - self._saved_at > INDEX_SAVE_INTERVAL:
+            self.save()
+
+    def _add_entry(self, key: str, entry: Dict[str, Any], size: int):
+        self._entries[key] = entry
+        digest = entry["digest"]
+        self._blob_refs[digest] = self._blob_refs.get(digest, 0) + 1
+        self._blob_sizes[digest] = size
+
+    def _remove_entry(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        digest = entry["digest"]
+        self._blob_refs[digest] -= 1
+        if self._blob_refs[digest] <= 0:
+            del self._blob_refs[digest]
+            del self._blob_sizes[digest]
+            self._blob_path(digest).unlink(missing_ok=True)
+
+    def _evict(self):
+        total = self.size_bytes
+        for key in sorted(self._entries, key=lambda k: self._entries[k]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            digest = self._entries[key]["digest"]
+            if self._blob_refs[digest] == 1:
+                total -= self._blob_sizes[digest]
+            self._remove_entry(key)
+            self.evictions += 1
+
+    def lookup(self, method: str, url: str, request_headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Stored entry matching the request, fresh or stale"""
+        entry = self._entries.get(self.key(method, url))
+        if entry is None:
+            return None
+        for name, value in entry["vary"].items():
+            if request_headers.get(name) != value:
+                return None
+        return entry
+
+    def body(self, entry: Dict[str, Any]) -> Optional[bytes]:
+        try:
+            data = self._blob_path(entry["digest"]).read_bytes()
+        except OSError:
+            return None
+        entry["last_access"] = time.time()
+        return data
+
+    def store(
+        self,
+        method: str,
+        url: str,
+        request_headers: Dict[str, str],
+        status: int,
+        headers: Dict[str, str],
+        body: bytes,
+    ) -> bool:
+        """Store a response if its status and headers allow it"""
+        if method.upper() != "GET" or status not in CACHEABLE_STATUS:
+            return False
+        if any(request_headers.get(name) for name in CREDENTIAL_HEADERS):
+            return False
+        headers = {k.lower(): v for k, v in headers.items()}
+        if "set-cookie" in headers or "private" in parse_cache_control(headers.get("cache-control", "")):
+            return False
+        lifetime = freshness_lifetime(headers)
+        vary_names = [name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()]
+        if not lifetime or "*" in vary_names or len(body) > self.max_bytes:
+            return False
+
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_suffix(".tmp")
+            temporary.write_bytes(body)
+            os.replace(temporary, path)
+
+        key = self.key(method, url)
+        self._remove_entry(key)
+        now = time.time()
+        self._add_entry(key, {
+            "url": url,
+            "digest": digest,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in DROP_HEADERS},
+            "vary": {name: request_headers.get(name) for name in vary_names},
+            "expires_at": now + lifetime,
+            "last_access": now,
+        }, len(body))
+        self.stores += 1
+        self._evict()
+        self._changed()
+        return True
+
+    def refresh(self, entry: Dict[str, Any], headers: Dict[str, str]):
+        """Extend an entry after a 304 Not Modified"""
+        lifetime = freshness_lifetime({**entry["headers"], **headers})
+        entry["expires_at"] = time.time() + (lifetime or 0)
+        self._changed()
+
+    async def handle(self, route):
+        """Serve a routed request from the cache or the network, storing what it can"""
+        request = route.request
+        if (
+            request.method != "GET"
+            or request.resource_type not in CACHEABLE_TYPES
+            or not request.url.startswith(("http://", "https://"))
+        ):
+            await route.fallback()
+            return
+
+        request_headers = await request.all_headers()
+        entry = self.lookup(request.method, request.url, request_headers)
+        if entry is not None and entry["expires_at"] > time.time():
+            body = self.body(entry)
+            if body is not None:
+                self.hits += 1
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+                return
+
+        headers = dict(request_headers)
+        if entry is not None:
+            etag = entry["headers"].get("etag")
+            last_modified = entry["headers"].get("last-modified")
+            if etag:
+                headers["if-none-match"] = etag
+            if last_modified:
+                headers["if-modified-since"] = last_modified
+        try:
+            response = await route.fetch(headers=headers)
+        except Exception as e:
+            body = self.body(entry) if entry is not None else None
+            if body is None:
+                logger.debug(f"Cache fetch failed for {request.url}: {e}")
+                await route.fallback()
+                return
+            self.stale_served += 1
+            await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+            return
+
+        if response.status == 304 and entry is not None:
+            body = self.body(entry)
+            if body is not None:
+                self.revalidated += 1
+                self.refresh(entry, response.headers)
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+                return
+
+        self.misses += 1
+        body = await response.body()
+        self.store(request.method, request.url, request_headers, response.status, response.headers, body)
+        await route.fulfill(
+            status=response.status,
+            headers={k: v for k, v in response.headers.items() if k.lower() not in DROP_HEADERS},
+            body=body,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bodies": len(self._blob_sizes),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "stale_served": self.stale_served,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        self.save()
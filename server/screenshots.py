@@ -0,0 +1,285 @@
+import base64
+import hashlib
+import mimetypes
+import shutil
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from loguru import logger
+from client_bridge.metrics import metrics
+
+
+class ScreenshotStore:
+    """Screenshots kept as raw bytes within a memory budget.
+
+    Least recently used entries are spilled to a disk cache when the budget is
+    exceeded and read back (and promoted) on the next access.
+    """
+
+    def __init__(self, max_memory_bytes: int = 32 * 1024 * 1024, spill_dir: Optional[str] = None):
+        self.max_memory_bytes = max_memory_bytes
+        self._spill_dir = Path(spill_dir) if spill_dir else None
+        self._owns_spill_dir = False  # created here, so removed by close()
+        self._memory: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._spilled: Dict[str, Tuple[Path, str]] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _spill_path(self, name: str, mime_type: str) -> Path:
+        if self._spill_dir is None:
+            self._spill_dir = Path(tempfile.mkdtemp(prefix="mcp-screenshots-"))
+            self._owns_spill_dir = True
+        self._spill_dir.mkdir(parents=True, exist_ok=True)
+        extension = mimetypes.guess_extension(mime_type) or ".bin"
+        digest = hashlib.sha1(name.encode("utf-8")).hexdigest()
+        return self._spill_dir / f"{digest}{extension}"
+
+    def _drop(self, name: str):
+        entry = self._memory.pop(name, None)
+        if entry:
+            self._memory_bytes -= len(entry[0])
+        spilled = self._spilled.pop(name, None)
+        if spilled:
+            spilled[0].unlink(missing_ok=True)
+
+    def _spill(self, name: str, data: bytes, mime_type: str):
+        path = self._spill_path(name, mime_type)
+        path.write_bytes(data)
+        self._spilled[name] = (path, mime_type)
+
+    def _evict(self):
+        while self._memory_bytes > self.max_memory_bytes and self._memory:
+            name, (data, mime_type) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(data)
+            self._spill(name, data, mime_type)
+            self.evictions += 1
+            logger.debug(f"Spilled screenshot {name} ({len(data)} bytes) to disk")
+
+    def put(self, name: str, data: bytes, mime_type: str = "image/png"):
+        """Store a screenshot, replacing any previous one with the same name"""
+        self._drop(name)
+        if len(data) > self.max_memory_bytes:
+            self._spill(name, data, mime_type)
+            self.evictions += 1
+            return
+        self._memory[name] = (data, mime_type)
+        self._memory_bytes += len(data)
+        self._evict()
+
+    def get(self, name: str) -> Optional[Tuple[bytes, str]]:
+        """Return (data, mime_type) for a screenshot, or None if unknown"""
+        entry = self._memory.get(name)
+        if entry:
+            self._memory.move_to_end(name)
+            self.hits += 1
+            return entry
+
+        spilled = self._spilled.get(name)
+        if spilled:
+            path, mime_type = spilled
+            try:
+                data = path.read_bytes()
+            except OSError as e:
+                logger.warning(f"Spilled screenshot {name} is unreadable: {e}")
+                del self._spilled[name]
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self.put(name, data, mime_type)
+            return data, mime_type
+
+        self.misses += 1
+        return None
+
+    def close(self):
+        """Drop every screenshot and its spilled file; a temporary spill directory is removed"""
+        for name in list(self._memory) + list(self._spilled):
+            self._drop(name)
+        if self._owns_spill_dir:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+            self._owns_spill_dir = False
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._memory or name in self._spilled
+
+    def __len__(self) -> int:
+        return len(self._memory) + len(self._spilled)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self),
+            "in_memory": len(self._memory),
+            "on_disk": len(self._spilled),
+            "memory_bytes": self._memory_bytes,
+            "max_memory_bytes": self.max_memory_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+SCREENSHOT_FORMATS = {"png": "image/png", "jpeg": "image/jpeg", "webp": "image/webp"}
+
+# Downscales an image in the page with a canvas, for browsers without CDP
+RESIZE_SCRIPT = """
+async ({ data, mimeType, width, height, format, quality }) => {
+    const image = new Image();
+    image.src = `data:${mimeType};base64,${data}`;
+    await image.decode();
+    const canvas = document.createElement('canvas');
+    canvas.width = width;
+    canvas.height = height;
+    canvas.getContext('2d').drawImage(image, 0, 0, width, height);
+    return canvas.toDataURL(format, quality);
+}
+"""
+
+
+def fit_scale(
+    region_width: float,
+    region_height: float,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    max_pixels: Optional[int] = None,
+) -> float:
+    """Largest scale <= 1 that fits the region into the requested bounds"""
+    scale = 1.0
+    if max_width and region_width > 0:
+        scale = min(scale, max_width / region_width)
+    if max_height and region_height > 0:
+        scale = min(scale, max_height / region_height)
+    if max_pixels and region_width * region_height > 0:
+        scale = min(scale, (max_pixels / (region_width * region_height)) ** 0.5)
+    return max(scale, 0.01)
+
+
+async def _capture_region(page, selector, clip, full_page) -> Optional[Dict[str, float]]:
+    """Region to capture in document CSS pixels, or None if the element is missing"""
+    if selector:
+        element = await page.query_selector(selector)
+        if not element:
+            return None
+        await element.scroll_into_view_if_needed()
+        box = await element.bounding_box()
+        if not box:
+            return None
+        scroll_x, scroll_y = await page.evaluate("() => [window.scrollX, window.scrollY]")
+        return {
+            "x": box["x"] + scroll_x,
+            "y": box["y"] + scroll_y,
+            "width": box["width"],
+            "height": box["height"],
+        }
+    if clip:
+        return {key: float(clip[key]) for key in ("x", "y", "width", "height")}
+    if full_page:
+        width, height = await page.evaluate(
+            "() => [document.documentElement.scrollWidth, document.documentElement.scrollHeight]"
+        )
+    else:
+        width, height = await page.evaluate("() => [window.innerWidth, window.innerHeight]")
+    x, y = (0, 0) if full_page else await page.evaluate("() => [window.scrollX, window.scrollY]")
+    return {"x": x, "y": y, "width": width, "height": height}
+
+
+async def _resize(
+    page,
+    screenshot: Tuple[bytes, str, int, int],
+    scale: float,
+    image_format: str,
+    quality: Optional[int],
+) -> Optional[Tuple[bytes, str, int, int]]:
+    """Screenshot scaled and re-encoded on a canvas in the page, None if that fails"""
+    data, mime_type, width, height = screenshot
+    width, height = max(1, round(width * scale)), max(1, round(height * scale))
+    try:
+        url = await page.evaluate(RESIZE_SCRIPT, {
+            "data": base64.b64encode(data).decode("ascii"),
+            "mimeType": mime_type,
+            "width": width,
+            "height": height,
+            "format": SCREENSHOT_FORMATS[image_format],
+            "quality": quality / 100 if quality is not None else None,
+        })
+    except Exception as e:
+        logger.debug(f"Could not downscale screenshot in the page: {e}")
+        return None
+    header, _, encoded = url.partition(",")
+    # toDataURL falls back to png for formats the browser cannot encode
+    return base64.b64decode(encoded), header[len("data:"):].split(";")[0], width, height
+
+
+async def capture_screenshot(
+    page,
+    selector: Optional[str] = None,
+    clip: Optional[Dict[str, float]] = None,
+    full_page: bool = False,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    max_pixels: Optional[int] = None,
+    image_format: str = "png",
+    quality: Optional[int] = None,
+) -> Optional[Tuple[bytes, str, int, int]]:
+    """Capture a downscaled screenshot of a page region.
+
+    Returns (data, mime_type, width, height), or None when `selector` matches
+    nothing. On Chromium the scaling and encoding (png, jpeg, webp) happen in
+    the browser through CDP; other browsers take a Playwright screenshot that
+    is downscaled on a canvas in the page. If the page forbids that (e.g. its
+    CSP blocks data: images), the screenshot is returned unscaled and the
+    returned size says so.
+    """
+    if image_format not in SCREENSHOT_FORMATS:
+        raise ValueError(f"Unsupported screenshot format: {image_format}")
+
+    region = await _capture_region(page, selector, clip, full_page)
+    if region is None:
+        return None
+    scale = fit_scale(region["width"], region["height"], max_width, max_height, max_pixels)
+
+    with metrics.span("page.screenshot", format=image_format) as span:
+        if page.context.browser and page.context.browser.browser_type.name == "chromium":
+            params = {
+                "format": image_format,
+                "clip": {**region, "scale": scale},
+                "captureBeyondViewport": True,
+            }
+            if quality is not None and image_format != "png":
+                params["quality"] = quality
+            cdp = await page.context.new_cdp_session(page)
+            try:
+                result = await cdp.send("Page.captureScreenshot", params)
+            finally:
+                await cdp.detach()
+            screenshot = (
+                base64.b64decode(result["data"]),
+                SCREENSHOT_FORMATS[image_format],
+                round(region["width"] * scale),
+                round(region["height"] * scale),
+            )
+        else:
+            fallback_format = "png" if image_format == "png" else "jpeg"
+            data = await page.screenshot(
+                type=fallback_format,
+                quality=quality if fallback_format == "jpeg" else None,
+                clip=region,
+                full_page=True,
+                scale="css",
+            )
+            screenshot = (
+                data,
+                SCREENSHOT_FORMATS[fallback_format],
+                round(region["width"]),
+                round(region["height"]),
+            )
+            if scale < 1 or image_format != fallback_format:
+                screenshot = await _resize(page, screenshot, scale, image_format, quality) or screenshot
+        span.set(bytes=len(screenshot[0]), pixels=screenshot[2] * screenshot[3])
+    return screenshot
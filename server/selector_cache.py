@@ -0,0 +1,155 @@
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from hashlib import sha1
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from loguru import logger
+
+# Hash of the page skeleton (tag names and nesting, no text or attributes),
+# so pages built from the same template share a fingerprint.
+FINGERPRINT_SCRIPT = """
+() => {
+    let h1 = 0xdeadbeef, h2 = 0x41c6ce57, count = 0;
+    const mix = (str) => {
+        for (let i = 0; i < str.length; i++) {
+            const ch = str.charCodeAt(i);
+            h1 = Math.imul(h1 ^ ch, 2654435761);
+            h2 = Math.imul(h2 ^ ch, 1597334677);
+        }
+    };
+    const walk = (el, depth) => {
+        if (count++ > 3000 || depth > 8) return;
+        mix(el.tagName + depth);
+        for (const child of el.children) walk(child, depth + 1);
+    };
+    if (document.body) walk(document.body, 0);
+    h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+    h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+    return (h2 >>> 0).toString(16).padStart(8, '0') + (h1 >>> 0).toString(16).padStart(8, '0');
+}
+"""
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8,}|[0-9a-f-]{36})$", re.IGNORECASE)
+
+
+def url_pattern(url: str) -> str:
+    """Host and path with id-like segments replaced by '*' and the query dropped"""
+    parts = urlsplit(url)
+    segments = [
+        "*" if _ID_SEGMENT.match(segment) else segment
+        for segment in parts.path.split("/")
+    ]
+    return f"{parts.netloc.lower()}{'/'.join(segments)}"
+
+
+def normalize_intent(message: str) -> str:
+    return " ".join(re.sub(r"[^\w\s#.\-]", " ", message.lower()).split())
+
+
+def clean_selector(text: str) -> str:
+    """Strip code fences and quotes an LLM may wrap around a selector"""
+    text = text.strip()
+    fenced = re.match(r"^```[\w-]*\s*(.*?)\s*```$", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    return text.strip().strip("`").strip()
+
+
+class SelectorCache:
+    """LRU cache of (URL pattern, DOM fingerprint, intent) -> CSS selector"""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl: float = 24 * 3600,
+        path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        # key -> (selector, stored_at); wall clock so entries survive restarts
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        if path:
+            self.load()
+
+    @staticmethod
+    def key(url: str, fingerprint: str, intent: str) -> str:
+        raw = f"{url_pattern(url)}\n{fingerprint}\n{normalize_intent(intent)}"
+        return sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        selector, stored_at = entry
+        if time.time() - stored_at > self.ttl:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return selector
+
+    def put(self, key: str, selector: str):
+        self._entries[key] = (selector, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self.path:
+            self.save()
+
+    def invalidate(self, key: str):
+        """Drop an entry whose selector no longer matches the live page"""
+        if self._entries.pop(key, None) is not None:
+            self.stale += 1
+            if self.path:
+                self.save()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable selector cache {self.path}: {e}")
+            return
+        now = time.time()
+        entries = sorted(data.items(), key=lambda item: item[1][1])
+        for key, (selector, stored_at) in entries[-self.max_entries:]:
+            if now - stored_at <= self.ttl:
+                self._entries[key] = (selector, stored_at)
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(dict(self._entries), f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save selector cache {self.path}: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+        }
+
+
+async def selector_matches(page, selector: str) -> bool:
+    """Cheap live check that a selector still resolves on the page"""
+    if not selector:
+        return False
+    try:
+        return await page.locator(selector).count() > 0
+    except Exception:
+        return False
@@ -0,0 +1,168 @@
+import asyncio
+import time
+import weakref
+from typing import List, Optional, Tuple
+from client_bridge.metrics import metrics
+
+SMART = "smart"
+
+# Requests that stay open by design and would keep the network from going idle
+LONG_LIVED_TYPES = {"websocket", "eventsource"}
+
+# Resolves once no DOM mutation happened for quietMs, or after timeoutMs
+DOM_QUIET_SCRIPT = """
+({ quietMs, timeoutMs }) => new Promise((resolve) => {
+    const start = performance.now();
+    let mutations = 0;
+    let quietTimer = null;
+    let capTimer = null;
+    let observer = null;
+    const done = (quiet) => {
+        if (observer) observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(capTimer);
+        resolve({ quiet, mutations, elapsed: performance.now() - start });
+    };
+    observer = new MutationObserver((records) => {
+        mutations += records.length;
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => done(true), quietMs);
+    });
+    observer.observe(document.documentElement || document, {
+        subtree: true, childList: true, attributes: true, characterData: true,
+    });
+    quietTimer = setTimeout(() => done(true), quietMs);
+    capTimer = setTimeout(() => done(false), timeoutMs);
+})
+"""
+
+
+class NetworkActivity:
+    """In-flight request count of one page, fed by Playwright request events"""
+
+    def __init__(self, page):
+        self.inflight = 0
+        self.last_change = time.monotonic()
+        page.on("request", self._started)
+        page.on("requestfinished", self._ended)
+        page.on("requestfailed", self._ended)
+
+    def _started(self, request):
+        if request.resource_type not in LONG_LIVED_TYPES:
+            self.inflight += 1
+            self.last_change = time.monotonic()
+
+    def _ended(self, request):
+        if request.resource_type not in LONG_LIVED_TYPES:
+            self.inflight = max(0, self.inflight - 1)
+            self.last_change = time.monotonic()
+
+    async def wait_idle(self, idle_ms: float, max_ms: float) -> bool:
+        """Wait until nothing was in flight for idle_ms, giving up after max_ms"""
+        deadline = time.monotonic() + max_ms / 1000
+        while True:
+            now = time.monotonic()
+            if self.inflight == 0 and (now - self.last_change) * 1000 >= idle_ms:
+                return True
+            if now >= deadline:
+                return False
+            await asyncio.sleep(0.025)
+
+
+_activity: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def track_network(page) -> NetworkActivity:
+    """Start counting a page's requests; call when the page is created"""
+    activity = _activity.get(page)
+    if activity is None:
+        activity = _activity[page] = NetworkActivity(page)
+    return activity
+
+
+class WaitReport:
+    """What a smart wait waited on, and for how long"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.steps: List[Tuple[str, float]] = []
+
+    def record(self, label: str, started: float):
+        self.steps.append((label, (time.perf_counter() - started) * 1000))
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def __str__(self) -> str:
+        steps = ", ".join(f"{label} {ms:.0f}ms" for label, ms in self.steps)
+        return f"smart wait {self.total_ms:.0f}ms: {steps}"
+
+
+class SmartWait:
+    """Wait for the page to settle instead of for the full `load` event.
+
+    The DOM counts as settled after `dom_quiet_ms` without mutations, the
+    network after `network_idle_ms` without in-flight requests. Both are cut
+    off at `max_ms`, so long polling or animations cannot stall a step.
+    """
+
+    def __init__(self, dom_quiet_ms: float = 100, network_idle_ms: float = 300, max_ms: float = 3000):
+        self.dom_quiet_ms = dom_quiet_ms
+        self.network_idle_ms = network_idle_ms
+        self.max_ms = max_ms
+
+    async def settle(self, page, report: Optional[WaitReport] = None) -> WaitReport:
+        report = report or WaitReport()
+        deadline = time.perf_counter() + self.max_ms / 1000
+
+        def remaining_ms() -> float:
+            return max(0.0, (deadline - time.perf_counter()) * 1000)
+
+        with metrics.span("browser.wait", phase="settle") as span:
+            started = time.perf_counter()
+            result = None
+            for attempt in range(2):
+                try:
+                    result = await page.evaluate(
+                        DOM_QUIET_SCRIPT,
+                        {"quietMs": self.dom_quiet_ms, "timeoutMs": remaining_ms()},
+                    )
+                    break
+                except Exception:
+                    if attempt:
+                        break
+                    # The action navigated and destroyed the execution context
+                    nav_started = time.perf_counter()
+                    try:
+                        await page.wait_for_load_state(
+                            "domcontentloaded", timeout=max(remaining_ms(), 1)
+                        )
+                    except Exception:
+                        break
+                    report.record("navigation", nav_started)
+                    started = time.perf_counter()
+            if result is None:
+                report.record("DOM not observed", started)
+            elif result["quiet"]:
+                report.record(f"DOM quiet ({result['mutations']} mutations)", started)
+            else:
+                report.record(f"DOM still changing ({result['mutations']} mutations)", started)
+
+            started = time.perf_counter()
+            activity = track_network(page)
+            if await activity.wait_idle(self.network_idle_ms, remaining_ms()):
+                report.record("network idle", started)
+            else:
+                report.record(f"network busy ({activity.inflight} in flight)", started)
+            span.set(wait_ms=round(report.total_ms, 1))
+        return report
+
+    async def goto(self, page, url: str, timeout: Optional[float] = 30000) -> WaitReport:
+        """Navigate until DOMContentLoaded, then settle"""
+        report = WaitReport()
+        track_network(page)
+        started = time.perf_counter()
+        await page.goto(url, timeout=timeout, wait_until="domcontentloaded")
+        report.record("domcontentloaded", started)
+        return await self.settle(page, report)
@@ -0,0 +1,48 @@
+import json
+from client_bridge.history import ConversationHistory
+from server.extraction import ExtractionStore
+
+
+def make_store(rows, max_rows=10000):
+    store = ExtractionStore(chunk_size=40, max_rows=max_rows)
+    extraction = store.create("https://example.com/table")
+    extraction.add_page(["id", "name"], [[i, f"item {i}"] for i in range(rows)], store.max_rows)
+    extraction.close()
+    return store, extraction
+
+
+def test_cursor_pages_through_every_row_once():
+    store, extraction = make_store(100)
+    chunk = extraction.chunk(0, store.chunk_size)
+    seen = list(chunk["rows"])
+    while chunk["next_cursor"]:
+        chunk = store.read_chunk(chunk["next_cursor"])
+        seen.extend(chunk["rows"])
+    assert [row[0] for row in seen] == list(range(100))
+    assert chunk["total_rows"] == 100
+
+
+def test_cursor_survives_tool_output_truncation():
+    store, extraction = make_store(100, max_rows=60)
+    history = ConversationHistory(max_tool_output_tokens=200)
+    history.append({
+        "role": "tool",
+        "tool_call_id": "call-1",
+        "content": json.dumps(extraction.chunk(0, 50)),
+    })
+    content = history.messages[-1]["content"]
+    assert "[... truncated" in content
+    assert f'"next_cursor": "{extraction.id}:50"' in content
+    assert '"truncated": "only the first 60 rows' in content
+
+
+def test_close_removes_the_temporary_export_dir():
+    store = ExtractionStore()
+    extraction = store.create("https://example.com/table", output="jsonl")
+    extraction.add_page(["id"], [[1], [2]], 5)
+    extraction.close()
+    export_dir = extraction.path.parent
+    assert extraction.path.is_file()
+
+    store.close()
+    assert not export_dir.exists()
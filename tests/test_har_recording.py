@@ -0,0 +1,110 @@
+import asyncio
+import json
+from server.browser_manager import BrowserManager
+from server.config import BrowserConfig
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.url = "about:blank"
+
+    def on(self, event, handler):
+        pass
+
+    async def goto(self, url):
+        # Stands in for a request Playwright would record
+        self.url = url
+        self.context.visited.append(url)
+
+
+class FakeContext:
+    def __init__(self, browser, record_har_path=None):
+        self.browser = browser
+        self.record_har_path = record_har_path
+        self.replayed_from = None
+        self.visited = []
+
+    def on(self, event, handler):
+        pass
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def route_from_har(self, path, not_found=None):
+        self.replayed_from = path
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        if self.record_har_path:
+            entries = [{"request": {"method": "GET", "url": url}} for url in self.visited]
+            har = {"log": {"version": "1.2", "pages": [], "entries": entries}}
+            with open(self.record_har_path, "w", encoding="utf-8") as f:
+                json.dump(har, f)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    async def new_context(self, record_har_path=None, **options):
+        context = FakeContext(self, record_har_path)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        pass
+
+
+def make_manager(har_path, mode):
+    manager = BrowserManager(BrowserConfig(max_contexts=2, har_path=str(har_path), har_mode=mode))
+    manager.browser = FakeBrowser()
+    return manager
+
+
+def test_pooled_and_crawl_recordings_replay_from_one_file(tmp_path):
+    har_path = tmp_path / "session.har"
+
+    async def record():
+        manager = make_manager(har_path, "record")
+        for session, url in (("a", "https://example.com/a"), ("b", "https://example.com/b")):
+            async with manager.session(session) as page:
+                await page.goto(url)
+        async with manager.isolated_page("crawl-0") as page:
+            await page.goto("https://example.com/crawled")
+        await manager.close()
+
+    async def replay():
+        manager = make_manager(har_path, "replay")
+        contexts = []
+        for session in ("a", "b"):
+            async with manager.session(session) as page:
+                contexts.append(page.context)
+        async with manager.isolated_page("crawl-0") as page:
+            contexts.append(page.context)
+        await manager.close()
+        return contexts
+
+    asyncio.run(record())
+    urls = sorted(entry["request"]["url"] for entry in json.loads(har_path.read_text())["log"]["entries"])
+    assert urls == ["https://example.com/a", "https://example.com/b", "https://example.com/crawled"]
+
+    contexts = asyncio.run(replay())
+    assert [context.replayed_from for context in contexts] == [str(har_path)] * 3
+
+
+def test_new_recording_replaces_the_previous_run(tmp_path):
+    har_path = tmp_path / "session.har"
+
+    async def record(url):
+        manager = make_manager(har_path, "record")
+        async with manager.session("a") as page:
+            await page.goto(url)
+        await manager.close()
+
+    asyncio.run(record("https://example.com/old"))
+    asyncio.run(record("https://example.com/new"))
+    entries = json.loads(har_path.read_text())["log"]["entries"]
+    assert [entry["request"]["url"] for entry in entries] == ["https://example.com/new"]
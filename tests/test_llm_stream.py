@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+from client_bridge.config import LLMConfig
+from client_bridge.llm_client import LLMClient, StreamEvent
+
+
+def tool_delta(index, id=None, name=None, arguments=None):
+    return SimpleNamespace(
+        index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments)
+    )
+
+
+def chunk(*tool_calls, finish_reason=None):
+    delta = SimpleNamespace(content=None, tool_calls=list(tool_calls))
+    return SimpleNamespace(
+        id="chatcmpl-1",
+        model="test",
+        usage=None,
+        choices=[SimpleNamespace(finish_reason=finish_reason, delta=delta)],
+    )
+
+
+class FakeCompletions:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def create(self, **kwargs):
+        async def stream():
+            for item in self.chunks:
+                yield item
+
+        return stream()
+
+
+def test_tool_call_start_is_emitted_once_per_call(monkeypatch):
+    chunks = [
+        # The name of the first call arrives in two fragments
+        chunk(tool_delta(0, id="call-1", name="playwright_", arguments="")),
+        chunk(tool_delta(0, name="navigate")),
+        chunk(tool_delta(0, arguments='{"url": ')),
+        chunk(tool_delta(0, arguments='"https://example.com"}')),
+        # The second call never streams any arguments
+        chunk(tool_delta(1, id="call-2", name="playwright_snapshot"), finish_reason="tool_calls"),
+    ]
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(chunks)))
+    monkeypatch.setattr(LLMClient, "client", property(lambda self: fake))
+    client = LLMClient(LLMConfig(api_key="test", model="test"))
+
+    async def collect():
+        return [event async for event in client.stream_with_prompt("go")]
+
+    events = asyncio.run(collect())
+    starts = [(e.tool_name, e.tool_call_id) for e in events if e.type == StreamEvent.TOOL_CALL_START]
+    assert starts == [("playwright_navigate", "call-1"), ("playwright_snapshot", "call-2")]
+    assert events[-1].type == StreamEvent.DONE
@@ -0,0 +1,50 @@
+import asyncio
+from fastmcp import FastMCP
+from client_bridge.mcp_client import MCPClient
+from client_bridge.metrics import metrics
+from server.browser_navigator_server import ToolMetricsMiddleware
+
+
+def make_server() -> FastMCP:
+    mcp = FastMCP("metrics-test")
+    mcp.add_middleware(ToolMetricsMiddleware())
+
+    @mcp.tool()
+    async def echo(text: str) -> str:
+        with metrics.span("test.echo"):
+            return text
+
+    return mcp
+
+
+def test_turns_after_lazy_connect_have_disjoint_spans():
+    async def scenario():
+        client = MCPClient(make_server(), health_check_interval=0)
+        turns = []
+        try:
+            for index in range(2):
+                # The first call connects lazily inside the turn
+                with metrics.turn() as timings:
+                    await client.call_tool("echo", {"text": str(index)})
+                turns.append(timings)
+            # A call after both turns ended must not reach either of them
+            await client.call_tool("echo", {"text": "late"})
+        finally:
+            await client.disconnect()
+        return turns
+
+    first, second = asyncio.run(scenario())
+    for timings in (first, second):
+        names = sorted(span.name for span in timings.spans)
+        assert names == ["mcp.call_tool", "server.tool", "test.echo"]
+    assert not {id(span) for span in first.spans} & {id(span) for span in second.spans}
+
+
+def test_resume_ignores_unknown_and_closed_turns():
+    with metrics.turn() as timings:
+        turn_id = timings.id
+    with metrics.resume(turn_id) as resumed:
+        with metrics.span("test.outside"):
+            pass
+    assert resumed is None
+    assert [span.name for span in timings.spans] == []
@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from server.response_cache import ResponseCache
+
+URL = "https://example.com/app.js"
+FRESH = {"cache-control": "max-age=600", "content-type": "text/javascript"}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "cache"))
+
+
+def test_stores_public_response(cache):
+    assert cache.store("GET", URL, {}, 200, FRESH, b"console.log(1)")
+    assert cache.lookup("GET", URL, {}) is not None
+
+
+def test_skips_private_response(cache):
+    headers = {**FRESH, "cache-control": "private, max-age=600"}
+    assert not cache.store("GET", URL, {}, 200, headers, b"secret")
+    assert cache.lookup("GET", URL, {}) is None
+
+
+@pytest.mark.parametrize("name", ["authorization", "cookie"])
+def test_skips_response_to_request_with_credentials(cache, name):
+    assert not cache.store("GET", URL, {name: "token"}, 200, FRESH, b"secret")
+    assert cache.lookup("GET", URL, {}) is None
+
+
+def test_skips_response_setting_cookies(cache):
+    headers = {**FRESH, "Set-Cookie": "session=abc"}
+    assert not cache.store("GET", URL, {}, 200, headers, b"body")
+    assert cache.lookup("GET", URL, {}) is None
+
+
+class FakeRequest:
+    def __init__(self, resource_type):
+        self.method = "GET"
+        self.url = URL
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self, resource_type):
+        self.request = FakeRequest(resource_type)
+        self.calls = []
+
+    async def fallback(self):
+        self.calls.append("fallback")
+
+    async def fetch(self, **kwargs):
+        self.calls.append("fetch")
+        raise AssertionError("streamed resources must not be fetched")
+
+
+@pytest.mark.parametrize("resource_type", ["media", "eventsource", "websocket", "other"])
+def test_streams_bypass_cache(cache, resource_type):
+    route = FakeRoute(resource_type)
+    asyncio.run(cache.handle(route))
+    assert route.calls == ["fallback"]
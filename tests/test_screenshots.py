@@ -0,0 +1,29 @@
+from server.screenshots import ScreenshotStore
+
+
+def test_close_removes_the_temporary_spill_dir():
+    store = ScreenshotStore(max_memory_bytes=4)
+    store.put("a", b"12345")
+    store.put("b", b"12")
+    spill_dir = store._spill_dir
+    assert spill_dir.is_dir() and "a" in store
+
+    store.close()
+    assert not spill_dir.exists()
+    assert len(store) == 0
+
+    # Still usable, with a fresh spill directory
+    store.put("c", b"123456")
+    assert store.get("c") == (b"123456", "image/png")
+    store.close()
+
+
+def test_close_keeps_a_configured_spill_dir(tmp_path):
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    (spill_dir / "keep.txt").write_text("not ours")
+    store = ScreenshotStore(max_memory_bytes=4, spill_dir=str(spill_dir))
+    store.put("a", b"12345")
+
+    store.close()
+    assert [path.name for path in spill_dir.iterdir()] == ["keep.txt"]
@@ -0,0 +1,124 @@
+import asyncio
+import contextvars
+from contextlib import asynccontextmanager
+from mcp import types
+from client_bridge.mcp_client import MCPClient
+from client_bridge.session_pool import MCPSessionPool
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class FakeSession:
+    def __init__(self, number: int):
+        self.number = number
+        self.healthy = True
+        self.dead = False
+        self.task = None
+        self.ping_contexts = []
+
+    def die(self):
+        self.dead = True
+        self.task.cancel()
+
+    async def send_ping(self):
+        self.ping_contexts.append(request_id.get())
+        if not self.healthy:
+            raise ConnectionError("transport closed")
+
+
+class FakeServer:
+    """Session factory that records each opened session and its context"""
+
+    def __init__(self):
+        self.sessions = []
+        self.contexts = []
+
+    @asynccontextmanager
+    async def open_session(self):
+        session = FakeSession(len(self.sessions))
+        session.task = asyncio.current_task()
+        self.sessions.append(session)
+        self.contexts.append(request_id.get())
+        try:
+            yield session
+        except asyncio.CancelledError:
+            if not session.dead:
+                raise
+            # Like a transport whose reader failed: the task survives, the
+            # session context exits with an error
+            session.task.uncancel()
+            raise ConnectionError("transport closed")
+
+
+def test_dead_member_is_restarted_on_lease():
+    async def scenario():
+        server = FakeServer()
+        pool = MCPSessionPool(server.open_session, size=2, health_check_interval=0)
+        await pool.start()
+        first = pool.members[0].session
+        first.die()
+        await asyncio.sleep(0.01)
+        assert not pool.members[0].alive
+        async with pool.lease() as session:
+            leased = session
+        await pool.close()
+        return pool, first, leased
+
+    pool, first, leased = asyncio.run(scenario())
+    assert leased is not first
+    assert pool.members[0].restarts == 1
+    assert pool.members[1].restarts == 0
+
+
+def test_failed_call_heals_member_outside_the_callers_context():
+    async def scenario():
+        server = FakeServer()
+        pool = MCPSessionPool(server.open_session, size=1, health_check_interval=0)
+        await pool.start()
+        request_id.set("request-1")
+        broken = pool.members[0].session
+        broken.healthy = False
+        try:
+            async with pool.lease():
+                raise ConnectionError("broken pipe")
+        except ConnectionError:
+            pass
+        await asyncio.gather(*pool._healing)
+        healed = pool.members[0].session
+        await pool.close()
+        return server, broken, healed, pool
+
+    server, broken, healed, pool = asyncio.run(scenario())
+    assert healed is not broken and pool.members[0].restarts == 1
+    assert broken.ping_contexts == [None]
+    assert server.contexts == [None, None]
+
+
+def test_healthy_member_survives_a_failed_call():
+    async def scenario():
+        server = FakeServer()
+        pool = MCPSessionPool(server.open_session, size=1, health_check_interval=0)
+        await pool.start()
+        try:
+            async with pool.lease():
+                raise ValueError("tool error")
+        except ValueError:
+            pass
+        await asyncio.gather(*pool._healing)
+        await pool.close()
+        return pool
+
+    assert asyncio.run(scenario()).members[0].restarts == 0
+
+
+def test_tools_changed_fires_once_for_all_pooled_sessions():
+    async def scenario():
+        client = MCPClient(pool_size=3)
+        calls = []
+        client.on_tools_changed(lambda: calls.append(1))
+        notification = types.ServerNotification(types.ToolListChangedNotification())
+        for _ in range(3):
+            await client._handle_message(notification)
+        return calls
+
+    assert asyncio.run(scenario()) == [1]
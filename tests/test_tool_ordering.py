@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+from fastmcp import FastMCP
+from client_bridge.bridge import MCPLLMBridge
+from client_bridge.config import BridgeConfig, LLMConfig
+
+
+def make_server(events) -> FastMCP:
+    mcp = FastMCP("ordering-test")
+
+    async def record(name):
+        events.append(("start", name))
+        await asyncio.sleep(0.05)
+        events.append(("end", name))
+        return name
+
+    @mcp.tool(annotations={"readOnlyHint": True})
+    async def read(name: str) -> str:
+        return await record(name)
+
+    @mcp.tool()
+    async def write(name: str) -> str:
+        return await record(name)
+
+    return mcp
+
+
+def tool_call(tool, name):
+    return SimpleNamespace(
+        id=f"call-{name}",
+        function=SimpleNamespace(name=tool, arguments=f'{{"name": "{name}"}}'),
+    )
+
+
+def test_state_changing_call_is_a_barrier_between_reads():
+    events = []
+
+    async def scenario():
+        config = BridgeConfig(
+            mcp=make_server(events),
+            llm_config=LLMConfig(api_key="test"),
+            mcp_health_check_interval=0,
+        )
+        bridge = MCPLLMBridge(config)
+        await bridge.initialize()
+        try:
+            calls = [tool_call("read", "r1"), tool_call("read", "r2"), tool_call("write", "w"), tool_call("read", "r3")]
+            return await bridge._handle_tool_calls(calls)
+        finally:
+            await bridge.mcp_client_session.disconnect()
+
+    responses = asyncio.run(scenario())
+    assert [response["output"] for response in responses] == ["r1", "r2", "w", "r3"]
+    # The first two reads overlap; the write runs alone between the reads
+    assert {name for _, name in events[:2]} == {"r1", "r2"}
+    assert events[4:] == [("start", "w"), ("end", "w"), ("start", "r3"), ("end", "r3")]
+
+
+def test_browser_tools_that_change_state_are_not_read_only(monkeypatch):
+    monkeypatch.setenv("AZURE_OPEN_AI_API_KEY", "test")
+    from server.browser_navigator_server import BrowserNavigationServer
+
+    async def read_only_tools():
+        tools = await BrowserNavigationServer().list_tools()
+        return {tool.name for tool in tools if tool.annotations and tool.annotations.readOnlyHint}
+
+    read_only = asyncio.run(read_only_tools())
+    assert "playwright_screenshot" not in read_only
+    assert "playwright_snapshot" not in read_only
+    assert "read_all_screenshots" in read_only